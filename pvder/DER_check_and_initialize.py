@@ -8,6 +8,7 @@ import numpy as np
 from scipy.optimize import fsolve, minimize
 
 from pvder.grid_components import BaseValues
+from pvder.simulation_events import SimulationEvents
 from pvder import utility_functions
 from pvder import defaults,templates,specifications,properties
 from pvder.logutil import LogUtil
@@ -485,37 +486,7 @@ class PVDER_SetupUtilities(BaseValues):
 		"""Create a Jacobian matrix with zero values."""
 		try:
 			self.J = np.zeros((self.n_total_ODE,self.n_total_ODE))
-			self.varInd={}
-			n=0
-			if self.DER_model_type == 'SolarPVDERSinglePhase':
-				state_list = ['iaR','iaI','xaR','xaI','uaR','uaI',
-							'Vdc','xDC','xQ','xPLL','wte']
-		
-			elif self.DER_model_type == 'SolarPVDERThreePhase':
-				state_list = ['iaR','iaI','xaR','xaI','uaR','uaI',
-							'ibR','ibI','xbR','xbI','ubR','ubI',
-							'icR','icI','xcR','xcI','ucR','ucI',
-							'Vdc','xDC','xQ','xPLL','wte']
-		
-			elif self.DER_model_type == 'SolarPVDERSinglePhaseConstantVdc':
-				state_list = ['iaR','iaI','xaR','xaI','uaR','uaI',
-							'xP','xQ',
-							'xPLL','wte']
-		
-			elif self.DER_model_type == 'SolarPVDERThreePhaseConstantVdc':
-				state_list = ['iaR','iaI','xaR','xaI','uaR','uaI',
-							'ibR','ibI','xbR','xbI','ubR','ubI',
-							'icR','icI','xcR','xcI','ucR','ucI',
-							'xP','xQ',
-							'xPLL','wte']
-			elif self.DER_model_type == 'SolarPVDERThreePhaseBalanced':
-				state_list = ['iaR','iaI','xaR','xaI','uaR','uaI',
-							'Vdc',
-							'xDC','xQ',
-							'xPLL','wte']
-			for entry in state_list:
-				self.varInd[entry]=n
-				n+=1
+			self.varInd = dict(templates.state_layouts[self.DER_model_type]['index'])
 		except:
 			LogUtil.exception_handler()
 
@@ -775,11 +746,11 @@ class PVDER_SetupUtilities(BaseValues):
 		"""Compare analytical and numerical Jacobian of the ODE model."""
 		try:
 			#Calculate numerical Jacobian using finite differences
-			x = self.y0
+			x = np.array(self.y0)
 			x0 = x.copy()
 
 			eps = 1e-6
-			Jn = np.zeros([len(x), len(x)], dtype = np.float)
+			Jn = np.zeros([len(x), len(x)], dtype = float)
 
 			for i in range(len(x)):
 				x1 = x.copy()
@@ -821,3 +792,85 @@ class PVDER_SetupUtilities(BaseValues):
 			LogUtil.exception_handler()
 
 
+	def check_jacobian_operating_points(self,operating_points,t=0.0,use_generated=False):
+		"""Compare analytical Jacobian with central differences at several operating points.
+		The perturbed states for all operating points are evaluated in a single call to the stateless `rhs` kernel.
+		Entries where the analytical value matches either the forward or backward difference are not reported,
+		since the model is not smooth at anti-windup and current limits.
+		Args:
+			 operating_points (list): Dictionaries with 'Sinsol' (%), 'Vgrid' (fraction of initial grid voltage), 'Q_ref' (fraction of inverter rating), 'DER_CONNECTED', and optionally states 'y'.
+			 t (float): Simulation time in seconds.
+			 use_generated (bool): Check Jacobian generated from the `rhs` kernel instead of `jac_ODE_model`.
+		Returns:
+			 list: Dictionary with operating point, maximum relative error, and mismatched entries for each operating point.
+		"""
+		try:
+			if self.standAlone:
+				raise ValueError('{}:Jacobian can only be checked at operating points for DER models that are not stand alone!'.format(self.name))
+			
+			phases = [phase for phase in ['gridVoltagePhaseA','gridVoltagePhaseB','gridVoltagePhaseC'] if hasattr(self,phase)]
+			saved_attributes = {name:getattr(self,name) for name in ['events','Sinsol','Tactual','Iph','Ppv','Q_ref','Qref_EXTERNAL','Vdc_ref','DER_CONNECTED'] + phases}
+			state_names = {index:name for name,index in self.varInd.items()}
+			n = self.n_ODE
+			eps = 1e-6
+			
+			Ja_list = []
+			Y_list = []
+			params_list = []
+			steps_list = []
+			try:
+				for operating_point in operating_points:
+					self.events = SimulationEvents(verbosity='WARNING')
+					self.events.add_solar_event(t,operating_point['Sinsol'])
+					for phase in phases:
+						setattr(self,phase,saved_attributes[phase]*operating_point['Vgrid'])
+					self.Qref_EXTERNAL = True
+					self.Q_ref = operating_point['Q_ref']*self.Sinverter_rated/BaseValues.Sbase
+					self.DER_CONNECTED = operating_point['DER_CONNECTED']
+					
+					y = np.array(operating_point.get('y',self.y0),dtype=float)
+					self.update_Ppv(t)
+					self.update_Qref(t)
+					self.update_Vdc_ref(t)
+					if use_generated:
+						params = self.get_rhs_parameters()
+						Ja = np.array(self.jac_generated(t,y,params))
+					else:
+						Ja = np.array(self.jac_ODE_model(y,t)) #Also updates set-points used in parameters
+						params = self.get_rhs_parameters()
+					
+					steps = eps*np.maximum(1.0,np.abs(y))
+					Y = np.tile(y[:,np.newaxis],(1,2*n+1)) #Unperturbed states followed by positive and negative perturbations
+					Y[np.arange(n),np.arange(1,n+1)] += steps
+					Y[np.arange(n),np.arange(n+1,2*n+1)] -= steps
+					
+					Ja_list.append(Ja)
+					Y_list.append(Y)
+					params_list.append(np.tile(params[:,np.newaxis],(1,2*n+1)))
+					steps_list.append(steps)
+			finally: #Restore DER model even if Jacobian could not be calculated at an operating point
+				for name,value in saved_attributes.items():
+					setattr(self,name,value)
+			
+			F = self.rhs(t,np.hstack(Y_list),np.hstack(params_list))
+			
+			report = []
+			rtol = defaults.jacobian_check_rtol
+			atol = defaults.jacobian_check_atol
+			for k,(operating_point,Ja,steps) in enumerate(zip(operating_points,Ja_list,steps_list)):
+				Fk = F[:,k*(2*n+1):(k+1)*(2*n+1)]
+				Jc = (Fk[:,1:n+1] - Fk[:,n+1:])/(2*steps)
+				Jf = (Fk[:,1:n+1] - Fk[:,[0]])/steps
+				Jb = (Fk[:,[0]] - Fk[:,n+1:])/steps
+				err = np.minimum(np.abs(Ja-Jc),np.minimum(np.abs(Ja-Jf),np.abs(Ja-Jb)))
+				
+				mismatches = [(state_names[r],state_names[c],Jc[r,c],Ja[r,c]) for r,c in zip(*np.where(err > atol + rtol*np.abs(Jc)))]
+				report.append({'operating_point':{key:value for key,value in operating_point.items() if key != 'y'},
+							   'max_error':(err/(atol + np.abs(Jc))).max(),
+							   'mismatches':mismatches})
+				if mismatches:
+					LogUtil.logger.debug('{}:Differences in analytical and numerical Jacobian found in {} entries at operating point {}'.format(self.name,len(mismatches),report[-1]['operating_point']))
+			
+			return report
+		except:
+			LogUtil.exception_handler()
@@ -0,0 +1,569 @@
+"""Generation of RHS and Jacobian functions for PV-DER models from symbolic model equations."""
+
+from __future__ import division
+import os
+import sys
+import math
+import hashlib
+import importlib.util
+
+import numpy as np
+
+from pvder import DER_kernels
+from pvder import defaults,templates
+from pvder._version import __version__
+from pvder.logutil import LogUtil
+
+
+_generated_functions = {} #Generated functions loaded in this session
+
+
+class ExpressionGraph(object):
+	"""Graph of real valued expressions with common sub-expressions merged by hashing."""
+
+	def __init__(self):
+		"""Creates an empty expression graph."""
+		try:
+			self.nodes = {}
+			self.gradients = {}
+		except:
+			LogUtil.exception_handler()
+
+
+	def node(self,op,*args):
+		"""Create node or return existing node with same operation and arguments after simplification."""
+		try:
+			args = tuple(arg if isinstance(arg,Symbol) else self.constant(arg) for arg in args)
+			simplified = self.simplify(op,args)
+			if simplified is not None:
+				return simplified
+
+			return self.register((op,) + tuple(arg.key for arg in args),op,args)
+		except:
+			LogUtil.exception_handler()
+
+
+	def register(self,signature,op,args):
+		"""Return node with given signature, creating it with a new integer key if it does not exist."""
+		try:
+			if signature not in self.nodes:
+				self.nodes[signature] = Symbol(self,op,args,len(self.nodes))
+
+			return self.nodes[signature]
+		except:
+			LogUtil.exception_handler()
+
+
+	def constant(self,value):
+		"""Constant node."""
+		try:
+			value = float(value)
+			return self.register(('const',value),'const',(value,))
+		except:
+			LogUtil.exception_handler()
+
+
+	def input(self,name,index=None):
+		"""Input node for time, state, or parameter."""
+		try:
+			return self.register(('input',name,index),'input',(name,index))
+		except:
+			LogUtil.exception_handler()
+
+
+	def simplify(self,op,args):
+		"""Fold constants and remove operations with identity elements."""
+		try:
+			if all(arg.op == 'const' for arg in args):
+				return self.constant(evaluate[op](*[arg.args[0] for arg in args]))
+
+			values = [arg.args[0] if arg.op == 'const' else None for arg in args]
+			if op == 'add':
+				if values[0] == 0.0:
+					return args[1]
+				if values[1] == 0.0:
+					return args[0]
+			elif op == 'sub':
+				if values[1] == 0.0:
+					return args[0]
+				if values[0] == 0.0:
+					return self.node('neg',args[1])
+				if args[0] is args[1]:
+					return self.constant(0.0)
+			elif op == 'mul':
+				if values[0] == 0.0 or values[1] == 0.0:
+					return self.constant(0.0)
+				if values[0] == 1.0:
+					return args[1]
+				if values[1] == 1.0:
+					return args[0]
+				if values[0] == -1.0:
+					return self.node('neg',args[1])
+				if values[1] == -1.0:
+					return self.node('neg',args[0])
+			elif op == 'div':
+				if values[0] == 0.0:
+					return self.constant(0.0)
+				if values[1] == 1.0:
+					return args[0]
+			elif op == 'neg':
+				if args[0].op == 'neg':
+					return args[0].args[0]
+			elif op == 'where':
+				if values[0] is not None:
+					return args[1] if values[0] else args[2]
+				if args[1] is args[2]:
+					return args[1]
+
+			return None
+		except:
+			LogUtil.exception_handler()
+
+
+	def gradient(self,symbol):
+		"""Derivatives of an expression with respect to states as dictionary of state index and expression."""
+		try:
+			if symbol.key in self.gradients:
+				return self.gradients[symbol.key]
+
+			for node in postorder([symbol]): #Children are differentiated before parents
+				if node.key not in self.gradients:
+					self.gradients[node.key] = self.differentiate(node)
+
+			return self.gradients[symbol.key]
+		except:
+			LogUtil.exception_handler()
+
+
+	def differentiate(self,node):
+		"""Derivatives of a node given derivatives of its arguments."""
+		try:
+			op = node.op
+			if op == 'const':
+				return {}
+			if op == 'input':
+				return {node.args[1]:self.constant(1.0)} if node.args[0] == 'y' else {}
+			if op in ['gt','lt']: #Derivative of logical conditions is zero
+				return {}
+
+			da = [self.gradients[arg.key] for arg in node.args]
+			a = node.args
+			if op == 'add':
+				return combine(da[0],da[1],lambda x,y:x + y)
+			if op == 'sub':
+				return combine(da[0],da[1],lambda x,y:x - y)
+			if op == 'neg':
+				return {j:-d for j,d in da[0].items()}
+			if op == 'mul':
+				return combine({j:d*a[1] for j,d in da[0].items()},{j:a[0]*d for j,d in da[1].items()},lambda x,y:x + y)
+			if op == 'div':
+				return combine({j:d/a[1] for j,d in da[0].items()},{j:(a[0]*d)/(a[1]*a[1]) for j,d in da[1].items()},lambda x,y:x - y)
+			if op == 'exp':
+				return {j:node*d for j,d in da[0].items()}
+			if op == 'sin':
+				return {j:self.node('cos',a[0])*d for j,d in da[0].items()}
+			if op == 'cos':
+				return {j:-(self.node('sin',a[0])*d) for j,d in da[0].items()}
+			if op == 'sqrt':
+				return {j:d/(2.0*node) for j,d in da[0].items()}
+			if op == 'abs':
+				return {j:self.node('where',self.node('gt',a[0],0.0),d,-d) for j,d in da[0].items()}
+			if op == 'min':
+				return combine(da[0],da[1],lambda x,y:self.node('where',self.node('lt',a[0],a[1]),x,y))
+			if op == 'max':
+				return combine(da[0],da[1],lambda x,y:self.node('where',self.node('gt',a[0],a[1]),x,y))
+			if op == 'where':
+				return combine(da[1],da[2],lambda x,y:self.node('where',a[0],x,y))
+
+			raise ValueError('Derivative of operation {} is not defined!'.format(op))
+		except:
+			LogUtil.exception_handler()
+
+
+class Symbol(object):
+	"""Real valued node in `ExpressionGraph` supporting the arithmetic used in model equations."""
+
+	__slots__ = ['graph','op','args','key']
+
+	def __init__(self,graph,op,args,key):
+		"""Creates a node."""
+		self.graph = graph
+		self.op = op
+		self.args = args
+		self.key = key
+
+	def __add__(self,other):
+		if isinstance(other,(complex,Complex)):
+			return Complex(self,0.0) + other
+		return self.graph.node('add',self,other)
+
+	def __radd__(self,other):
+		if isinstance(other,complex):
+			return Complex(other.real,other.imag) + self
+		return self.graph.node('add',other,self)
+
+	def __sub__(self,other):
+		if isinstance(other,(complex,Complex)):
+			return Complex(self,0.0) - other
+		return self.graph.node('sub',self,other)
+
+	def __rsub__(self,other):
+		if isinstance(other,complex):
+			return Complex(other.real,other.imag) - self
+		return self.graph.node('sub',other,self)
+
+	def __mul__(self,other):
+		if isinstance(other,(complex,Complex)):
+			return Complex(self,0.0)*other
+		return self.graph.node('mul',self,other)
+
+	def __rmul__(self,other):
+		if isinstance(other,complex):
+			return Complex(other.real,other.imag)*self
+		return self.graph.node('mul',other,self)
+
+	def __truediv__(self,other):
+		if isinstance(other,(complex,Complex)):
+			return Complex(self,0.0)/other
+		return self.graph.node('div',self,other)
+
+	def __rtruediv__(self,other):
+		if isinstance(other,complex):
+			return Complex(other.real,other.imag)/self
+		return self.graph.node('div',other,self)
+
+	__div__ = __truediv__
+	__rdiv__ = __rtruediv__
+
+	def __neg__(self):
+		return self.graph.node('neg',self)
+
+	def __pos__(self):
+		return self
+
+	def __abs__(self):
+		return self.graph.node('abs',self)
+
+	def __gt__(self,other):
+		return self.graph.node('gt',self,other)
+
+	def __lt__(self,other):
+		return self.graph.node('lt',self,other)
+
+	def __and__(self,other): #Logical and of conditions with values 0.0 or 1.0
+		return self.graph.node('mul',self,other)
+
+	__rand__ = __and__
+
+	def __bool__(self):
+		raise ValueError('Model equations should not branch on symbolic values!')
+
+	__nonzero__ = __bool__
+
+	@property
+	def real(self):
+		return self
+
+	@property
+	def imag(self):
+		return 0.0
+
+	def conjugate(self):
+		return self
+
+
+class Complex(object):
+	"""Complex value with real and imaginary parts that are `Symbol` or float."""
+
+	__slots__ = ['re','im']
+
+	def __init__(self,re,im):
+		"""Creates a complex value."""
+		self.re = re
+		self.im = im
+
+	@staticmethod
+	def convert(value):
+		"""Convert number or `Symbol` to `Complex`."""
+		if isinstance(value,Complex):
+			return value
+		if isinstance(value,complex):
+			return Complex(value.real,value.imag)
+		return Complex(value,0.0)
+
+	def __add__(self,other):
+		other = Complex.convert(other)
+		return Complex(self.re + other.re,self.im + other.im)
+
+	__radd__ = __add__
+
+	def __sub__(self,other):
+		other = Complex.convert(other)
+		return Complex(self.re - other.re,self.im - other.im)
+
+	def __rsub__(self,other):
+		return Complex.convert(other) - self
+
+	def __mul__(self,other):
+		other = Complex.convert(other)
+		return Complex(self.re*other.re - self.im*other.im,self.re*other.im + self.im*other.re)
+
+	__rmul__ = __mul__
+
+	def __truediv__(self,other):
+		other = Complex.convert(other)
+		denominator = other.re*other.re + other.im*other.im
+		return Complex((self.re*other.re + self.im*other.im)/denominator,(self.im*other.re - self.re*other.im)/denominator)
+
+	def __rtruediv__(self,other):
+		return Complex.convert(other)/self
+
+	__div__ = __truediv__
+	__rdiv__ = __rtruediv__
+
+	def __neg__(self):
+		return Complex(-self.re,-self.im)
+
+	def __abs__(self):
+		return sqrt(self.re*self.re + self.im*self.im)
+
+	@property
+	def real(self):
+		return self.re
+
+	@property
+	def imag(self):
+		return self.im
+
+	def conjugate(self):
+		return Complex(self.re,-self.im)
+
+
+def _unary(op,function):
+	"""Function that creates a node for `Symbol` arguments and evaluates numbers directly."""
+	def unary(x):
+		if isinstance(x,Symbol):
+			return x.graph.node(op,x)
+		return function(x)
+	return unary
+
+
+exp = _unary('exp',math.exp)
+sin = _unary('sin',math.sin)
+cos = _unary('cos',math.cos)
+sqrt = _unary('sqrt',math.sqrt)
+
+
+def cexp(z):
+	"""Complex exponential."""
+	z = Complex.convert(z)
+	magnitude = exp(z.re)
+	return Complex(magnitude*cos(z.im),magnitude*sin(z.im))
+
+
+def minimum(a,b):
+	"""Minimum of two values."""
+	graph = a.graph if isinstance(a,Symbol) else b.graph
+	return graph.node('min',a,b)
+
+
+def maximum(a,b):
+	"""Maximum of two values."""
+	graph = a.graph if isinstance(a,Symbol) else b.graph
+	return graph.node('max',a,b)
+
+
+evaluate = {'add':lambda a,b:a + b,'sub':lambda a,b:a - b,'mul':lambda a,b:a*b,'div':lambda a,b:a/b,'neg':lambda a:-a,
+			'exp':math.exp,'sin':math.sin,'cos':math.cos,'sqrt':math.sqrt,'abs':abs,
+			'gt':lambda a,b:float(a > b),'lt':lambda a,b:float(a < b),'min':min,'max':max,
+			'where':lambda c,a,b:a if c else b}
+
+render = {'add':'({} + {})','sub':'({} - {})','mul':'({}*{})','div':'({}/{})','neg':'(-{})',
+		  'exp':'exp({})','sin':'sin({})','cos':'cos({})','sqrt':'sqrt({})','abs':'abs({})',
+		  'gt':'(1.0 if {} > {} else 0.0)','lt':'(1.0 if {} < {} else 0.0)','min':'min({},{})','max':'max({},{})',
+		  'where':'({1} if {0} else {2})'}
+
+
+def combine(da,db,operation):
+	"""Combine two sparse gradients with missing entries treated as zero."""
+	result = {}
+	for j in set(da) | set(db):
+		x = da.get(j,0.0)
+		y = db.get(j,0.0)
+		result[j] = operation(x,y)
+	return result
+
+
+def postorder(roots):
+	"""Nodes reachable from roots with arguments listed before the node."""
+	order = []
+	visited = set()
+	stack = [(root,False) for root in reversed(roots)]
+	while stack:
+		node,expanded = stack.pop()
+		if expanded:
+			order.append(node)
+		elif node.key not in visited:
+			visited.add(node.key)
+			stack.append((node,True))
+			if node.op not in ['const','input']:
+				stack.extend([(arg,False) for arg in reversed(node.args) if arg.key not in visited])
+	return order
+
+
+def model_equations(DER_model_type):
+	"""Symbolic derivatives and Jacobian entries of a DER model type.
+	Args:
+		 DER_model_type (str): Name of DER model class (e.g. 'SolarPVDERThreePhase').
+	Returns:
+		 tuple: Derivatives as list of `Symbol` and Jacobian entries as list of (row,column,`Symbol`).
+	"""
+	try:
+		graph = ExpressionGraph()
+		n_ODE = len(templates.DER_design_template[DER_model_type]['initial_states'])
+		y = [graph.input('y',k) for k in range(n_ODE)]
+		p = [graph.input('p',k) for k in range(DER_kernels.n_rhs_parameters)]
+		t = graph.input('t')
+
+		f = DER_kernels.rhs_kernel(t,y,p,functions=(exp,cexp,minimum,maximum),**DER_kernels.kernel_options[DER_model_type]['kernel_arguments'])
+		f = [fi if isinstance(fi,Symbol) else graph.constant(fi) for fi in f]
+		if len(f) != n_ODE:
+			raise ValueError('Number of derivatives {} is not equal to number of states {} for {}!'.format(len(f),n_ODE,DER_model_type))
+
+		jacobian = []
+		for row,fi in enumerate(f):
+			for column,entry in sorted(graph.gradient(fi).items()):
+				if not (entry.op == 'const' and entry.args[0] == 0.0):
+					jacobian.append((row,column,entry))
+
+		return f,jacobian
+	except:
+		LogUtil.exception_handler()
+
+
+def generate_expressions(roots,max_inline_depth=20):
+	"""Python statements computing roots with common sub-expressions assigned to temporary variables.
+	Returns:
+		 tuple: List of statements and list of expressions for roots.
+	"""
+	try:
+		order = postorder(roots)
+		references = {}
+		for node in order:
+			if node.op not in ['const','input']:
+				for arg in node.args:
+					references[arg.key] = references.get(arg.key,0) + 1
+		for root in roots:
+			references[root.key] = references.get(root.key,0) + 1
+
+		statements = []
+		expressions = {}
+		depth = {}
+		for node in order:
+			if node.op == 'const':
+				expressions[node.key] = repr(node.args[0])
+				depth[node.key] = 0
+			elif node.op == 'input':
+				name,index = node.args
+				expressions[node.key] = name if index is None else '{}_{}'.format(name,index)
+				depth[node.key] = 0
+			else:
+				expression = render[node.op].format(*[expressions[arg.key] for arg in node.args])
+				node_depth = 1 + max(depth[arg.key] for arg in node.args)
+				if references.get(node.key,0) > 1 or node_depth > max_inline_depth: #Shared or deeply nested expressions are computed once
+					name = '_{}'.format(len(statements))
+					statements.append('{} = {}'.format(name,expression))
+					expression,node_depth = name,0
+				expressions[node.key] = expression
+				depth[node.key] = node_depth
+
+		return statements,[expressions[root.key] for root in roots]
+	except:
+		LogUtil.exception_handler()
+
+
+def generate_source(DER_model_type):
+	"""Python source code of module with `rhs(t,y,p)` and `jac(t,y,p)` functions for a DER model type."""
+	try:
+		f,jacobian = model_equations(DER_model_type)
+		n_ODE = len(f)
+		inputs = ['\tif hasattr(y,"tolist"):','\t\ty = y.tolist()','\tif hasattr(p,"tolist"):','\t\tp = p.tolist()',
+				  '\t{}, = y'.format(','.join(['y_{}'.format(k) for k in range(n_ODE)])),
+				  '\t{}, = p'.format(','.join(['p_{}'.format(k) for k in range(DER_kernels.n_rhs_parameters)]))]
+
+		lines = ['"""Generated RHS and Jacobian for {} (do not edit)."""'.format(DER_model_type),'',
+				 'from math import exp,sin,cos,sqrt','import numpy as np','',
+				 'n_ODE = {}'.format(n_ODE),
+				 'jac_index = np.array([{}])'.format(','.join([str(row*n_ODE + column) for row,column,_ in jacobian])),'','']
+
+		statements,expressions = generate_expressions(f)
+		lines.extend(['def rhs(t,y,p):','\t"""Derivatives for the system of ODE\'s."""'] + inputs)
+		lines.extend(['\t' + statement for statement in statements])
+		lines.extend(['\treturn np.array([{}])'.format(',\n\t\t\t\t\t '.join(expressions)),'',''])
+
+		statements,expressions = generate_expressions([entry for _,_,entry in jacobian])
+		lines.extend(['def jac(t,y,p):','\t"""Jacobian for the system of ODE\'s."""'] + inputs)
+		lines.extend(['\t' + statement for statement in statements])
+		lines.extend(['\tJ = np.zeros(n_ODE*n_ODE)',
+					  '\tJ[jac_index] = [{}]'.format(',\n\t\t\t\t\t '.join(expressions)),
+					  '\treturn J.reshape((n_ODE,n_ODE))',''])
+		LogUtil.logger.debug('Generated code for {} with {} Jacobian entries.'.format(DER_model_type,len(jacobian)))
+
+		return '\n'.join(lines)
+	except:
+		LogUtil.exception_handler()
+
+
+def get_cache_key(DER_model_type):
+	"""Key that changes if model equations, code generator, or design template of DER model type changes."""
+	try:
+		key = hashlib.sha1()
+		for module in [DER_kernels,sys.modules[__name__]]:
+			with open(module.__file__.replace('.pyc','.py'),'rb') as source_file:
+				key.update(source_file.read())
+		key.update(repr(sorted(templates.DER_design_template[DER_model_type]['initial_states'])).encode())
+		key.update(__version__.encode())
+
+		return key.hexdigest()[:16]
+	except:
+		LogUtil.exception_handler()
+
+
+def get_generated_functions(DER_model_type):
+	"""Generated `rhs` and `jac` functions for DER model type, loaded from disk cache or generated and cached.
+	Args:
+		 DER_model_type (str): Name of DER model class (e.g. 'SolarPVDERThreePhase').
+	Returns:
+		 tuple: `rhs(t,y,p)` and `jac(t,y,p)` functions.
+	"""
+	try:
+		if DER_model_type in _generated_functions:
+			return _generated_functions[DER_model_type]
+
+		module_name = 'pvder_generated_{}_{}'.format(DER_model_type,get_cache_key(DER_model_type))
+		file_name = os.path.join(defaults.codegen_cache_directory,module_name + '.py')
+		if not os.path.exists(file_name):
+			source = generate_source(DER_model_type)
+			try:
+				if not os.path.exists(defaults.codegen_cache_directory):
+					os.makedirs(defaults.codegen_cache_directory)
+				temporary_file_name = file_name + '.{}.tmp'.format(os.getpid())
+				with open(temporary_file_name,'w') as source_file:
+					source_file.write(source)
+				os.replace(temporary_file_name,file_name) #Other processes never see a partially written file
+				LogUtil.logger.debug('Generated code for {} was cached in {}.'.format(DER_model_type,file_name))
+			except OSError:
+				LogUtil.logger.debug('Generated code for {} could not be cached in {} - using code from memory.'.format(DER_model_type,defaults.codegen_cache_directory))
+				namespace = {}
+				exec(compile(source,module_name,'exec'),namespace)
+				_generated_functions[DER_model_type] = (namespace['rhs'],namespace['jac'])
+				return _generated_functions[DER_model_type]
+
+		spec = importlib.util.spec_from_file_location(module_name,file_name)
+		module = importlib.util.module_from_spec(spec)
+		spec.loader.exec_module(module)
+		_generated_functions[DER_model_type] = (module.rhs,module.jac)
+
+		return _generated_functions[DER_model_type]
+	except:
+		LogUtil.exception_handler()
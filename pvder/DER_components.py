@@ -364,6 +364,25 @@ class PVModule(object):
 		except:
 			LogUtil.exception_handler()
 
+	def Ppv_time_series(self,Sinsol_t,Tactual_t,Vdc_actual_t):
+		"""PV panel power output for time series of solar insolation, temperature, and DC link voltage without updating the module.
+		
+		Args:
+		  Sinsol_t (array): Solar insolation in percentage.
+		  Tactual_t (array): Module temperature in Kelvin.
+		  Vdc_actual_t (array): DC link voltage in volts.
+		  
+		Returns:
+			 array: Power output from PV module in p.u.
+		"""
+		try:
+			Iph_t = (self.Iscr+(self.Kv*(Tactual_t-self.T0)))*(Sinsol_t/100.0)
+			Ipv_t = (self.Np*Iph_t)-(self.Np*self.Irs*(np.exp((self.q*Vdc_actual_t)/(self.k*Tactual_t*self.A*self.Ns))-1))
+		
+			return np.maximum(0,(Ipv_t*Vdc_actual_t))/BaseValues.Sbase
+		except:
+			LogUtil.exception_handler()
+
 	def fit_MPP_poly(self):
 		"""Method to fit MPP to a polynomial function."""
 		try:
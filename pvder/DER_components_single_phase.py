@@ -14,7 +14,7 @@ from scipy.optimize import fsolve, minimize
 
 from pvder.DER_components import SolarPVDER,PVModule
 
-from pvder import utility_functions
+from pvder import utility_functions,DER_kernels
 from pvder import defaults,templates
 from pvder.logutil import LogUtil
 
@@ -225,6 +225,21 @@ class SolarPVDERSinglePhase(PVModule,SolarPVDER):
 		except:
 			LogUtil.exception_handler()
 
+	@staticmethod
+	def rhs(t,y,params):
+		"""Stateless derivatives for the system of ODE's.
+		Args:
+			 t (float): Simulation time in seconds.
+			 y (ndarray): States with shape (n_ODE,) or (n_ODE,N).
+			 params (ndarray): Parameters from `get_rhs_parameters()` with shape (n_rhs_parameters,) or (n_rhs_parameters,N).
+		Returns:
+			 ndarray: Derivatives for the system of ODE's.
+		"""
+		try:
+			return DER_kernels.rhs_single_phase(t,y,params)
+		except:
+			LogUtil.exception_handler()
+
 	def ODE_model(self,y,t):
 		"""System of ODE's defining the dynamic DER model.
 		Args:
@@ -255,8 +270,7 @@ class SolarPVDERSinglePhase(PVModule,SolarPVDER):
 		
 			self.update_inverter_frequency(t)
 		
-			self.update_ridethrough_flags(t)
-			self.disconnect_or_reconnect(t)
+			self.ridethrough_and_connection_logic(t)
 		
 			#Phase a inverter output current
 			diaR = (1/self.Lf)*(-self.Rf*self.ia.real - self.va.real + self.vta.real) + (self.winv/self.wbase)*self.ia.imag 
@@ -368,8 +382,7 @@ class SolarPVDERSinglePhase(PVModule,SolarPVDER):
 			#d-q transformation
 			self.update_inverter_frequency(t)
 		
-			self.update_ridethrough_flags(t)
-			self.disconnect_or_reconnect(t)
+			self.ridethrough_and_connection_logic(t)
 			#Phase a inverter output current
 		
 			ra,theta_a = cmath.polar(self.va)
@@ -391,7 +404,7 @@ class SolarPVDERSinglePhase(PVModule,SolarPVDER):
 			J[varInd['iaI'],varInd['uaI']]= (self.Vdc*self.Kp_GCC)/(2*self.Lf)
 			J[varInd['iaI'],varInd['Vdc']]= (self.xa.imag+self.ua.imag*self.Kp_GCC)/(2*self.Lf)
 			J[varInd['iaI'],varInd['xPLL']]= -self.ia.real/self.wbase
-			J[varInd['iaI'],varInd['wte']] = ((self.Kp_PLL*self.ia.real*ra)/self.wbase)*(-math.cos(theta_a)*math.sin(self.wte)
+			J[varInd['iaI'],varInd['wte']] = -((self.Kp_PLL*self.ia.real*ra)/self.wbase)*(-math.cos(theta_a)*math.sin(self.wte)
 																						+ math.cos(theta_a-math.pi/2)*math.cos(self.wte))
 			
 			#Current controller dynamics
@@ -12,7 +12,7 @@ import warnings
 from pvder.DER_components import SolarPVDER,PVModule
 from pvder.grid_components import BaseValues
 
-from pvder import utility_functions
+from pvder import utility_functions,DER_kernels
 from pvder import defaults,templates
 from pvder.logutil import LogUtil
 
@@ -225,6 +225,21 @@ class SolarPVDERSinglePhaseConstantVdc(PVModule,SolarPVDER):
 			LogUtil.exception_handler()
 
 
+	@staticmethod
+	def rhs(t,y,params):
+		"""Stateless derivatives for the system of ODE's.
+		Args:
+			 t (float): Simulation time in seconds.
+			 y (ndarray): States with shape (n_ODE,) or (n_ODE,N).
+			 params (ndarray): Parameters from `get_rhs_parameters()` with shape (n_rhs_parameters,) or (n_rhs_parameters,N).
+		Returns:
+			 ndarray: Derivatives for the system of ODE's.
+		"""
+		try:
+			return DER_kernels.rhs_single_phase_constant_Vdc(t,y,params)
+		except:
+			LogUtil.exception_handler()
+
 	def ODE_model(self,y,t):
 		"""System of ODE's defining the dynamic DER model.
 		Args:
@@ -253,8 +268,7 @@ class SolarPVDERSinglePhaseConstantVdc(PVModule,SolarPVDER):
 		
 			self.update_inverter_frequency(t)
 		
-			self.update_ridethrough_flags(t)
-			self.disconnect_or_reconnect(t)
+			self.ridethrough_and_connection_logic(t)
 		
 			#Phase a inverter output current
 			diaR = (1/self.Lf)*(-self.Rf*self.ia.real - self.va.real + self.vta.real) + (self.winv/self.wbase)*self.ia.imag 
@@ -366,8 +380,7 @@ class SolarPVDERSinglePhaseConstantVdc(PVModule,SolarPVDER):
 			#d-q transformation
 			self.update_inverter_frequency(t)
 		
-			self.update_ridethrough_flags(t)
-			self.disconnect_or_reconnect(t)
+			self.ridethrough_and_connection_logic(t)
 			#Phase a inverter output current
 		
 			ra,theta_a = cmath.polar(self.va)
@@ -387,7 +400,7 @@ class SolarPVDERSinglePhaseConstantVdc(PVModule,SolarPVDER):
 			J[varInd['iaI'],varInd['xaI']]= self.Vdc/(2*self.Lf) 
 			J[varInd['iaI'],varInd['uaI']]= (self.Vdc*self.Kp_GCC)/(2*self.Lf)
 			J[varInd['iaI'],varInd['xPLL']]= -self.ia.real/self.wbase
-			J[varInd['iaI'],varInd['wte']] = ((self.Kp_PLL*self.ia.real*ra)/self.wbase)*(-math.cos(theta_a)*math.sin(self.wte)
+			J[varInd['iaI'],varInd['wte']] = -((self.Kp_PLL*self.ia.real*ra)/self.wbase)*(-math.cos(theta_a)*math.sin(self.wte)
 																						+ math.cos(theta_a-math.pi/2)*math.cos(self.wte))
 			
 			#Current controller dynamics
@@ -14,7 +14,7 @@ from pvder.DER_check_and_initialize import PVDER_SetupUtilities
 from pvder.DER_features import PVDER_SmartFeatures
 from pvder.DER_utilities import PVDER_ModelUtilities
 from pvder.grid_components import BaseValues
-from pvder import utility_functions
+from pvder import utility_functions,DER_kernels
 from pvder import defaults,templates
 from pvder.logutil import LogUtil
 
@@ -29,6 +29,14 @@ class SolarPVDERThreePhase(PVModule,SolarPVDER):
 	"""
 	count = 0 #Object count
 
+	#Jacobian entries that depend on states and inputs in the order they are filled by `jac_ODE_model`
+	jac_variable_entries = [entry for ph in ['a','b','c'] for entry in
+							[('i'+ph+'R','i'+ph+'I'),('i'+ph+'R','x'+ph+'R'),('i'+ph+'R','u'+ph+'R'),('i'+ph+'R','Vdc'),('i'+ph+'R','xPLL'),('i'+ph+'R','wte'),
+							 ('i'+ph+'I','i'+ph+'R'),('i'+ph+'I','x'+ph+'I'),('i'+ph+'I','u'+ph+'I'),('i'+ph+'I','Vdc'),('i'+ph+'I','xPLL'),('i'+ph+'I','wte')]] +\
+						   [(row,column) for row in ['uaI','ubR','ubI','ucR','ucI'] for column in ['iaR','iaI','ibR','ibI','icR','icI']] +\
+						   [('Vdc',state+ph+part) for ph in ['a','b','c'] for state,part in [('i','R'),('i','I'),('x','R'),('x','I'),('u','R'),('u','I')]] +\
+						   [('Vdc','Vdc')] + [('xQ',column) for column in ['iaR','iaI','ibR','ibI','icR','icI']] + [('xPLL','wte'),('wte','wte')]
+
 	def __init__(self,events,configFile=None,**kwargs):		
 		"""Creates an instance of `SolarPV_DER_ThreePhase`.
 		Args:
@@ -257,6 +265,21 @@ class SolarPVDERThreePhase(PVModule,SolarPVDER):
 			LogUtil.exception_handler()
 
 
+	@staticmethod
+	def rhs(t,y,params):
+		"""Stateless derivatives for the system of ODE's.
+		Args:
+			 t (float): Simulation time in seconds.
+			 y (ndarray): States with shape (n_ODE,) or (n_ODE,N).
+			 params (ndarray): Parameters from `get_rhs_parameters()` with shape (n_rhs_parameters,) or (n_rhs_parameters,N).
+		Returns:
+			 ndarray: Derivatives for the system of ODE's.
+		"""
+		try:
+			return DER_kernels.rhs_three_phase(t,y,params)
+		except:
+			LogUtil.exception_handler()
+
 	def ODE_model(self,y,t):
 		"""Derivatives for the equation."""
 		try:
@@ -284,8 +307,7 @@ class SolarPVDERThreePhase(PVModule,SolarPVDER):
 		
 			self.update_inverter_frequency(t)
 		
-			self.update_ridethrough_flags(t)
-			self.disconnect_or_reconnect(t)
+			self.ridethrough_and_connection_logic(t)
 		
 			#Phase a inverter output current
 			diaR = (1/self.Lf)*(-self.Rf*self.ia.real - self.va.real + self.vta.real) + (self.winv/self.wbase)*self.ia.imag 
@@ -454,6 +476,27 @@ class SolarPVDERThreePhase(PVModule,SolarPVDER):
 			LogUtil.exception_handler()
 
 
+	def jac_constant_entries(self):
+		"""Jacobian entries that only depend on parameters (anti-windup is applied separately by zeroing rows)."""
+		try:
+			Rf_Lf = -self.Rf/self.Lf
+			wp,Kp_DC = self.wp,self.Kp_DC
+			entries = []
+			for ph in ['a','b','c']:
+				entries.extend([('i'+ph+'R','i'+ph+'R',Rf_Lf),('i'+ph+'I','i'+ph+'I',Rf_Lf),
+								('x'+ph+'R','u'+ph+'R',self.Ki_GCC),('x'+ph+'I','u'+ph+'I',self.Ki_GCC),
+								('u'+ph+'R','u'+ph+'R',-wp),('u'+ph+'I','u'+ph+'I',-wp)])
+			entries.extend([('uaR','iaR',-wp),('uaR','Vdc',-wp*Kp_DC),('uaR','xDC',wp),('uaI','xQ',wp),
+							('ubR','Vdc',0.5*wp*Kp_DC),('ubR','xDC',-0.5*wp),('ubR','xQ',0.866025403*wp),
+							('ubI','Vdc',0.866025403*Kp_DC*wp),('ubI','xDC',-0.866025403*wp),('ubI','xQ',-0.5*wp),
+							('ucR','Vdc',0.5*wp*Kp_DC),('ucR','xDC',-0.5*wp),('ucR','xQ',-0.866025403*wp),
+							('ucI','Vdc',-0.8660254037*Kp_DC*wp),('ucI','xDC',0.8660254037*wp),('ucI','xQ',-0.5*wp),
+							('xDC','Vdc',-self.Ki_DC),('wte','xPLL',1.0)])
+			return entries
+		except:
+			LogUtil.exception_handler()
+
+
 	def jac_ODE_model(self,y,t):
 		"""Jacobian for the system of ODE's."""
 		try:
@@ -469,458 +512,87 @@ class SolarPVDERThreePhase(PVModule,SolarPVDER):
 										xPLL,wte)
 
 			J = self.J
-			varInd = self.varInd 
 			self.update_Ppv(t)
-		
 			self.update_voltages()
-			self.update_power()
-			self.update_RMS()
+			self.S_PCC = self.S_PCC_calc() #Only reactive power at PCC is needed for anti-windup logic
+			if self.VOLT_VAR_ENABLE:
+				self.update_RMS()
 		
 			self.update_Qref(t)
 			self.update_Vdc_ref(t)	
 			self.update_iref()
-		
-			#d-q transformation
-			self.update_inverter_frequency(t)
-		
-			self.update_ridethrough_flags(t)
-			self.disconnect_or_reconnect(t)
-		
-			#Phase a inverter output current
-		
-			ra,theta_a = cmath.polar(self.va)
-			rb,theta_b = cmath.polar(self.vb)
-			rc,theta_c = cmath.polar(self.vc)
-			theta_a = self.wgrid_measured*t + theta_a - math.pi/2
-			theta_b = self.wgrid_measured*t + theta_b - math.pi/2
-			theta_c = self.wgrid_measured*t + theta_c - math.pi/2
+			self.update_inverter_frequency(t) #d-q transformation
 			
-			J[varInd['iaR'],varInd['iaR']] = -self.Rf/self.Lf			
-			J[varInd['iaR'],varInd['iaI']] = (self.xPLL+self.Kp_PLL*self.vd+2*math.pi*60)/self.wbase
-			J[varInd['iaR'],varInd['xaR']] = self.Vdc/(2*self.Lf)
-			J[varInd['iaR'],varInd['uaR']] = (self.Vdc*self.Kp_GCC)/(2*self.Lf)
-			J[varInd['iaR'],varInd['Vdc']] = (self.xa.real+self.ua.real*self.Kp_GCC)/(2*self.Lf)
-			J[varInd['iaR'],varInd['xPLL']] = self.ia.imag/self.wbase
-			J[varInd['iaR'],varInd['wte']] = (2/3)*((self.Kp_PLL*self.ia.imag)/self.wbase)*(-ra*math.cos(theta_a)*math.sin(self.wte)
-											 + 0.5*rb*math.cos(theta_b)*math.sin(self.wte) + 0.8660254037*rb*math.cos(theta_b)*math.cos(self.wte)
-											 + 0.5*rc*math.cos(theta_c)*math.sin(self.wte) - 0.8660254037*rc*math.cos(theta_c)*math.cos(self.wte))
-		
-			J[varInd['iaI'],varInd['iaR']]= -(self.xPLL+self.Kp_PLL*self.vd+2*math.pi*60)/self.wbase
-			J[varInd['iaI'],varInd['iaI']]= -self.Rf/self.Lf
-			J[varInd['iaI'],varInd['xaI']]= self.Vdc/(2*self.Lf) 
-			J[varInd['iaI'],varInd['uaI']]= (self.Vdc*self.Kp_GCC)/(2*self.Lf)
-			J[varInd['iaI'],varInd['Vdc']]= (self.xa.imag+self.ua.imag*self.Kp_GCC)/(2*self.Lf)
-			J[varInd['iaI'],varInd['xPLL']]= -self.ia.real/self.wbase
-			J[varInd['iaI'],varInd['wte']] = -(2/3)*((self.Kp_PLL*self.ia.real)/self.wbase)*(-ra*math.cos(theta_a)*math.sin(self.wte) 
-											 + 0.5*rb*math.cos(theta_b)*math.sin(self.wte) + 0.8660254037*rb*math.cos(theta_b)*math.cos(self.wte)
-											 + 0.5*rc*math.cos(theta_c)*math.sin(self.wte) - 0.8660254037*rc*math.cos(theta_c)*math.cos(self.wte))
+			#Constant entries are restored on every call since anti-windup may have zeroed them
+			constant_parameters = (self.Rf,self.Lf,self.Ki_GCC,self.wp,self.Kp_DC,self.Ki_DC)
+			if getattr(self,'_jac_constant_parameters',None) != constant_parameters:
+				entries = self.jac_constant_entries()
+				self._jac_constant_index = self.jacobian_flat_index([(row,column) for row,column,_ in entries])
+				self._jac_constant_values = np.array([value for _,_,value in entries])
+				self._jac_constant_parameters = constant_parameters
+			if getattr(self,'_jac_variable_index',None) is None:
+				self._jac_variable_index = self.jacobian_flat_index(self.jac_variable_entries)
+			Jflat = J.reshape(-1) #View of Jacobian array
+			Jflat[self._jac_constant_index] = self._jac_constant_values
 			
-			#Current controller dynamics
-			if abs(self.Kp_GCC*self.ua + self.xa)>self.m_limit*1e1:
-				if np.sign(self.Ki_GCC*self.ua.real) == np.sign(self.xa.real):
-					J[varInd['xaR'],varInd['uaR']]=0.0
-				else:
-					J[varInd['xaR'],varInd['uaR']]=self.Ki_GCC
-				if np.sign(self.Ki_GCC*self.ua.imag) == np.sign(self.xa.imag):
-					J[varInd['xaI'],varInd['uaI']]=0.0
-				else:
-					J[varInd['xaI'],varInd['uaI']]=self.Ki_GCC
-				
-			else:
-					J[varInd['xaR'],varInd['uaR']]=self.Ki_GCC
-					J[varInd['xaI'],varInd['uaI']]=self.Ki_GCC
-		
-			if abs(self.Kp_GCC*self.ua + self.xa)>self.m_limit*1e1:
-				if np.sign( (self.wp)*(-self.ua.real +	self.ia_ref.real - self.ia.real)) == np.sign(self.ua.real):
-					J[varInd['uaR'],varInd['iaR']]= 0.0
-					J[varInd['uaR'],varInd['uaR']]= 0.0
-					J[varInd['uaR'],varInd['Vdc']]= 0.0
-					J[varInd['uaR'],varInd['xDC']]= 0.0	 
-				else:
-					#duaR = (self.wp)*(-self.ua.real +	self.ia_ref.real - self.ia.real)
-					J[varInd['uaR'],varInd['iaR']]= -self.wp
-					J[varInd['uaR'],varInd['uaR']]= -self.wp
-					J[varInd['uaR'],varInd['Vdc']]= -self.wp*self.Kp_DC
-					J[varInd['uaR'],varInd['xDC']]= self.wp					
-					
-				if np.sign((self.wp)*(-self.ua.imag +	self.ia_ref.imag - self.ia.imag)) == np.sign(self.ua.imag):
-					#duaI = 0.0
-					J[varInd['uaI'],varInd['iaR']]= 0.0
-					J[varInd['uaI'],varInd['iaI']]= 0.0
-					J[varInd['uaI'],varInd['uaI']]= 0.0
-					J[varInd['uaI'],varInd['xQ']]= 0.0
-					
-					J[varInd['uaI'],varInd['ibR']]= 0.0
-					J[varInd['uaI'],varInd['ibI']]= 0.0
-					J[varInd['uaI'],varInd['icR']]= 0.0
-					J[varInd['uaI'],varInd['icI']]= 0.0
-				else:
-					#duaI = (self.wp)*(-self.ua.imag +	self.ia_ref.imag - self.ia.imag)
-					J[varInd['uaI'],varInd['iaR']]= (self.Kp_Q*self.wp*self.va.imag/2)
-					J[varInd['uaI'],varInd['iaI']]= -self.wp - (self.Kp_Q*self.wp*self.va.real/2)
-					J[varInd['uaI'],varInd['uaI']]= -self.wp
-					J[varInd['uaI'],varInd['xQ']]= self.wp
-					
-					J[varInd['uaI'],varInd['ibR']]= (self.Kp_Q*self.wp*self.vb.imag/2)
-					J[varInd['uaI'],varInd['ibI']]= - (self.Kp_Q*self.wp*self.vb.real/2)
-					J[varInd['uaI'],varInd['icR']]= (self.Kp_Q*self.wp*self.vc.imag/2)
-					J[varInd['uaI'],varInd['icI']]= - (self.Kp_Q*self.wp*self.vc.real/2)
-				
-			else:
-				#duaR = (self.wp)*(-self.ua.real +	self.ia_ref.real - self.ia.real)
-				#duaI = (self.wp)*(-self.ua.imag +	self.ia_ref.imag - self.ia.imag)
-				J[varInd['uaR'],varInd['iaR']]= -self.wp
-				J[varInd['uaR'],varInd['uaR']]= -self.wp
-				J[varInd['uaR'],varInd['Vdc']]= -self.wp*self.Kp_DC
-				J[varInd['uaR'],varInd['xDC']]= self.wp	 
-				
-				J[varInd['uaI'],varInd['iaR']]= (self.Kp_Q*self.wp*self.va.imag/2)
-				J[varInd['uaI'],varInd['iaI']]= -self.wp - (self.Kp_Q*self.wp*self.va.real/2)
-				J[varInd['uaI'],varInd['uaI']]= -self.wp
-				J[varInd['uaI'],varInd['xQ']]= self.wp
-				
-				J[varInd['uaI'],varInd['ibR']]= (self.Kp_Q*self.wp*self.vb.imag/2)
-				J[varInd['uaI'],varInd['ibI']]= - (self.Kp_Q*self.wp*self.vb.real/2)
-				J[varInd['uaI'],varInd['icR']]= (self.Kp_Q*self.wp*self.vc.imag/2)
-				J[varInd['uaI'],varInd['icI']]= - (self.Kp_Q*self.wp*self.vc.real/2)
-		
-			#Phase b inverter output current
-			#dibR = (1/self.Lf)*(-self.Rf*self.ib.real - self.vb.real + self.vtb.real) + (self.winv/self.wbase)*self.ib.imag 
-			#dibI = (1/self.Lf)*(-self.Rf*self.ib.imag - self.vb.imag + self.vtb.imag) - (self.winv/self.wbase)*self.ib.real	
+			#Phase angle terms of d-q transformation are shared by current and PLL rows
+			rotation = cmath.exp(1j*(self.wgrid_measured*t - math.pi/2))
+			va_t,vb_t,vc_t = (self.va*rotation).real,(self.vb*rotation).real,(self.vc*rotation).real
+			sin_wte,cos_wte = math.sin(self.wte),math.cos(self.wte)
+			dvd_dwte = (2/3)*(-va_t*sin_wte + 0.5*vb_t*sin_wte + 0.8660254037*vb_t*cos_wte
+								+ 0.5*vc_t*sin_wte - 0.8660254037*vc_t*cos_wte)
 			
-			J[varInd['ibR'],varInd['ibR']]= -self.Rf/self.Lf			
-			J[varInd['ibR'],varInd['ibI']]= (self.xPLL+self.Kp_PLL*self.vd+2*math.pi*60)/self.wbase
-			J[varInd['ibR'],varInd['xbR']]= self.Vdc/(2*self.Lf)
-			J[varInd['ibR'],varInd['ubR']]= (self.Vdc*self.Kp_GCC)/(2*self.Lf)
-			J[varInd['ibR'],varInd['Vdc']]= (self.xb.real+self.ub.real*self.Kp_GCC)/(2*self.Lf)
-			J[varInd['ibR'],varInd['xPLL']]= self.ib.imag/self.wbase	 
-			J[varInd['ibR'],varInd['wte']] = (2/3)*((self.Kp_PLL*self.ib.imag)/self.wbase)*(-ra*math.cos(theta_a)*math.sin(self.wte)
-											 + 0.5*rb*math.cos(theta_b)*math.sin(self.wte) + 0.8660254037*rb*math.cos(theta_b)*math.cos(self.wte)
-											 + 0.5*rc*math.cos(theta_c)*math.sin(self.wte) - 0.8660254037*rc*math.cos(theta_c)*math.cos(self.wte))
+			we_wbase = (self.xPLL+self.Kp_PLL*self.vd+2*math.pi*60)/self.wbase
+			Vdc_2Lf = self.Vdc/(2*self.Lf)
+			Kp_Vdc_2Lf = (self.Vdc*self.Kp_GCC)/(2*self.Lf)
+			Kp_PLL_wbase = self.Kp_PLL/self.wbase
+			K = self.Kp_Q*self.wp
+			va,vb,vc = self.va,self.vb,self.vc
 			
-			J[varInd['ibI'],varInd['ibR']]= -(self.xPLL+self.Kp_PLL*self.vd+2*math.pi*60)/self.wbase
-			J[varInd['ibI'],varInd['ibI']]= -self.Rf/self.Lf
-			J[varInd['ibI'],varInd['xbI']]= self.Vdc/(2*self.Lf)
-			J[varInd['ibI'],varInd['ubI']]= (self.Vdc*self.Kp_GCC)/(2*self.Lf)
-			J[varInd['ibI'],varInd['Vdc']]= (self.xb.imag+self.ub.imag*self.Kp_GCC)/(2*self.Lf)
-			J[varInd['ibI'],varInd['xPLL']]= -self.ib.real/self.wbase
-			J[varInd['ibI'],varInd['wte']] = -(2/3)*((self.Kp_PLL*self.ib.real)/self.wbase)*(-ra*math.cos(theta_a)*math.sin(self.wte) 
-											 + 0.5*rb*math.cos(theta_b)*math.sin(self.wte) + 0.8660254037*rb*math.cos(theta_b)*math.cos(self.wte)
-											 + 0.5*rc*math.cos(theta_c)*math.sin(self.wte) - 0.8660254037*rc*math.cos(theta_c)*math.cos(self.wte))
-		
-			#Current controller dynamics - Phase b
-		
-			if abs(self.Kp_GCC*self.ub + self.xb)>self.m_limit:
-				if np.sign(self.Ki_GCC*self.ub.real) == np.sign(self.xb.real):
-					#dxbR = 0.0
-					J[varInd['xbR'],varInd['ubR']]=0.0
-				else:
-					#dxbR = self.Ki_GCC*self.ub.real
-					J[varInd['xbR'],varInd['ubR']]=self.Ki_GCC
-				if np.sign(self.Ki_GCC*self.ub.imag) == np.sign(self.xb.imag):
-					#dxbI = 0.0
-					J[varInd['xbI'],varInd['ubI']]=0.0
-				else:
-					#dxbI = self.Ki_GCC*self.ub.imag
-					J[varInd['xbI'],varInd['ubI']]=self.Ki_GCC
-
-			else: 
-				#dxbR = self.Ki_GCC*self.ub.real
-				#dxbI = self.Ki_GCC*self.ub.imag
-				J[varInd['xbR'],varInd['ubR']]=self.Ki_GCC
-				J[varInd['xbI'],varInd['ubI']]=self.Ki_GCC
-		
-			if abs(self.Kp_GCC*self.ub + self.xb)>self.m_limit:
-				if np.sign( (self.wp)*(-self.ub.real +	self.ib_ref.real - self.ib.real)) == np.sign(self.ub.real):
-					#dubR = 0.0
-					J[varInd['ubR'],varInd['iaR']]= 0.0
-					J[varInd['ubR'],varInd['iaI']]= 0.0 
-					J[varInd['ubR'],varInd['ibR']]= 0.0
-					J[varInd['ubR'],varInd['ibI']]= 0.0
-					J[varInd['ubR'],varInd['ubR']]= 0.0
-					J[varInd['ubR'],varInd['icR']]= 0.0
-					J[varInd['ubR'],varInd['icI']]= 0.0
-				
-					J[varInd['ubR'],varInd['Vdc']]= 0.0
-					J[varInd['ubR'],varInd['xDC']]= 0.0
-					J[varInd['ubR'],varInd['xQ']]= 0.0
-				else:
-					#dubR = (self.wp)*(-self.ub.real +	self.ib_ref.real - self.ib.real)
-					J[varInd['ubR'],varInd['iaR']]= 0.866025403*(self.Kp_Q*self.wp*self.va.imag/2)
-					J[varInd['ubR'],varInd['iaI']]= -0.866025403*(self.Kp_Q*self.wp*self.va.real/2)
-					J[varInd['ubR'],varInd['ibR']]= -self.wp + 0.866025403*(self.Kp_Q*self.wp*self.vb.imag/2)
-					J[varInd['ubR'],varInd['ibI']]= -0.866025403*(self.Kp_Q*self.wp*self.vb.real/2)
-					J[varInd['ubR'],varInd['ubR']]= -self.wp
-					J[varInd['ubR'],varInd['icR']]= 0.866025403*(self.Kp_Q*self.wp*self.vc.imag/2)
-					J[varInd['ubR'],varInd['icI']]= -0.866025403*(self.Kp_Q*self.wp*self.vc.real/2)
-				
-					J[varInd['ubR'],varInd['Vdc']]= 0.5*self.wp*self.Kp_DC
-					J[varInd['ubR'],varInd['xDC']]= -0.5*self.wp	
-					J[varInd['ubR'],varInd['xQ']]= 0.866025403*self.wp
-					
-				if np.sign((self.wp)*(-self.ub.imag +	self.ib_ref.imag - self.ib.imag)) == np.sign(self.ub.imag):
-					#dubI = 0.0
-					J[varInd['ubI'],varInd['iaR']]= 0.0
-					J[varInd['ubI'],varInd['iaI']]= 0.0
-					J[varInd['ubI'],varInd['ibR']]= 0.0
-					J[varInd['ubI'],varInd['ibI']]= 0.0
-					J[varInd['ubI'],varInd['ubI']]= 0.0
-					J[varInd['ubI'],varInd['icR']]= 0.0
-					J[varInd['ubI'],varInd['icI']]= 0.0
-				
-					J[varInd['ubI'],varInd['Vdc']]= 0.0
-					J[varInd['ubI'],varInd['xDC']]= 0.0
-					J[varInd['ubI'],varInd['xQ']]= 0.0
-				
-				else:
-					#dubI = (self.wp)*(-self.ub.imag +	self.ib_ref.imag - self.ib.imag)
-					J[varInd['ubI'],varInd['iaR']]= -(self.Kp_Q*self.wp*self.va.imag/4)
-					J[varInd['ubI'],varInd['iaI']]= (self.Kp_Q*self.wp*self.va.real/4)
-					J[varInd['ubI'],varInd['ibR']]= -(self.Kp_Q*self.wp*self.vb.imag/4)
-					J[varInd['ubI'],varInd['ibI']]= -self.wp + (self.Kp_Q*self.wp*self.vb.real/4)
-					J[varInd['ubI'],varInd['ubI']]= -self.wp				
-					J[varInd['ubI'],varInd['icR']]= -(self.Kp_Q*self.wp*self.vc.imag/4)
-					J[varInd['ubI'],varInd['icI']]= (self.Kp_Q*self.wp*self.vc.real/4)
-				
-					J[varInd['ubI'],varInd['Vdc']]= 0.866025403*self.Kp_DC*self.wp
-					J[varInd['ubI'],varInd['xDC']]= -0.866025403*self.wp
-					J[varInd['ubI'],varInd['xQ']]= -0.5*self.wp
-					
-			else:
-				#dubR = (self.wp)*(-self.ub.real +	self.ib_ref.real - self.ib.real)
-				#dubI = (self.wp)*(-self.ub.imag +	self.ib_ref.imag - self.ib.imag)
-			
-				J[varInd['ubR'],varInd['iaR']]= 0.866025403*(self.Kp_Q*self.wp*self.va.imag/2)
-				J[varInd['ubR'],varInd['iaI']]= -0.866025403*(self.Kp_Q*self.wp*self.va.real/2)
-				J[varInd['ubR'],varInd['ibR']]= -self.wp + 0.866025403*(self.Kp_Q*self.wp*self.vb.imag/2)
-				J[varInd['ubR'],varInd['ibI']]= -0.866025403*(self.Kp_Q*self.wp*self.vb.real/2)
-				J[varInd['ubR'],varInd['ubR']]= -self.wp
-				J[varInd['ubR'],varInd['icR']]= 0.866025403*(self.Kp_Q*self.wp*self.vc.imag/2)
-				J[varInd['ubR'],varInd['icI']]= -0.866025403*(self.Kp_Q*self.wp*self.vc.real/2)
+			values = []
+			for i,x,u in [(self.ia,self.xa,self.ua),(self.ib,self.xb,self.ub),(self.ic,self.xc,self.uc)]:
+				values.extend([we_wbase,Vdc_2Lf,Kp_Vdc_2Lf,(x.real+u.real*self.Kp_GCC)/(2*self.Lf),i.imag/self.wbase,Kp_PLL_wbase*i.imag*dvd_dwte,
+							   -we_wbase,Vdc_2Lf,Kp_Vdc_2Lf,(x.imag+u.imag*self.Kp_GCC)/(2*self.Lf),-i.real/self.wbase,-Kp_PLL_wbase*i.real*dvd_dwte])
+			values.extend([K*va.imag/2,-self.wp - K*va.real/2,K*vb.imag/2,-K*vb.real/2,K*vc.imag/2,-K*vc.real/2]) #uaI
+			values.extend([0.866025403*(K*va.imag/2),-0.866025403*(K*va.real/2),-self.wp + 0.866025403*(K*vb.imag/2),
+						   -0.866025403*(K*vb.real/2),0.866025403*(K*vc.imag/2),-0.866025403*(K*vc.real/2)]) #ubR
+			values.extend([-(K*va.imag/4),(K*va.real/4),-(K*vb.imag/4),-self.wp + (K*vb.real/4),-(K*vc.imag/4),(K*vc.real/4)]) #ubI
+			values.extend([-0.866025403*(K*va.imag/2),0.866025403*(K*va.real/2),-0.866025403*(K*vb.imag/2),
+						   0.866025403*(K*vb.real/2),-self.wp -0.866025403*(K*vc.imag/2),0.866025403*(K*vc.real/2)]) #ucR
+			values.extend([-K*va.imag/4,K*va.real/4,-K*vb.imag/4,K*vb.real/4,-(K*vc.imag/4),-self.wp + (K*vc.real/4)]) #ucI
 			
-				J[varInd['ubR'],varInd['Vdc']]= 0.5*self.wp*self.Kp_DC
-				J[varInd['ubR'],varInd['xDC']]= -0.5*self.wp	
-				J[varInd['ubR'],varInd['xQ']]= 0.866025403*self.wp
-					
-				J[varInd['ubI'],varInd['iaR']]= -(self.Kp_Q*self.wp*self.va.imag/4)
-				J[varInd['ubI'],varInd['iaI']]= (self.Kp_Q*self.wp*self.va.real/4)
-				J[varInd['ubI'],varInd['ibR']]= -(self.Kp_Q*self.wp*self.vb.imag/4)
-				J[varInd['ubI'],varInd['ibI']]= -self.wp + (self.Kp_Q*self.wp*self.vb.real/4)
-				J[varInd['ubI'],varInd['ubI']]= -self.wp				
-				J[varInd['ubI'],varInd['icR']]= -(self.Kp_Q*self.wp*self.vc.imag/4)
-				J[varInd['ubI'],varInd['icI']]= (self.Kp_Q*self.wp*self.vc.real/4)
-				
-				J[varInd['ubI'],varInd['Vdc']]= 0.866025403*self.Kp_DC*self.wp
-				J[varInd['ubI'],varInd['xDC']]= -0.866025403*self.wp
-				J[varInd['ubI'],varInd['xQ']]= -0.5*self.wp					
+			#DC link voltage dynamics
+			for i,x,u in [(self.ia,self.xa,self.ua),(self.ib,self.xb,self.ub),(self.ic,self.xc,self.uc)]:
+				values.extend([-(x.real+self.Kp_GCC*u.real)/(4*self.C),-(x.imag+self.Kp_GCC*u.imag)/(4*self.C),
+							   -i.real/(4*self.C),-i.imag/(4*self.C),-(self.Kp_GCC*i.real)/(4*self.C),-(self.Kp_GCC*i.imag)/(4*self.C)])
+			values.append((-(self.q*self.Np*self.Irs*(self.Vdcbase**2))/(self.C*self.k*self.A*self.Ns*self.Tactual*self.Sbase))*math.exp((self.q*self.Vdc*self.Vdcbase)/(self.k*self.A*self.Ns*self.Tactual)))
 			
-			#Phase c inverter output current
-			#dicR = (1/self.Lf)*(-self.Rf*self.ic.real - self.vc.real + self.vtc.real) + (self.winv/self.wbase)*self.ic.imag 
-			#dicI = (1/self.Lf)*(-self.Rf*self.ic.imag - self.vc.imag + self.vtc.imag) - (self.winv/self.wbase)*self.ic.real 
-		
-			J[varInd['icR'],varInd['icR']]= -self.Rf/self.Lf			
-			J[varInd['icR'],varInd['icI']]= (self.xPLL+self.Kp_PLL*self.vd+2*math.pi*60)/self.wbase
-			J[varInd['icR'],varInd['xcR']]= self.Vdc/(2*self.Lf)
-			J[varInd['icR'],varInd['ucR']]= (self.Vdc*self.Kp_GCC)/(2*self.Lf)
-			J[varInd['icR'],varInd['Vdc']]= (self.xc.real+self.uc.real*self.Kp_GCC)/(2*self.Lf)
-			J[varInd['icR'],varInd['xPLL']]= self.ic.imag/self.wbase 
-			J[varInd['icR'],varInd['wte']] = (2/3)*((self.Kp_PLL*self.ic.imag)/self.wbase)*(-ra*math.cos(theta_a)*math.sin(self.wte)
-												+ 0.5*rb*math.cos(theta_b)*math.sin(self.wte) + 0.8660254037*rb*math.cos(theta_b)*math.cos(self.wte)
-												+ 0.5*rc*math.cos(theta_c)*math.sin(self.wte) - 0.8660254037*rc*math.cos(theta_c)*math.cos(self.wte))
+			#Reactive power controller and SRF-PLL dynamics
+			values.extend([(self.Ki_Q*va.imag/2),-(self.Ki_Q*va.real/2),(self.Ki_Q*vb.imag/2),-(self.Ki_Q*vb.real/2),(self.Ki_Q*vc.imag/2),-(self.Ki_Q*vc.real/2)])
+			values.extend([self.Ki_PLL*dvd_dwte,self.Kp_PLL*dvd_dwte])
+			Jflat[self._jac_variable_index] = values
 			
-			J[varInd['icI'],varInd['icR']]= -(self.xPLL+self.Kp_PLL*self.vd+2*math.pi*60)/self.wbase
-			J[varInd['icI'],varInd['icI']]= -self.Rf/self.Lf
-			J[varInd['icI'],varInd['xcI']]= self.Vdc/(2*self.Lf)
-			J[varInd['icI'],varInd['ucI']]= (self.Vdc*self.Kp_GCC)/(2*self.Lf)
-			J[varInd['icI'],varInd['Vdc']]= (self.xc.imag+self.uc.imag*self.Kp_GCC)/(2*self.Lf)
-			J[varInd['icI'],varInd['xPLL']]= -self.ic.real/self.wbase
-			J[varInd['icI'],varInd['wte']] = -(2/3)*((self.Kp_PLL*self.ic.real)/self.wbase)*(-ra*math.cos(theta_a)*math.sin(self.wte) 
-											 + 0.5*rb*math.cos(theta_b)*math.sin(self.wte) + 0.8660254037*rb*math.cos(theta_b)*math.cos(self.wte)
-											 + 0.5*rc*math.cos(theta_c)*math.sin(self.wte) - 0.8660254037*rc*math.cos(theta_c)*math.cos(self.wte))
+			#Anti-windup of current controller zeroes derivatives of saturated integrators
+			for ph,i,x,u,i_ref,m_limit in [('a',self.ia,self.xa,self.ua,self.ia_ref,self.m_limit*1e1),
+										   ('b',self.ib,self.xb,self.ub,self.ib_ref,self.m_limit),
+										   ('c',self.ic,self.xc,self.uc,self.ic_ref,self.m_limit)]:
+				if abs(self.Kp_GCC*u + x)>m_limit:
+					if np.sign(self.Ki_GCC*u.real) == np.sign(x.real):
+						J[self.varInd['x'+ph+'R'],:] = 0.0
+					if np.sign(self.Ki_GCC*u.imag) == np.sign(x.imag):
+						J[self.varInd['x'+ph+'I'],:] = 0.0
+					if np.sign((self.wp)*(-u.real + i_ref.real - i.real)) == np.sign(u.real):
+						J[self.varInd['u'+ph+'R'],:] = 0.0
+					if np.sign((self.wp)*(-u.imag + i_ref.imag - i.imag)) == np.sign(u.imag):
+						J[self.varInd['u'+ph+'I'],:] = 0.0
 			
-			#Current controller dynamics - Phase c
-		
-			if abs(self.Kp_GCC*self.uc + self.xc)>self.m_limit:
-				if np.sign(self.Ki_GCC*self.uc.real) == np.sign(self.xc.real):
-					#dxcR = 0.0
-					J[varInd['xcR'],varInd['ucR']]=0.0
-				else:
-					#dxcR = self.Ki_GCC*self.uc.real
-					J[varInd['xcR'],varInd['ucR']]=self.Ki_GCC
-				if np.sign(self.Ki_GCC*self.uc.imag) == np.sign(self.xc.imag):
-					#dxcI = 0.0
-					J[varInd['xcI'],varInd['ucI']]=0.0
-				else:
-					#dxcI = self.Ki_GCC*self.uc.imag
-					J[varInd['xcI'],varInd['ucI']]=self.Ki_GCC
-			else: 
-				#dxcR = self.Ki_GCC*self.uc.real
-				#dxcI = self.Ki_GCC*self.uc.imag
-				J[varInd['xcR'],varInd['ucR']]=self.Ki_GCC
-				J[varInd['xcI'],varInd['ucI']]=self.Ki_GCC
-		
-			if abs(self.Kp_GCC*self.uc + self.xc)>self.m_limit:
-				if np.sign( (self.wp)*(-self.uc.real +	self.ic_ref.real - self.ic.real)) == np.sign(self.uc.real):
-					#ducR = 0.0
-					J[varInd['ucR'],varInd['iaR']]= 0.0
-					J[varInd['ucR'],varInd['iaI']]= 0.0
-					J[varInd['ucR'],varInd['ibR']]= 0.0
-					J[varInd['ucR'],varInd['ibI']]= 0.0
-					J[varInd['ucR'],varInd['icR']]= 0.0
-					J[varInd['ucR'],varInd['icI']]= 0.0
-					J[varInd['ucR'],varInd['ucR']]= 0.0
-					J[varInd['ucR'],varInd['Vdc']]= 0.0
-					J[varInd['ucR'],varInd['xDC']]= 0.0
-					J[varInd['ucR'],varInd['xQ']]= 0.0
-				else:
-					#ducR = (self.wp)*(-self.uc.real +	self.ic_ref.real - self.ic.real)
-					J[varInd['ucR'],varInd['iaR']]= -0.866025403*(self.Kp_Q*self.wp*self.va.imag/2)
-					J[varInd['ucR'],varInd['iaI']]= 0.866025403*(self.Kp_Q*self.wp*self.va.real/2)
-					J[varInd['ucR'],varInd['ibR']]= -0.866025403*(self.Kp_Q*self.wp*self.vb.imag/2)
-					J[varInd['ucR'],varInd['ibI']]= 0.866025403*(self.Kp_Q*self.wp*self.vb.real/2)
-					J[varInd['ucR'],varInd['icR']]= -self.wp	-0.866025403*(self.Kp_Q*self.wp*self.vc.imag/2)
-					J[varInd['ucR'],varInd['icI']]= 0.866025403*(self.Kp_Q*self.wp*self.vc.real/2)
-					J[varInd['ucR'],varInd['ucR']]= -self.wp
-				
-					J[varInd['ucR'],varInd['Vdc']]=	0.5*self.wp*self.Kp_DC
-					J[varInd['ucR'],varInd['xDC']]=	-0.5*self.wp
-					J[varInd['ucR'],varInd['xQ']]=	-0.866025403*self.wp
-					
-				if np.sign((self.wp)*(-self.uc.imag +	self.ic_ref.imag - self.ic.imag)) == np.sign(self.uc.imag):
-					#ducI = 0.0
-					J[varInd['ucI'],varInd['icR']]= 0.0
-					J[varInd['ucI'],varInd['icI']]= 0.0
-					J[varInd['ucI'],varInd['ucI']]= 0.0
-					
-					J[varInd['ucI'],varInd['iaR']]= 0.0
-					J[varInd['ucI'],varInd['iaI']]= 0.0
-					J[varInd['ucI'],varInd['ibR']]= 0.0
-					J[varInd['ucI'],varInd['ibI']]= 0.0
-					
-					J[varInd['ucI'],varInd['Vdc']]= 0.0
-					J[varInd['ucI'],varInd['xDC']]= 0.0
-					J[varInd['ucI'],varInd['xQ']]= 0.0
-					
-				else:
-					#ducI = (self.wp)*(-self.uc.imag +	self.ic_ref.imag - self.ic.imag)
-					J[varInd['ucI'],varInd['iaR']]= -self.Kp_Q*self.wp*self.va.imag/4
-					J[varInd['ucI'],varInd['iaI']]= self.Kp_Q*self.wp*self.va.real/4
-					J[varInd['ucI'],varInd['ibR']]= -self.Kp_Q*self.wp*self.vb.imag/4
-					J[varInd['ucI'],varInd['ibI']]= self.Kp_Q*self.wp*self.vb.real/4
-					J[varInd['ucI'],varInd['icR']]= -(self.Kp_Q*self.wp*self.vc.imag/4)
-					J[varInd['ucI'],varInd['icI']]= -self.wp + (self.Kp_Q*self.wp*self.vc.real/4)
-					J[varInd['ucI'],varInd['ucI']]= -self.wp
-					
-					J[varInd['ucI'],varInd['Vdc']]= -0.8660254037*self.Kp_DC*self.wp
-					J[varInd['ucI'],varInd['xDC']]= 0.8660254037*self.wp
-					J[varInd['ucI'],varInd['xQ']]= -0.5*self.wp					
-			else:
-				#ducR = (self.wp)*(-self.uc.real +	self.ic_ref.real - self.ic.real)
-				#ducI = (self.wp)*(-self.uc.imag +	self.ic_ref.imag - self.ic.imag)
-				J[varInd['ucR'],varInd['iaR']]= -0.866025403*(self.Kp_Q*self.wp*self.va.imag/2)
-				J[varInd['ucR'],varInd['iaI']]= 0.866025403*(self.Kp_Q*self.wp*self.va.real/2)
-				J[varInd['ucR'],varInd['ibR']]= -0.866025403*(self.Kp_Q*self.wp*self.vb.imag/2)
-				J[varInd['ucR'],varInd['ibI']]= 0.866025403*(self.Kp_Q*self.wp*self.vb.real/2)
-				J[varInd['ucR'],varInd['icR']]= -self.wp	-0.866025403*(self.Kp_Q*self.wp*self.vc.imag/2)
-				J[varInd['ucR'],varInd['icI']]= 0.866025403*(self.Kp_Q*self.wp*self.vc.real/2)
-				J[varInd['ucR'],varInd['ucR']]= -self.wp
-				
-				J[varInd['ucR'],varInd['Vdc']]=	0.5*self.wp*self.Kp_DC
-				J[varInd['ucR'],varInd['xDC']]=	-0.5*self.wp
-				J[varInd['ucR'],varInd['xQ']]=	-0.866025403*self.wp
-				
-				J[varInd['ucI'],varInd['iaR']]= -self.Kp_Q*self.wp*self.va.imag/4
-				J[varInd['ucI'],varInd['iaI']]= self.Kp_Q*self.wp*self.va.real/4
-				J[varInd['ucI'],varInd['ibR']]= -self.Kp_Q*self.wp*self.vb.imag/4
-				J[varInd['ucI'],varInd['ibI']]= self.Kp_Q*self.wp*self.vb.real/4
-				J[varInd['ucI'],varInd['icR']]= -(self.Kp_Q*self.wp*self.vc.imag/4)
-				J[varInd['ucI'],varInd['icI']]= -self.wp + (self.Kp_Q*self.wp*self.vc.real/4)
-				J[varInd['ucI'],varInd['ucI']]= -self.wp
-				
-				J[varInd['ucI'],varInd['Vdc']]= -0.8660254037*self.Kp_DC*self.wp
-				J[varInd['ucI'],varInd['xDC']]= 0.8660254037*self.wp
-				J[varInd['ucI'],varInd['xQ']]= -0.5*self.wp
-		
-			#DC link voltage dynamics
-			dVdc = (self.Ppv - self.S.real)/(self.Vdc*self.C)
-			J[varInd['Vdc'],varInd['iaR']]= -(self.xa.real+self.Kp_GCC*self.ua.real)/(4*self.C)
-			J[varInd['Vdc'],varInd['iaI']]= -(self.xa.imag+self.Kp_GCC*self.ua.imag)/(4*self.C)
-			J[varInd['Vdc'],varInd['xaR']]= -self.ia.real/(4*self.C)
-			J[varInd['Vdc'],varInd['xaI']]= -self.ia.imag/(4*self.C)
-			J[varInd['Vdc'],varInd['uaR']]= -(self.Kp_GCC*self.ia.real)/(4*self.C)
-			J[varInd['Vdc'],varInd['uaI']]= -(self.Kp_GCC*self.ia.imag)/(4*self.C)
-
-			J[varInd['Vdc'],varInd['ibR']]= -(self.xb.real+self.Kp_GCC*self.ub.real)/(4*self.C)
-			J[varInd['Vdc'],varInd['ibI']]= -(self.xb.imag+self.Kp_GCC*self.ub.imag)/(4*self.C)
-			J[varInd['Vdc'],varInd['xbR']]= -self.ib.real/(4*self.C)
-			J[varInd['Vdc'],varInd['xbI']]= -self.ib.imag/(4*self.C)
-			J[varInd['Vdc'],varInd['ubR']]= -(self.Kp_GCC*self.ib.real)/(4*self.C)
-			J[varInd['Vdc'],varInd['ubI']]= -(self.Kp_GCC*self.ib.imag)/(4*self.C)
-
-			J[varInd['Vdc'],varInd['icR']]= -(self.xc.real+self.Kp_GCC*self.uc.real)/(4*self.C)
-			J[varInd['Vdc'],varInd['icI']]= -(self.xc.imag+self.Kp_GCC*self.uc.imag)/(4*self.C)
-			J[varInd['Vdc'],varInd['xcR']]= -self.ic.real/(4*self.C)
-			J[varInd['Vdc'],varInd['xcI']]= -self.ic.imag/(4*self.C)
-			J[varInd['Vdc'],varInd['ucR']]= -(self.Kp_GCC*self.ic.real)/(4*self.C)
-			J[varInd['Vdc'],varInd['ucI']]= -(self.Kp_GCC*self.ic.imag)/(4*self.C)				
-			
-			J[varInd['Vdc'],varInd['Vdc']]= (-(self.q*self.Np*self.Irs*(self.Vdcbase**2))/(self.C*self.k*self.A*self.Ns*self.Tactual*self.Sbase))*math.exp((self.q*self.Vdc*self.Vdcbase)/(self.k*self.A*self.Ns*self.Tactual))
-			#DC link voltage controller dynamics
+			#Anti-windup of DC link voltage and reactive power controllers
 			if abs(self.xDC + self.Kp_DC*(self.Vdc_ref - self.Vdc) + 1j*(self.xQ	- self.Kp_Q*(self.Q_ref - self.S_PCC.imag)))>self.iref_limit:
 				if np.sign(self.Ki_DC*(self.Vdc_ref - self.Vdc)) == np.sign(self.xDC):
-					#dxDC = 0.0
-					J[varInd['xDC'],varInd['Vdc']]= 0.0
-				else:
-					#dxDC = self.Ki_DC*(self.Vdc_ref - self.Vdc)
-					J[varInd['xDC'],varInd['Vdc']]=-self.Ki_DC
-			else:
-				#dxDC = self.Ki_DC*(self.Vdc_ref - self.Vdc)
-				J[varInd['xDC'],varInd['Vdc']]=-self.Ki_DC
-			
-			# Reactive power controller dynamics
-			if abs(self.xDC + self.Kp_DC*(self.Vdc_ref - self.Vdc) + 1j*(self.xQ	- self.Kp_Q*(self.Q_ref - self.S_PCC.imag)))>self.iref_limit:
-			
+					J[self.varInd['xDC'],:] = 0.0
 				if np.sign(-self.Ki_Q*(self.Q_ref - self.S_PCC.imag)) == np.sign(self.xQ):
-					#dxQ = 0.0
-					J[varInd['xQ'],varInd['iaR']]= 0.0
-					J[varInd['xQ'],varInd['iaI']]= 0.0
-					J[varInd['xQ'],varInd['ibR']]= 0.0
-					J[varInd['xQ'],varInd['ibI']]= 0.0
-					J[varInd['xQ'],varInd['icR']]= 0.0
-					J[varInd['xQ'],varInd['icI']]= 0.0
-				else:
-					#dxQ = -self.Ki_Q*(self.Q_ref - self.S_PCC.imag)
-					J[varInd['xQ'],varInd['iaR']]= (self.Ki_Q*self.va.imag/2)
-					J[varInd['xQ'],varInd['iaI']]= -(self.Ki_Q*self.va.real/2)
-					J[varInd['xQ'],varInd['ibR']]= (self.Ki_Q*self.vb.imag/2)
-					J[varInd['xQ'],varInd['ibI']]= -(self.Ki_Q*self.vb.real/2)
-					J[varInd['xQ'],varInd['icR']]= (self.Ki_Q*self.vc.imag/2)
-					J[varInd['xQ'],varInd['icI']]= -(self.Ki_Q*self.vc.real/2)
-		
-			else:
-				#dxQ = -self.Ki_Q*(self.Q_ref - self.S_PCC.imag)
-				J[varInd['xQ'],varInd['iaR']]= (self.Ki_Q*self.va.imag/2)
-				J[varInd['xQ'],varInd['iaI']]= -(self.Ki_Q*self.va.real/2)
-				J[varInd['xQ'],varInd['ibR']]= (self.Ki_Q*self.vb.imag/2)
-				J[varInd['xQ'],varInd['ibI']]= -(self.Ki_Q*self.vb.real/2)
-				J[varInd['xQ'],varInd['icR']]= (self.Ki_Q*self.vc.imag/2)
-				J[varInd['xQ'],varInd['icI']]= -(self.Ki_Q*self.vc.real/2)
-		
-			#SRF-PLL dynamics
-			#dxPLL = self.Ki_PLL*(self.vd)
-			J[varInd['xPLL'],varInd['wte']] = (2/3)*self.Ki_PLL*(-ra*math.cos(theta_a)*math.sin(self.wte) +
-												 0.5*rb*math.cos(theta_b)*math.sin(self.wte) + 0.8660254037*rb*math.cos(theta_b)*math.cos(self.wte)+
-												 0.5*rc*math.cos(theta_c)*math.sin(self.wte) - 0.8660254037*rc*math.cos(theta_c)*math.cos(self.wte))
-		
-			#Frequency integration to get angle
-			#dwte = self.we
-			J[varInd['wte'],varInd['xPLL']]= 1
-			J[varInd['wte'],varInd['wte']] = (2/3)*self.Kp_PLL*(-ra*math.cos(theta_a)*math.sin(self.wte) +
-												0.5*rb*math.cos(theta_b)*math.sin(self.wte) + 0.8660254037*rb*math.cos(theta_b)*math.cos(self.wte)+
-												0.5*rc*math.cos(theta_c)*math.sin(self.wte) - 0.8660254037*rc*math.cos(theta_c)*math.cos(self.wte))
+					J[self.varInd['xQ'],:] = 0.0
 
 			return J
 		except:
 			LogUtil.exception_handler()
-
-
@@ -14,7 +14,7 @@ from pvder.DER_check_and_initialize import PVDER_SetupUtilities
 from pvder.DER_features import PVDER_SmartFeatures
 from pvder.DER_utilities import PVDER_ModelUtilities
 from pvder.grid_components import BaseValues
-from pvder import utility_functions
+from pvder import utility_functions,DER_kernels
 from pvder import defaults,templates
 from pvder.logutil import LogUtil
 
@@ -260,6 +260,21 @@ class SolarPVDERThreePhaseBalanced(PVModule,SolarPVDER):
 			LogUtil.exception_handler()
 
 
+	@staticmethod
+	def rhs(t,y,params):
+		"""Stateless derivatives for the system of ODE's.
+		Args:
+			 t (float): Simulation time in seconds.
+			 y (ndarray): States with shape (n_ODE,) or (n_ODE,N).
+			 params (ndarray): Parameters from `get_rhs_parameters()` with shape (n_rhs_parameters,) or (n_rhs_parameters,N).
+		Returns:
+			 ndarray: Derivatives for the system of ODE's.
+		"""
+		try:
+			return DER_kernels.rhs_three_phase_balanced(t,y,params)
+		except:
+			LogUtil.exception_handler()
+
 	def ODE_model(self,y,t):
 		"""Derivatives for the equation."""
 		try:
@@ -284,8 +299,7 @@ class SolarPVDERThreePhaseBalanced(PVModule,SolarPVDER):
 		
 			self.update_inverter_frequency(t)
 		
-			self.update_ridethrough_flags(t)
-			self.disconnect_or_reconnect(t)
+			self.ridethrough_and_connection_logic(t)
 		
 			#Phase a inverter output current
 			diaR = (1/self.Lf)*(-self.Rf*self.ia.real - self.va.real + self.vta.real) + (self.winv/self.wbase)*self.ia.imag 
@@ -390,8 +404,7 @@ class SolarPVDERThreePhaseBalanced(PVModule,SolarPVDER):
 			#d-q transformation
 			self.update_inverter_frequency(t)
 		
-			self.update_ridethrough_flags(t)
-			self.disconnect_or_reconnect(t)
+			self.ridethrough_and_connection_logic(t)
 		
 			#Phase a inverter output current
 		
@@ -458,8 +471,8 @@ class SolarPVDERThreePhaseBalanced(PVModule,SolarPVDER):
 					J[varInd['uaI'],varInd['xQ']]= 0.0
 				else:
 					#duaI = (self.wp)*(-self.ua.imag +	self.ia_ref.imag - self.ia.imag)
-					J[varInd['uaI'],varInd['iaR']]= (self.Kp_Q*self.wp*self.va.imag/2)
-					J[varInd['uaI'],varInd['iaI']]= -self.wp - (self.Kp_Q*self.wp*self.va.real/2)
+					J[varInd['uaI'],varInd['iaR']]= (self.Kp_Q*self.wp*self.va.imag*3/2)
+					J[varInd['uaI'],varInd['iaI']]= -self.wp - (self.Kp_Q*self.wp*self.va.real*3/2)
 					J[varInd['uaI'],varInd['uaI']]= -self.wp
 					J[varInd['uaI'],varInd['xQ']]= self.wp					
 			else:
@@ -470,19 +483,19 @@ class SolarPVDERThreePhaseBalanced(PVModule,SolarPVDER):
 				J[varInd['uaR'],varInd['Vdc']]= -self.wp*self.Kp_DC
 				J[varInd['uaR'],varInd['xDC']]= self.wp	
 				
-				J[varInd['uaI'],varInd['iaR']]= (self.Kp_Q*self.wp*self.va.imag/2)
-				J[varInd['uaI'],varInd['iaI']]= -self.wp - (self.Kp_Q*self.wp*self.va.real/2)
+				J[varInd['uaI'],varInd['iaR']]= (self.Kp_Q*self.wp*self.va.imag*3/2)
+				J[varInd['uaI'],varInd['iaI']]= -self.wp - (self.Kp_Q*self.wp*self.va.real*3/2)
 				J[varInd['uaI'],varInd['uaI']]= -self.wp
 				J[varInd['uaI'],varInd['xQ']]= self.wp				
 
 			#DC link voltage dynamics
 			dVdc = (self.Ppv - self.S.real)/(self.Vdc*self.C)
-			J[varInd['Vdc'],varInd['iaR']]= -(self.xa.real+self.Kp_GCC*self.ua.real)/(4*self.C)
-			J[varInd['Vdc'],varInd['iaI']]= -(self.xa.imag+self.Kp_GCC*self.ua.imag)/(4*self.C)
-			J[varInd['Vdc'],varInd['xaR']]= -self.ia.real/(4*self.C)
-			J[varInd['Vdc'],varInd['xaI']]= -self.ia.imag/(4*self.C)
-			J[varInd['Vdc'],varInd['uaR']]= -(self.Kp_GCC*self.ia.real)/(4*self.C)
-			J[varInd['Vdc'],varInd['uaI']]= -(self.Kp_GCC*self.ia.imag)/(4*self.C)
+			J[varInd['Vdc'],varInd['iaR']]= -(self.xa.real+self.Kp_GCC*self.ua.real)*3/(4*self.C)
+			J[varInd['Vdc'],varInd['iaI']]= -(self.xa.imag+self.Kp_GCC*self.ua.imag)*3/(4*self.C)
+			J[varInd['Vdc'],varInd['xaR']]= -self.ia.real*3/(4*self.C)
+			J[varInd['Vdc'],varInd['xaI']]= -self.ia.imag*3/(4*self.C)
+			J[varInd['Vdc'],varInd['uaR']]= -(self.Kp_GCC*self.ia.real)*3/(4*self.C)
+			J[varInd['Vdc'],varInd['uaI']]= -(self.Kp_GCC*self.ia.imag)*3/(4*self.C)
 			
 			J[varInd['Vdc'],varInd['Vdc']]= (-(self.q*self.Np*self.Irs*(self.Vdcbase**2))/(self.C*self.k*self.A*self.Ns*self.Tactual*self.Sbase))*math.exp((self.q*self.Vdc*self.Vdcbase)/(self.k*self.A*self.Ns*self.Tactual))
 			#DC link voltage controller dynamics
@@ -506,12 +519,12 @@ class SolarPVDERThreePhaseBalanced(PVModule,SolarPVDER):
 					J[varInd['xQ'],varInd['iaI']]= 0.0
 				else:
 					#dxQ = -self.Ki_Q*(self.Q_ref - self.S_PCC.imag)
-					J[varInd['xQ'],varInd['iaR']]= (self.Ki_Q*self.va.imag/2)
-					J[varInd['xQ'],varInd['iaI']]= -(self.Ki_Q*self.va.real/2)
+					J[varInd['xQ'],varInd['iaR']]= (self.Ki_Q*self.va.imag*3/2)
+					J[varInd['xQ'],varInd['iaI']]= -(self.Ki_Q*self.va.real*3/2)
 			else:
 				#dxQ = -self.Ki_Q*(self.Q_ref - self.S_PCC.imag)
-				J[varInd['xQ'],varInd['iaR']]= (self.Ki_Q*self.va.imag/2)
-				J[varInd['xQ'],varInd['iaI']]= -(self.Ki_Q*self.va.real/2)
+				J[varInd['xQ'],varInd['iaR']]= (self.Ki_Q*self.va.imag*3/2)
+				J[varInd['xQ'],varInd['iaI']]= -(self.Ki_Q*self.va.real*3/2)
 
 			#SRF-PLL dynamics
 			#dxPLL = self.Ki_PLL*(self.vd)
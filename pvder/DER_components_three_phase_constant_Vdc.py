@@ -11,7 +11,7 @@ import warnings
 
 from pvder.DER_components import SolarPVDER,PVModule
 from pvder.grid_components import BaseValues
-from pvder import utility_functions
+from pvder import utility_functions,DER_kernels
 from pvder import defaults,templates
 from pvder.logutil import LogUtil
 
@@ -282,6 +282,21 @@ class SolarPVDERThreePhaseConstantVdc(PVModule,SolarPVDER):
 			LogUtil.exception_handler()
 
 
+	@staticmethod
+	def rhs(t,y,params):
+		"""Stateless derivatives for the system of ODE's.
+		Args:
+			 t (float): Simulation time in seconds.
+			 y (ndarray): States with shape (n_ODE,) or (n_ODE,N).
+			 params (ndarray): Parameters from `get_rhs_parameters()` with shape (n_rhs_parameters,) or (n_rhs_parameters,N).
+		Returns:
+			 ndarray: Derivatives for the system of ODE's.
+		"""
+		try:
+			return DER_kernels.rhs_three_phase_constant_Vdc(t,y,params)
+		except:
+			LogUtil.exception_handler()
+
 	def ODE_model(self,y,t):
 		"""System of ODE's defining the dynamic DER model.
 		Args:
@@ -315,8 +330,7 @@ class SolarPVDERThreePhaseConstantVdc(PVModule,SolarPVDER):
 		
 			self.update_inverter_frequency(t)
 		
-			self.update_ridethrough_flags(t)
-			self.disconnect_or_reconnect(t)
+			self.ridethrough_and_connection_logic(t)
 		
 			#Phase a inverter output current
 			diaR = (1/self.Lf)*(-self.Rf*self.ia.real - self.va.real + self.vta.real) + (self.winv/self.wbase)*self.ia.imag 
@@ -504,8 +518,7 @@ class SolarPVDERThreePhaseConstantVdc(PVModule,SolarPVDER):
 			#d-q transformation
 			self.update_inverter_frequency(t)
 		
-			self.update_ridethrough_flags(t)
-			self.disconnect_or_reconnect(t)
+			self.ridethrough_and_connection_logic(t)
 		
 			#Phase a inverter output current
 			ra,theta_a = cmath.polar(self.va)
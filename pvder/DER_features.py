@@ -30,6 +30,8 @@ class PVDER_SmartFeatures():
 	DER_MOMENTARY_CESSATION = False
 	DER_TRIP	 = False		
 	
+	HOLD_DISCRETE_STATES = False #Ride through and connection flags are held constant inside ODE model (hybrid mode)
+	
 	def initialize_Volt_VAR(self):
 		"""Initialize the Volt-VAR controller settings."""
 		try:
@@ -161,6 +163,26 @@ class PVDER_SmartFeatures():
 			LogUtil.exception_handler()
 
 
+	def ridethrough_and_connection_logic(self,t):
+		"""Evaluate VRT/FRT and connection logic inside ODE model unless discrete states are held constant."""
+		try:
+			if not self.HOLD_DISCRETE_STATES:
+				self.update_discrete_states(t)
+			elif not self.DER_CONNECTED: #Keep DER disconnected using held flags
+				self.DER_disconnect()
+		except:
+			LogUtil.exception_handler()
+
+
+	def update_discrete_states(self,t):
+		"""Update ride through flags and disconnect or reconnect DER."""
+		try:
+			self.update_ridethrough_flags(t)
+			self.disconnect_or_reconnect(t)
+		except:
+			LogUtil.exception_handler()
+
+
 	def update_ridethrough_flags(self,t):
 		"""Check VRT and FRT logic."""
 		try:
@@ -0,0 +1,245 @@
+"""Stateless right hand side kernels for PV-DER models."""
+
+from __future__ import division
+import numpy as np
+import math
+import cmath
+
+from pvder.logutil import LogUtil
+
+
+#Layout of the flat parameter array used by the kernels
+rhs_parameter_names = ['Rf','Lf','C','wbase',
+					   'Kp_GCC','Ki_GCC','wp',
+					   'Kp_DC','Ki_DC','Kp_P','Ki_P','Kp_Q','Ki_Q',
+					   'Kp_PLL','Ki_PLL',
+					   'ma_limit','mbc_limit','iref_limit',
+					   'NpIrs','Vt_inv','NpIph','Vdcbase','Vdcmpp_max','Sbase',
+					   'Vdc','Vdc_ref','Q_ref','DER_CONNECTED','wgrid',
+					   'vagR','vagI','vbgR','vbgI','vcgR','vcgI',
+					   'KgR','KgI','ZthR','ZthI']
+rhs_parameter_index = {name:index for index,name in enumerate(rhs_parameter_names)}
+n_rhs_parameters = len(rhs_parameter_names)
+
+#Model specific kernel options (duty cycle limit multiplier for phase a and phases b,c) and arguments of `rhs_kernel`
+kernel_options = {'SolarPVDERSinglePhase':{'m_limit_scale':(1e1,1e1),'kernel_arguments':{'n_phases':1}},
+				  'SolarPVDERSinglePhaseConstantVdc':{'m_limit_scale':(1e1,1e1),'kernel_arguments':{'n_phases':1,'constant_Vdc':True}},
+				  'SolarPVDERThreePhase':{'m_limit_scale':(1.0,1.0),'kernel_arguments':{'n_phases':3}},
+				  'SolarPVDERThreePhaseConstantVdc':{'m_limit_scale':(1e1,1.0),'kernel_arguments':{'n_phases':3,'constant_Vdc':True}},
+				  'SolarPVDERThreePhaseBalanced':{'m_limit_scale':(1.0,1.0),'kernel_arguments':{'n_phases':3,'balanced':True}}}
+
+_Ub = complex(math.cos(-(2/3)*math.pi),math.sin(-(2/3)*math.pi)) #Phase shift from phase a to phase b
+_Uc = complex(math.cos((2/3)*math.pi),math.sin((2/3)*math.pi)) #Phase shift from phase a to phase c
+
+_ia,_ib,_ic = [0,6,12] #Start index of phase states (i,x,u) in unbalanced three phase models
+
+
+def anti_windup(derivative,state,saturated):
+	"""Zero integrator derivative if output is saturated and derivative has same sign as state."""
+	try:
+		return derivative*(1.0 - (saturated & (derivative*state > 0.0)))
+	except:
+		LogUtil.exception_handler()
+
+
+def current_controller_kernel(i,x,u,v,i_ref,Vdc,winv,m_limit,Rf,Lf,wbase,Kp_GCC,Ki_GCC,wp):
+	"""Derivatives of inverter current and current controller states for one phase."""
+	try:
+		m = Kp_GCC*u + x #Duty cycle
+		vt = m*(Vdc/2) #Inverter terminal voltage
+
+		diR = (1/Lf)*(-Rf*i.real - v.real + vt.real) + (winv/wbase)*i.imag
+		diI = (1/Lf)*(-Rf*i.imag - v.imag + vt.imag) - (winv/wbase)*i.real
+
+		saturated = abs(m) > m_limit
+		dxR = anti_windup(Ki_GCC*u.real,x.real,saturated)
+		dxI = anti_windup(Ki_GCC*u.imag,x.imag,saturated)
+		duR = anti_windup(wp*(-u.real + i_ref.real - i.real),u.real,saturated)
+		duI = anti_windup(wp*(-u.imag + i_ref.imag - i.imag),u.imag,saturated)
+
+		return [diR,diI,dxR,dxI,duR,duI]
+	except:
+		LogUtil.exception_handler()
+
+
+def rhs_kernel(t,y,p,n_phases=1,balanced=False,constant_Vdc=False,functions=None):
+	"""Derivatives of a PV-DER model as a pure function of time, states, and parameters.
+	Args:
+		 t (float): Simulation time in seconds.
+		 y (ndarray): States with shape (n_ODE,) or (n_ODE,N) for N models.
+		 p (ndarray): Parameters with shape (n_rhs_parameters,) or (n_rhs_parameters,N).
+		 n_phases (int): Number of phases.
+		 balanced (bool): Phase b and c are derived from phase a.
+		 constant_Vdc (bool): DC link voltage is fixed and outer loop controls active power.
+		 functions (tuple): Functions used for exp, complex exp, minimum, and maximum (e.g. symbolic versions).
+	Returns:
+		 list: Derivatives for the system of ODE's.
+	"""
+	try:
+		if functions is not None:
+			exp,cexp,minimum,maximum = functions
+		elif np.ndim(y) == 1 and np.ndim(p) == 1: #Python scalars are faster than numpy scalars
+			y = y.tolist() if isinstance(y,np.ndarray) else y
+			p = p.tolist() if isinstance(p,np.ndarray) else p
+			exp,cexp,minimum,maximum = math.exp,cmath.exp,min,max
+		else:
+			exp,cexp,minimum,maximum = np.exp,np.exp,np.minimum,np.maximum
+
+		Rf,Lf,C,wbase,\
+		Kp_GCC,Ki_GCC,wp,\
+		Kp_DC,Ki_DC,Kp_P,Ki_P,Kp_Q,Ki_Q,\
+		Kp_PLL,Ki_PLL,\
+		ma_limit,mbc_limit,iref_limit,\
+		NpIrs,Vt_inv,NpIph,Vdcbase,Vdcmpp_max,Sbase,\
+		Vdc_p,Vdc_ref,Q_ref,connected,wgrid,\
+		vagR,vagI,vbgR,vbgI,vcgR,vcgI,\
+		KgR,KgI,ZthR,ZthI = p
+
+		if n_phases == 3 and not balanced:
+			i = [y[k] + 1j*y[k+1] for k in [_ia,_ib,_ic]]
+			x = [y[k+2] + 1j*y[k+3] for k in [_ia,_ib,_ic]]
+			u = [y[k+4] + 1j*y[k+5] for k in [_ia,_ib,_ic]]
+			n_phase_states = 18
+		else:
+			i = [y[0] + 1j*y[1]]
+			x = [y[2] + 1j*y[3]]
+			u = [y[4] + 1j*y[5]]
+			n_phase_states = 6
+
+		if constant_Vdc:
+			Vdc = Vdc_p
+			xP,xQ,xPLL,wte = y[n_phase_states:n_phase_states+4]
+		else:
+			Vdc,xDC,xQ,xPLL,wte = y[n_phase_states:n_phase_states+5]
+
+		#PV module power output
+		Vdc_actual = minimum(Vdcmpp_max,Vdc*Vdcbase)
+		Ipv = NpIph - NpIrs*(exp(Vt_inv*Vdc_actual)-1)
+		Ppv = connected*maximum(0.0,Ipv*Vdc_actual)/Sbase
+
+		#Set-points are zeroed/frozen if DER is disconnected
+		Q_ref = connected*Q_ref
+		Vdc_ref = connected*Vdc_ref + (1.0-connected)*Vdc
+
+		#PCC LV side voltage is linear in inverter current
+		Kg = KgR + 1j*KgI
+		Zth = ZthR + 1j*ZthI
+		vg = [vagR + 1j*vagI,vbgR + 1j*vbgI,vcgR + 1j*vcgI]
+		v = [Kg*vg[k] + Zth*i[k] for k in range(len(i))]
+
+		S_ph = [(1/2)*((Kp_GCC*u[k] + x[k])*(Vdc/2))*i[k].conjugate() for k in range(len(i))]
+		S_PCC_ph = [(1/2)*v[k]*i[k].conjugate() for k in range(len(i))]
+		if balanced:
+			S = 3*S_ph[0]
+			S_PCC = 3*S_PCC_ph[0]
+		else:
+			S = sum(S_ph)
+			S_PCC = sum(S_PCC_ph)
+
+		#Outer loop controller
+		if constant_Vdc:
+			Kp_outer,Ki_outer,e_outer,x_outer = Kp_P,Ki_P,Ppv - S.real,xP
+		else:
+			Kp_outer,Ki_outer,e_outer,x_outer = Kp_DC,Ki_DC,Vdc_ref - Vdc,xDC
+		e_Q = Q_ref - S_PCC.imag
+		ia_ref = x_outer + Kp_outer*e_outer + 1j*(xQ - Kp_Q*e_Q)
+		i_ref = [connected*ia_ref,connected*ia_ref*_Ub,connected*ia_ref*_Uc]
+
+		#SRF-PLL
+		rotation = cexp(1j*(wgrid*t - (math.pi/2))) #Phasor to time domain
+		if n_phases == 1:
+			vd = (v[0]*rotation*cexp(-1j*wte)).real #alpha-beta to d-q
+		else:
+			if balanced:
+				v_abc = [v[0],v[0]*_Ub,v[0]*_Uc]
+			else:
+				v_abc = v
+			vd = ((2/3)*((v_abc[0]*rotation).real + (v_abc[1]*rotation).real*_Uc + (v_abc[2]*rotation).real*_Ub)*cexp(-1j*wte)).real #abc to d-q
+		we = Kp_PLL*vd + xPLL + 2*math.pi*60.0
+
+		result = []
+		for k in range(len(i)):
+			result.extend(current_controller_kernel(i[k],x[k],u[k],v[k],i_ref[k],Vdc,we,ma_limit if k == 0 else mbc_limit,
+													Rf,Lf,wbase,Kp_GCC,Ki_GCC,wp))
+
+		saturated = abs(ia_ref) > iref_limit
+		if not constant_Vdc:
+			result.append((Ppv - S.real)/(Vdc*C))
+		result.append(anti_windup(Ki_outer*e_outer,x_outer,saturated))
+		result.append(anti_windup(-Ki_Q*e_Q,xQ,saturated))
+		result.append(Ki_PLL*vd)
+		result.append(we)
+
+		return result
+	except:
+		LogUtil.exception_handler()
+
+
+def Vrms_kernel(y,p,n_phases=1,balanced=False,measurement_type='average'):
+	"""RMS value of PCC LV side voltage as a pure function of states and parameters.
+	Args:
+		 y (ndarray): States with shape (n_ODE,).
+		 p (ndarray): Parameters with shape (n_rhs_parameters,).
+		 n_phases (int): Number of phases.
+		 balanced (bool): Phase b and c are derived from phase a.
+		 measurement_type (str): 'average' or 'minimum' of phase voltages.
+	Returns:
+		 float: RMS voltage in p.u.
+	"""
+	try:
+		ind = rhs_parameter_index
+		Kg = p[ind['KgR']] + 1j*p[ind['KgI']]
+		Zth = p[ind['ZthR']] + 1j*p[ind['ZthI']]
+
+		if n_phases == 3 and not balanced:
+			phases = zip([_ia,_ib,_ic],['va','vb','vc'])
+		else:
+			phases = [(0,'va')]
+		V = [abs(Kg*(p[ind[ph+'gR']] + 1j*p[ind[ph+'gI']]) + Zth*(y[k] + 1j*y[k+1])) for k,ph in phases]
+
+		if measurement_type == 'minimum':
+			return min(V)/math.sqrt(2)
+		else:
+			return math.sqrt(sum([Vph*Vph for Vph in V])/len(V))/math.sqrt(2)
+	except:
+		LogUtil.exception_handler()
+
+
+def rhs_single_phase(t,y,p):
+	"""Derivatives for single phase model."""
+	try:
+		return np.array(rhs_kernel(t,y,p,n_phases=1))
+	except:
+		LogUtil.exception_handler()
+
+
+def rhs_single_phase_constant_Vdc(t,y,p):
+	"""Derivatives for single phase constant Vdc model."""
+	try:
+		return np.array(rhs_kernel(t,y,p,n_phases=1,constant_Vdc=True))
+	except:
+		LogUtil.exception_handler()
+
+
+def rhs_three_phase(t,y,p):
+	"""Derivatives for three phase unbalanced model."""
+	try:
+		return np.array(rhs_kernel(t,y,p,n_phases=3))
+	except:
+		LogUtil.exception_handler()
+
+
+def rhs_three_phase_constant_Vdc(t,y,p):
+	"""Derivatives for three phase unbalanced constant Vdc model."""
+	try:
+		return np.array(rhs_kernel(t,y,p,n_phases=3,constant_Vdc=True))
+	except:
+		LogUtil.exception_handler()
+
+
+def rhs_three_phase_balanced(t,y,p):
+	"""Derivatives for three phase balanced model."""
+	try:
+		return np.array(rhs_kernel(t,y,p,n_phases=3,balanced=True))
+	except:
+		LogUtil.exception_handler()
@@ -12,8 +12,8 @@ import numpy as np
 
 from pvder.utility_classes import Utilities
 from pvder.grid_components import BaseValues
-from pvder import utility_functions
-from pvder import defaults, templates, properties
+from pvder import utility_functions,DER_kernels,DER_codegen
+from pvder import defaults, templates, properties, specifications
 from pvder.logutil import LogUtil
 
 class PVDER_ModelUtilities(BaseValues,Utilities):
@@ -292,6 +292,124 @@ class PVDER_ModelUtilities(BaseValues,Utilities):
 			LogUtil.exception_handler()
 
 
+	def get_rhs_parameters(self):
+		"""Flat parameter array with current parameters and inputs for use with stateless `rhs` kernel.
+		Returns:
+			 ndarray: Parameters in the order given by `DER_kernels.rhs_parameter_names`.
+		"""
+		try:
+			p = np.zeros(DER_kernels.n_rhs_parameters)
+			ind = DER_kernels.rhs_parameter_index
+			
+			for name in ['Rf','Lf','C','Kp_GCC','Ki_GCC','wp','Kp_DC','Ki_DC','Kp_P','Ki_P','Kp_Q','Ki_Q','Kp_PLL','Ki_PLL','Vdc','Vdc_ref','Q_ref']:
+				p[ind[name]] = getattr(self,name,0.0)
+			
+			ma_scale,mbc_scale = DER_kernels.kernel_options[self.DER_model_type]['m_limit_scale']
+			p[ind['wbase']] = self.wbase
+			p[ind['ma_limit']] = self.m_limit*ma_scale
+			p[ind['mbc_limit']] = self.m_limit*mbc_scale
+			p[ind['iref_limit']] = self.iref_limit
+			
+			p[ind['NpIrs']] = self.Np*self.Irs
+			p[ind['Vt_inv']] = self.q/(self.k*self.Tactual*self.A*self.Ns)
+			p[ind['NpIph']] = self.Np*self.Iph
+			p[ind['Vdcbase']] = self.Vdcbase
+			p[ind['Vdcmpp_max']] = self.Vdcmpp_max
+			p[ind['Sbase']] = BaseValues.Sbase
+			
+			p[ind['DER_CONNECTED']] = float(self.DER_CONNECTED)
+			if self.use_frequency_estimate:
+				p[ind['wgrid']] = self._westimate
+			elif self.standAlone:
+				p[ind['wgrid']] = self.grid_model.wgrid
+			else:
+				p[ind['wgrid']] = self.gridFrequency
+			
+			if self.standAlone: #PCC voltage is linear in inverter current
+				G = (self.Zload1*self.a*self.a)/((self.a*self.a*(self.Z1+self.Zload1))+self.grid_model.Z2)
+				vg = [self.grid_model.vag,self.grid_model.vbg,self.grid_model.vcg]
+				Kg = G/self.a
+				Zth = (self.grid_model.Z2/(self.a*self.a) + self.Z1)*G
+			else:
+				vg = [self.gridVoltagePhaseA,getattr(self,'gridVoltagePhaseB',0.0),getattr(self,'gridVoltagePhaseC',0.0)]
+				Kg = 1.0
+				Zth = 0.0
+			
+			for ph,vph in zip(['va','vb','vc'],vg):
+				p[ind[ph+'gR']],p[ind[ph+'gI']] = vph.real,vph.imag
+			p[ind['KgR']],p[ind['KgI']] = Kg.real,Kg.imag
+			p[ind['ZthR']],p[ind['ZthI']] = Zth.real,Zth.imag
+			
+			return p
+		except:
+			LogUtil.exception_handler()
+
+
+	def get_RT_measurements(self,t,y,params):
+		"""Voltage and frequency used by ride through logic calculated from states and parameters without updating model.
+		Args:
+			 t (float): Simulation time in seconds.
+			 y (ndarray): States with shape (n_ODE,).
+			 params (ndarray): Parameters from `get_rhs_parameters()`.
+		Returns:
+			 tuple: RMS PCC LV side voltage in p.u. and PLL frequency in Hz.
+		"""
+		try:
+			Vrms_measured = DER_kernels.Vrms_kernel(y,params,n_phases=self.n_phases,balanced=self.DER_model_type == 'SolarPVDERThreePhaseBalanced',
+													measurement_type=specifications.RT_measurement_type)
+			fgrid = self.rhs(t,y,params)[-1]/(2.0*math.pi) #Derivative of PLL phase angle is the estimated frequency
+			
+			return Vrms_measured,fgrid
+		except:
+			LogUtil.exception_handler()
+
+
+	def rhs_generated(self,t,y,params):
+		"""Derivatives from code generated from the stateless `rhs` kernel.
+		Args:
+			 t (float): Simulation time in seconds.
+			 y (ndarray): States with shape (n_ODE,).
+			 params (ndarray): Parameters from `get_rhs_parameters()`.
+		Returns:
+			 ndarray: Derivatives with shape (n_ODE,).
+		"""
+		try:
+			rhs,_ = DER_codegen.get_generated_functions(self.DER_model_type)
+			return rhs(t,y,params)
+		except:
+			LogUtil.exception_handler()
+
+
+	def jac_generated(self,t,y,params):
+		"""Analytical Jacobian from code generated from the stateless `rhs` kernel.
+		Args:
+			 t (float): Simulation time in seconds.
+			 y (ndarray): States with shape (n_ODE,).
+			 params (ndarray): Parameters from `get_rhs_parameters()`.
+		Returns:
+			 ndarray: Jacobian with shape (n_ODE,n_ODE).
+		"""
+		try:
+			_,jac = DER_codegen.get_generated_functions(self.DER_model_type)
+			return jac(t,y,params)
+		except:
+			LogUtil.exception_handler()
+
+
+	def jacobian_flat_index(self,entries):
+		"""Flat indices of Jacobian entries.
+		Args:
+			 entries (list): Tuples with names of row and column states.
+		Returns:
+			 ndarray: Indices into the flattened Jacobian array.
+		"""
+		try:
+			n_columns = self.J.shape[1]
+			return np.array([self.varInd[row]*n_columns + self.varInd[column] for row,column in entries],dtype=int)
+		except:
+			LogUtil.exception_handler()
+
+
 	def update_Ppv(self,t):
 		"""Update PV module power output based on solar events and DC link voltage."""
 		try:
@@ -1,5 +1,7 @@
 """Store configuration options."""
 
+import os
+
 
 #Results options
 
@@ -8,6 +10,8 @@ FIGURE_WIDTH = 8
 FIGURE_HEIGHT = 8
 FIGURE_DPI = 1200
 
+trajectory_buffer_size = 1024 #Initial number of time steps in buffers storing loop mode trajectories (doubled when full)
+
 
 #Model options
 Ioverload = 1.3 #Inverter overload
@@ -32,7 +36,24 @@ use_frequency_estimate = False
 
 #Solver options
 DEFAULT_DELTA_T = 0.001 #Simulation time step
+decimation_method = 'sample' #Method used to reduce stored trajectories to output time step (available: 'sample','minmax','rms')
 max_steps = 1000 #Max steps to be used by solver before producing error
+rtol = 1e-4 #Relative tolerance used by ODE solver
+atol = 1e-4 #Absolute tolerance used by ODE solver
+hmax = 1/120.0 #Max time step (s) allowed for ODE solver
+RT_event_tolerance = 1e-6 #Time (s) after a located ride through event at which ride through logic is evaluated
+fixed_step_RK4 = 2.5e-6 #Max step (s) for fixed step RK4 solver (limited by stability of inverter current dynamics - only useful for verification since about 4e5 RHS evaluations are needed for each simulated second)
+fixed_step_trapezoidal = None #Max step (s) for fixed step trapezoidal solver (None - one step for each time step, since trapezoidal rule is A-stable)
+fixed_step_exponential = 1e-3 #Max step (s) for fixed step exponential integrator
+
+#Code generation options
+codegen_cache_directory = os.path.join(os.path.expanduser('~'),'.pvder','generated') #Directory where generated RHS and Jacobian code is cached
+
+#Jacobian verification options
+jacobian_check_rtol = 1e-3 #Relative tolerance for difference between analytical and numerical Jacobian entries
+jacobian_check_atol = 1e-2 #Absolute tolerance for difference between analytical and numerical Jacobian entries
+jacobian_check_operating_points = {'Sinsol':[100.0,50.0],'Vgrid':[1.0,0.9,0.5],'Q_ref':[0.0,0.1],'DER_CONNECTED':[True,False]}
+jacobian_check_state_perturbation = 0.05 #Standard deviation of relative random perturbation of initial states at each operating point
 
 #Steady state solver options
 STEADYSTATE_SOLVER = 'SLSQP'
@@ -5,11 +5,12 @@ import numpy as np
 import math
 import cmath
 import time
+import os
 
 import pdb
 import six
 
-from pvder.utility_classes import Utilities
+from pvder.utility_classes import Utilities,GrowableArray,MemmapArray
 from pvder.grid_components import Grid
 from pvder.simulation_utilities import SimulationUtilities
 from pvder import utility_functions
@@ -23,6 +24,9 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 	count = 0
 	tStart = 0.0
 	tInc = defaults.DEFAULT_DELTA_T
+	tOutput = None #Time step of stored trajectories (default: tInc)
+	decimation_method = defaults.decimation_method
+	decimation_list = ['sample','minmax','rms']
 	
 	DEBUG_SOLVER = False
 	DEBUG_SIMULATION = False
@@ -32,11 +36,33 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 	DEBUG_POWER = False
 	DEBUG_PLL = False
 	
+	SEGMENT_AT_EVENTS = False #Restart ODE solver at each simulation event
+	HYBRID_MODE = False #Evaluate ride through and connection logic only at accepted time steps
+	LOCATE_RT_EVENTS = False #Locate ride through threshold crossings and timer expiries by root finding
+	PERSISTENT_SOLVER = False #Keep ODE solver step size and order history between calls in loop mode
+	GENERATED_JACOBIAN = False #Use analytical Jacobian generated from the stateless rhs kernel for all DER models
+	
 	jac_list = ['SolarPVDERThreePhase','SolarPVDERSinglePhase','SolarPVDERThreePhaseBalanced']
+	
+	#Trajectories calculated from states on first access by each method
+	trajectory_methods = {'time_series_duty_cycle':['ma_t','maR_t','maI_t','ma_absolute_t','mb_t','mbR_t','mbI_t','mb_absolute_t','mc_t','mcR_t','mcI_t','mc_absolute_t'],
+						  'time_series_standalone_grid':['vag_t','vagR_t','vagI_t','vbg_t','vbgR_t','vbgI_t','vcg_t','vcgR_t','vcgI_t','wgrid_t'],
+						  'time_series_Zload1':['Zload1_t'],
+						  'time_series_inv_terminal_voltage':['vta_t','vtb_t','vtc_t'],
+						  'time_series_PCC_LV_side_voltage':['va_t','vaR_t','vaI_t','vb_t','vbR_t','vbI_t','vc_t','vcR_t','vcI_t'],
+						  'time_series_PCC_HV_side_voltage':['vaHV_t','vbHV_t','vcHV_t'],
+						  'time_series_S':['S_t','S_PCC_t','S_G_t','S_load1_t'],
+						  'time_series_RMS':['Vtrms_t','Vrms_t','Irms_t','Varms_t','Vbrms_t','Vcrms_t','Vgrms_t','Vhvrms_t'],
+						  'time_series_Ppv':['Ppv_t','Sinsol_t'],
+						  'time_series_phase_angle':['phi_at_t','phi_a_t','phi_aHV_t','phi_ag_t','phi_bt_t','phi_ct_t','phi_b_t','phi_c_t','phi_bHV_t','phi_cHV_t','phi_bg_t','phi_cg_t'],
+						  'time_series_PLL':['vd_t','vq_t','we_t']}
+	standalone_trajectory_methods = ['time_series_standalone_grid','time_series_Zload1','time_series_PCC_HV_side_voltage','time_series_PLL']
+	event_trajectory_methods = ['time_series_standalone_grid','time_series_Zload1','time_series_Ppv','time_series_PLL'] #Need events at simulation time steps
+	derived_trajectories = {name:method for method,names in trajectory_methods.items() for name in names}
 		
 	def __init__(self,PV_model,events,gridModel = None,tStop = 0.5,
 				 LOOP_MODE = False,COLLECT_SOLUTION = True,jacFlag = False,
-				 verbosity ='INFO',solverType ='odeint',identifier = None):
+				 verbosity ='INFO',solverType ='odeint',identifier = None,outputs = None,trajectoryDirectory = None):
 		"""Creates an instance of `GridSimulation`.
 		Args:
 		  PV_model: An instance of `SolarPV_DER`.
@@ -45,6 +71,8 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 		  tStop: A scalar specifying the end time for simulation.
 		  tInc: A scalar specifying the time step for simulation.
 		  LOOP_MODE: A boolean specifying whether simulation is run in loop.
+		  outputs: A list of trajectories returned by `get_trajectories` (e.g. ['Vrms_t','S_PCC_t','Vdc_t']). All trajectories are returned if None.
+		  trajectoryDirectory: A string specifying a directory where states and inputs are stored in memory mapped .npy files instead of memory.
 		"""
 		try:
 			DynamicSimulation.count = DynamicSimulation.count + 1 #Increment count to keep track of number of simulation instances
@@ -58,10 +86,14 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 			self.initialize_solver(solver_type=solverType)
 			self.SOLVER_CONVERGENCE = False
 			self.convergence_failure_list =[]
+			self.reset_persistent_solver()
 			self.LOOP_MODE = LOOP_MODE
 			self.COLLECT_SOLUTION = COLLECT_SOLUTION
 			self.jacFlag = jacFlag
+			self.jac_coloring = None #Column coloring for finite difference Jacobian is found on first use
 			self.check_jac_availability()
+			self.outputs = self.check_outputs(outputs)
+			self.initialize_trajectory_directory(trajectoryDirectory)
 		
 			if self.PV_model.standAlone and gridModel is not None:
 				self.grid_model = gridModel
@@ -80,41 +112,111 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 			LogUtil.exception_handler()
 
 
+	def __getattr__(self,name):
+		"""Calculate derived trajectory from states on first access and store it as an attribute."""
+		#Only called if attribute was not found, AttributeError is raised without logging to allow use of hasattr()
+		method = DynamicSimulation.derived_trajectories.get(name)
+		if method is None or 't_t' not in self.__dict__ or (method in self.standalone_trajectory_methods and not self.PV_model.standAlone):
+			raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__,name))
+		if method in self.event_trajectory_methods and len(self.t) != len(self.t_t): #Loop mode history without stored inputs
+			raise AttributeError("'{}' object has no attribute '{}' - include it in outputs to store it in loop mode".format(type(self).__name__,name))
+		getattr(self,method)()
+		if name not in self.__dict__:
+			raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__,name))
+		
+		return self.__dict__[name]
+
+
+	def check_outputs(self,outputs):
+		"""Check whether the requested output trajectories are available for the DER model.
+		Args:
+			 outputs (list): Names of trajectories (e.g. 'Vrms_t').
+		Returns:
+			 list: Names of trajectories or None if all trajectories are returned.
+		Raises:
+			 ValueError: If a trajectory is not available.
+		"""
+		try:
+			if outputs is None:
+				return None
+			
+			state_trajectories = ['t_t','Vdc_t'] + [state + '_t' for state in self.PV_model.varInd] + [variable + 'a_t' for variable in ['i','x','u']]
+			if type(self.PV_model).__name__ in templates.three_phase_models:
+				state_trajectories = state_trajectories + [variable + phase + component + '_t' for variable in ['i','x','u'] for phase in ['b','c'] for component in ['','R','I']]
+			for output in outputs:
+				method = self.derived_trajectories.get(output)
+				if method is None and output not in state_trajectories:
+					raise ValueError('{} is not a valid output trajectory! - Valid outputs:{}'.format(output,sorted(state_trajectories + list(self.derived_trajectories.keys()))))
+				if method in self.standalone_trajectory_methods and not self.PV_model.standAlone:
+					raise ValueError('{} is only available for DER models in stand alone mode!'.format(output))
+			
+			return list(outputs)
+		except:
+			LogUtil.exception_handler()
+
+
+	def output_names(self):
+		"""Names of trajectories returned by `get_trajectories()`."""
+		try:
+			if self.outputs is not None:
+				return self.outputs
+			
+			output_names = ['ia_t','ma_t','Vdc_t','vta_t','va_t','Irms_t','Vtrms_t','Vrms_t','Ppv_t','S_t','S_PCC_t']
+			if type(self.PV_model).__name__ in templates.three_phase_models:
+				output_names = output_names + ['ib_t','ic_t','mb_t','mc_t','vtb_t','vtc_t','vb_t','vc_t']
+			
+			return output_names
+		except:
+			LogUtil.exception_handler()
+
+
+	def store_loop_mode_Ppv(self):
+		"""PV power and insolation history is stored in loop mode only if all outputs are requested or they are included in outputs."""
+		try:
+			return self.outputs is None or 'Ppv_t' in self.outputs or 'Sinsol_t' in self.outputs
+		except:
+			LogUtil.exception_handler()
+
+
+	def initialize_trajectory_directory(self,trajectory_directory):
+		"""Create directory for storing trajectories of this simulation instance in memory mapped files."""
+		try:
+			if trajectory_directory is None:
+				self.trajectory_directory = None
+			else:
+				self.trajectory_directory = os.path.join(trajectory_directory,self.name)
+				if not os.path.exists(self.trajectory_directory):
+					os.makedirs(self.trajectory_directory)
+				LogUtil.logger.debug('{}:States and inputs will be stored in {}.'.format(self.name,self.trajectory_directory))
+		except:
+			LogUtil.exception_handler()
+
+
+	def trajectory_buffer(self,name,values,dtype=None):
+		"""Buffer for storing a trajectory in memory, or in a memory mapped file if trajectory directory was specified."""
+		try:
+			if self.trajectory_directory is None:
+				return GrowableArray(values,dtype=dtype)
+			else:
+				return MemmapArray(os.path.join(self.trajectory_directory,name + '.npy'),values,dtype=dtype)
+		except:
+			LogUtil.exception_handler()
+
+
+	def clear_derived_trajectories(self):
+		"""Remove stored derived trajectories so that they are calculated again from the states on next access."""
+		try:
+			for name in self.derived_trajectories:
+				self.__dict__.pop(name,None)
+		except:
+			LogUtil.exception_handler()
+
+
 	@property
 	def y0(self):
-		""" Combine all initial conditions from solution."""
+		""" Combine all initial conditions from solution (in the order of the state layout of the DER model)."""
 		try:
-			if type(self.PV_model).__name__ == 'SolarPVDERThreePhase':
-				y0 = [self.iaR_t[-1], self.iaI_t[-1], self.xaR_t[-1], self.xaI_t[-1], self.uaR_t[-1],self.uaI_t[-1],\
-					  self.ibR_t[-1], self.ibI_t[-1], self.xbR_t[-1], self.xbI_t[-1], self.ubR_t[-1],self.ubI_t[-1],\
-					  self.icR_t[-1], self.icI_t[-1], self.xcR_t[-1], self.xcI_t[-1], self.ucR_t[-1],self.ucI_t[-1],\
-					  self.Vdc_t[-1],
-					  self.xDC_t[-1],self.xQ_t[-1],
-					  self.xPLL_t[-1],self.wte_t[-1]]	
-		
-			elif type(self.PV_model).__name__ == 'SolarPVDERSinglePhase':
-				y0 =[self.iaR_t[-1], self.iaI_t[-1], self.xaR_t[-1], self.xaI_t[-1], self.uaR_t[-1],self.uaI_t[-1],\
-					 self.Vdc_t[-1],
-					 self.xDC_t[-1],self.xQ_t[-1],
-					 self.xPLL_t[-1],self.wte_t[-1]]
-		
-			elif type(self.PV_model).__name__ == 'SolarPVDERSinglePhaseConstantVdc':
-				y0 =[self.iaR_t[-1], self.iaI_t[-1], self.xaR_t[-1], self.xaI_t[-1], self.uaR_t[-1],self.uaI_t[-1],\
-					 self.xP_t[-1],self.xQ_t[-1],
-					 self.xPLL_t[-1],self.wte_t[-1]]
-		
-			elif type(self.PV_model).__name__ == 'SolarPVDERThreePhaseConstantVdc':
-				y0 =[self.iaR_t[-1], self.iaI_t[-1], self.xaR_t[-1], self.xaI_t[-1], self.uaR_t[-1],self.uaI_t[-1],
-					 self.ibR_t[-1], self.ibI_t[-1], self.xbR_t[-1], self.xbI_t[-1], self.ubR_t[-1],self.ubI_t[-1],
-					 self.icR_t[-1], self.icI_t[-1], self.xcR_t[-1], self.xcI_t[-1], self.ucR_t[-1],self.ucI_t[-1],
-					 self.xP_t[-1],self.xQ_t[-1],
-					 self.xPLL_t[-1],self.wte_t[-1]]		
-		
-			elif self.DER_model_type == 'SolarPVDERThreePhaseBalanced':
-				y0 =[self.iaR_t[-1], self.iaI_t[-1], self.xaR_t[-1], self.xaI_t[-1], self.uaR_t[-1],self.uaI_t[-1],
-					 self.Vdc_t[-1],
-					 self.xDC_t[-1],self.xQ_t[-1],
-					 self.xPLL_t[-1],self.wte_t[-1]]
+			y0 = [getattr(self,state + '_t')[-1] for state in templates.state_layouts[self.DER_model_type]['states']]
 
 			return y0
 		except:
@@ -136,8 +238,8 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 		"""Check if Jacobian matrix is available."""		
 		try:
 			if self.jacFlag:
-				if not self.DER_model_type in self.jac_list:
-					raise ValueError('{}:Jacobian matrix is not available for DER model:{}'.format(self.name,self.DER_model_type))
+				if not self.DER_model_type in self.jac_list and not self.GENERATED_JACOBIAN:
+					LogUtil.logger.debug('{}:Analytical Jacobian matrix is not available for DER model:{} - finite difference Jacobian with column coloring will be used.'.format(self.name,self.DER_model_type))
 		except:
 			LogUtil.exception_handler()
 
@@ -145,112 +247,7 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 	def initialize_y0_t(self):
 		"""Initialize y0_t."""
 		try:
-			self.iaR_t = np.array([self.PV_model.y0[0]])
-			self.iaI_t = np.array([self.PV_model.y0[1]])
-			self.xaR_t = np.array([self.PV_model.y0[2]])
-			self.xaI_t = np.array([self.PV_model.y0[3]])
-			self.uaR_t = np.array([self.PV_model.y0[4]])
-			self.uaI_t = np.array([self.PV_model.y0[5]])
-		
-			if type(self.PV_model).__name__ == 'SolarPVDERSinglePhase':			
-				self.Vdc_t = np.array([self.PV_model.y0[6]]) #DC link voltage variable
-			
-				self.xDC_t = np.array([self.PV_model.y0[7]]) #DC link voltage control variable
-				self.xQ_t = np.array([self.PV_model.y0[8]]) #Reactive power control variable
-			
-				self.xPLL_t = np.array([self.PV_model.y0[9]]) #PLL variables			
-				self.wte_t = np.array([self.PV_model.y0[10]]) #Frequency integration to get angle
-		
-			elif type(self.PV_model).__name__ == 'SolarPVDERThreePhase':
-				self.ibR_t = np.array([self.PV_model.y0[6]])
-				self.ibI_t = np.array([self.PV_model.y0[7]])
-				self.xbR_t = np.array([self.PV_model.y0[8]])
-				self.xbI_t = np.array([self.PV_model.y0[9]])
-				self.ubR_t = np.array([self.PV_model.y0[10]])
-				self.ubI_t = np.array([self.PV_model.y0[11]])
-
-				self.icR_t = np.array([self.PV_model.y0[12]])
-				self.icI_t = np.array([self.PV_model.y0[13]])
-				self.xcR_t = np.array([self.PV_model.y0[14]])
-				self.xcI_t = np.array([self.PV_model.y0[15]])
-				self.ucR_t = np.array([self.PV_model.y0[16]])
-				self.ucI_t = np.array([self.PV_model.y0[17]])
-
-				self.Vdc_t = np.array([self.PV_model.y0[18]])
-			
-				self.xDC_t = np.array([self.PV_model.y0[19]])
-				self.xQ_t = np.array([self.PV_model.y0[20]])
-			
-				self.xPLL_t = np.array([self.PV_model.y0[21]])
-				self.wte_t = np.array([self.PV_model.y0[22]])
-			
-			elif type(self.PV_model).__name__ == 'SolarPVDERThreePhaseConstantVdc':
-				self.ibR_t = np.array([self.PV_model.y0[6]])
-				self.ibI_t = np.array([self.PV_model.y0[7]])
-				self.xbR_t = np.array([self.PV_model.y0[8]])
-				self.xbI_t = np.array([self.PV_model.y0[9]])
-				self.ubR_t = np.array([self.PV_model.y0[10]])
-				self.ubI_t = np.array([self.PV_model.y0[11]])
-
-				self.icR_t = np.array([self.PV_model.y0[12]])
-				self.icI_t = np.array([self.PV_model.y0[13]])
-				self.xcR_t = np.array([self.PV_model.y0[14]])
-				self.xcI_t = np.array([self.PV_model.y0[15]])
-				self.ucR_t = np.array([self.PV_model.y0[16]])
-				self.ucI_t = np.array([self.PV_model.y0[17]])
-			
-				self.Vdc_t = np.array([self.PV_model.Vdc]) #Voltage is constant
-			
-				self.xP_t = np.array([self.PV_model.y0[18]])  #Active power control variable
-				self.xQ_t = np.array([self.PV_model.y0[19]])  #Reactive power control variable
-			
-				self.xPLL_t = np.array([self.PV_model.y0[20]]) #PLL variables			
-				self.wte_t = np.array([self.PV_model.y0[21]]) #Frequency integration to get angle
-		
-			elif type(self.PV_model).__name__ == 'SolarPVDERThreePhaseBalanced':			
-			
-				ia_t = self.iaR_t+self.iaI_t*1j
-				xa_t = self.xaR_t+self.xaI_t*1j
-				ua_t = self.uaR_t+self.uaI_t*1j
-			
-				ib_t = utility_functions.Ub_calc(ia_t)
-				xb_t = utility_functions.Ub_calc(xa_t)
-				ub_t = utility_functions.Ub_calc(ua_t)
-			
-				ic_t = utility_functions.Uc_calc(ia_t)
-				xc_t = utility_functions.Uc_calc(xa_t)
-				uc_t = utility_functions.Uc_calc(ua_t)			
-			
-				self.ibR_t = ib_t.real 
-				self.ibI_t = ib_t.imag 
-				self.xbR_t = xb_t.real 
-				self.xbI_t = xb_t.imag 
-				self.ubR_t = ub_t.real
-				self.ubI_t = ub_t.imag 
-
-				self.icR_t = ic_t.real 
-				self.icI_t = ic_t.imag 
-				self.xcR_t = xc_t.real 
-				self.xcI_t = xc_t.imag 
-				self.ucR_t = uc_t.real 
-				self.ucI_t = uc_t.imag
-			
-				self.Vdc_t = np.array([self.PV_model.y0[6]]) #DC link voltage variable
-			
-				self.xDC_t = np.array([self.PV_model.y0[7]]) #DC link voltage control variable
-				self.xQ_t = np.array([self.PV_model.y0[8]]) #Reactive power control variable
-			
-				self.xPLL_t = np.array([self.PV_model.y0[9]]) #PLL variables			
-				self.wte_t = np.array([self.PV_model.y0[10]]) #Frequency integration to get angle
-		
-			elif type(self.PV_model).__name__ == 'SolarPVDERSinglePhaseConstantVdc':		
-				self.Vdc_t = np.array([self.PV_model.Vdc]) #Voltage is constant
-			
-				self.xP_t = np.array([self.PV_model.y0[6]])  #Active power control variable
-				self.xQ_t = np.array([self.PV_model.y0[7]])  #Reactive power control variable
-			
-				self.xPLL_t = np.array([self.PV_model.y0[8]]) #PLL variables			
-				self.wte_t = np.array([self.PV_model.y0[9]]) #Frequency integration to get angle
+			self.collect_states(np.array([self.PV_model.y0],dtype=float))
 		except:
 			LogUtil.exception_handler()
 
@@ -258,40 +255,16 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 	def reset_stored_trajectories(self):
 		"""Reset for plotting."""
 		try:
-			self._t_t = np.array(0.0)
-			self.Vdc_t = self._Vdc_t = np.array(self.PV_model.Vdc)
-		
-			self.ia_t = self._ia_t = np.array(self.PV_model.ia)
-			self.ma_t = self._ma_t = np.array(self.PV_model.ma)
-			self.vta_t = self._vta_t = np.array(self.PV_model.vta)
-			self.va_t = self._va_t = np.array(self.PV_model.va)
-		
-			self.ma_absolute_t = self._ma_absolute_t = np.array(abs(self.PV_model.ma))
-			self.Varms_t  = self._Varms_t = np.array(abs(self.PV_model.va)/math.sqrt(2))
-		
+			self._t_t = self.trajectory_buffer('t_t',[0.0])
+			self._y_t = self.trajectory_buffer('y_t',[self.PV_model.y0],dtype=float)
+			self._va_t = self.trajectory_buffer('va_t',[self.PV_model.va],dtype=complex)
 			if type(self.PV_model).__name__ in templates.three_phase_models:
-				self.mb_absolute_t = self._mb_absolute_t = np.array(abs(self.PV_model.mb))
-				self.mc_absolute_t = self._mc_absolute_t = np.array(abs(self.PV_model.mc))
-			
-				self.Vbrms_t  = self._Vbrms_t = np.array(abs(self.PV_model.vb)/math.sqrt(2))
-				self.Vcrms_t  = self._Vcrms_t = np.array(abs(self.PV_model.vc)/math.sqrt(2))
-			
-				self.ib_t = self._ib_t = np.array(self.PV_model.ib)
-				self.mb_t = self._mb_t = np.array(self.PV_model.mb)
-				self.vtb_t = self._vtb_t = np.array(self.PV_model.vtb)
-				self.vb_t = self._vb_t = np.array(self.PV_model.vb)
-			
-				self.ic_t = self._ic_t = np.array(self.PV_model.ic)
-				self.mc_t = self._mc_t = np.array(self.PV_model.mc)
-				self.vtc_t = self._vtc_t = np.array(self.PV_model.vtc)
-				self.vc_t = self._vc_t = np.array(self.PV_model.vc)
-		
-			self.Irms_t = self._Irms_t = np.array(self.PV_model.Irms)
-			self.Ppv_t = self._Ppv_t = np.array(self.PV_model.Ppv)
-			self.S_PCC_t = self._S_PCC_t = np.array(self.PV_model.S_PCC)
-			self.S_t = self._S_t = np.array(self.PV_model.S)
-			self.Vtrms_t = self._Vtrms_t = np.array(self.PV_model.Vtrms)
-			self.Vrms_t = self._Vrms_t = np.array(self.PV_model.Vrms)
+				self._vb_t = self.trajectory_buffer('vb_t',[self.PV_model.vb],dtype=complex)
+				self._vc_t = self.trajectory_buffer('vc_t',[self.PV_model.vc],dtype=complex)
+			if self.store_loop_mode_Ppv():
+				self._Ppv_t = self.trajectory_buffer('Ppv_t',[self.PV_model.Ppv],dtype=float)
+				self._Sinsol_t = self.trajectory_buffer('Sinsol_t',[self.PV_model.Sinsol],dtype=float)
+			self.invert_arrays()
 		except:
 			LogUtil.exception_handler()
 
@@ -318,7 +291,12 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 			y1 = y[0:self.PV_model.n_ODE]
 			if self.PV_model.standAlone:
 				self.grid_model.steady_state_model(t)
-			y = self.PV_model.jac_ODE_model(y1,t)
+			if self.GENERATED_JACOBIAN:
+				y = self.PV_model.jac_generated(t,y1,self.PV_model.get_rhs_parameters())
+			elif self.DER_model_type in self.jac_list:
+				y = self.PV_model.jac_ODE_model(y1,t)
+			else:
+				y = self.jac_ODE_model_colored(y1,t)
 
 			return y
 		except:
@@ -453,29 +431,12 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 	def time_series_standalone_grid(self):
 		"""Time series grid voltage and frequency for standalone model."""
 		try:
-			self.vag_t = []
-			self.vbg_t = []
-			self.vcg_t = []
-			self.wgrid_t = []
-			for i,t in enumerate(self.t):   #Loop through grid events and calculate wgrid at each time step
-
-					Vagrid_new,self.grid_model.wgrid = self.simulation_events.grid_events(t)
-				
-					#Conversion of grid voltage setpoint
-					self.grid_model.vag = Vagrid_new*(self.grid_model.Vgridrated/self.Vbase)
-					self.grid_model.vbg = utility_functions.Ub_calc(self.grid_model.vag*self.grid_model.unbalance_ratio_b)
-					self.grid_model.vcg = utility_functions.Uc_calc(self.grid_model.vag*self.grid_model.unbalance_ratio_c)  
-		
-					self.vag_t.append(self.grid_model.vag)
-					self.vbg_t.append(self.grid_model.vbg)
-					self.vcg_t.append(self.grid_model.vcg)
-				
-					self.wgrid_t.append(self.grid_model.wgrid)
-
-			self.vag_t = np.asarray(self.vag_t)
-			self.vbg_t = np.asarray(self.vbg_t)
-			self.vcg_t = np.asarray(self.vcg_t)
-			self.wgrid_t = np.asarray(self.wgrid_t)
+			Vagrid_t,self.wgrid_t = self.simulation_events.grid_events_time_series(np.asarray(self.t))
+			
+			#Conversion of grid voltage setpoint
+			self.vag_t = Vagrid_t*(self.grid_model.Vgridrated/self.Vbase)
+			self.vbg_t = utility_functions.Ub_calc(self.vag_t*self.grid_model.unbalance_ratio_b)
+			self.vcg_t = utility_functions.Uc_calc(self.vag_t*self.grid_model.unbalance_ratio_c)
 		
 			self.vagR_t = self.vag_t.real
 			self.vagI_t = self.vag_t.imag
@@ -485,9 +446,6 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 		
 			self.vcgR_t = self.vcg_t.real
 			self.vcgI_t = self.vcg_t.imag
-		
-			if not self.LOOP_MODE:
-				self.simulation_events.reset_event_counters() #reset event counters
 		except:
 			LogUtil.exception_handler()
 
@@ -495,36 +453,19 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 	def time_series_PLL(self):
 		"""Calculate time series PLL and d-q quantities."""
 		try:
-			self.vd_t = []
-			self.vq_t = []
-			self.we_t = []
-		
-			for i,t in enumerate(self.t):	 #Loop through time steps and calculate d-q values at each time step
-			
-				self.PV_model.wte = self.wte_t[i]
-				self.PV_model.xPLL = self.xPLL_t[i]
-			
-				if type(self.PV_model).__name__ in templates.single_phase_models:
-					self.PV_model.valpha = utility_functions.phasor_to_time_1phase(self.va_t[i],self.wgrid_t[i],t)
-					self.PV_model.vbeta =utility_functions.phasor_to_time_1phase(self.va_t[i]*pow(math.e,-1j*(math.pi/2)),self.wgrid_t[i],t)
-					self.PV_model.vd,self.PV_model.vq = utility_functions.alpha_beta_to_d_q(self.PV_model.valpha,self.PV_model.vbeta,self.PV_model.wte)
-			
-				elif type(self.PV_model).__name__ in templates.three_phase_models:
-					self.PV_model.vat = utility_functions.phasor_to_time_1phase(self.va_t[i],self.wgrid_t[i],t)
-					self.PV_model.vbt = utility_functions.phasor_to_time_1phase(self.vb_t[i],self.wgrid_t[i],t)
-					self.PV_model.vct = utility_functions.phasor_to_time_1phase(self.vc_t[i],self.wgrid_t[i],t)
-				
-					self.PV_model.vd,self.PV_model.vq,self.PV_model.v0 = utility_functions.abc_to_dq0(self.PV_model.vat,self.PV_model.vbt,self.PV_model.vct,self.PV_model.wte)
-				
-				self.PV_model.we = self.PV_model.we_calc() #Calculate inverter frequency from PLL equation
+			t = np.asarray(self.t)
+			if type(self.PV_model).__name__ in templates.single_phase_models:
+				valpha_t = utility_functions.phasor_to_time_time_series(self.va_t,self.wgrid_t,t)
+				vbeta_t = utility_functions.phasor_to_time_time_series(self.va_t*np.exp(-1j*(math.pi/2)),self.wgrid_t,t)
+				self.vd_t,self.vq_t = utility_functions.alpha_beta_to_d_q_time_series(valpha_t,vbeta_t,self.wte_t)
 			
-				self.vd_t.append(self.PV_model.vd)
-				self.vq_t.append(self.PV_model.vq)
-				self.we_t.append(self.PV_model.we)
+			elif type(self.PV_model).__name__ in templates.three_phase_models:
+				vat_t = utility_functions.phasor_to_time_time_series(self.va_t,self.wgrid_t,t)
+				vbt_t = utility_functions.phasor_to_time_time_series(self.vb_t,self.wgrid_t,t)
+				vct_t = utility_functions.phasor_to_time_time_series(self.vc_t,self.wgrid_t,t)
+				self.vd_t,self.vq_t,_ = utility_functions.abc_to_dq0_time_series(vat_t,vbt_t,vct_t,self.wte_t)
 			
-			self.vd_t = np.asarray(self.vd_t)
-			self.vq_t = np.asarray(self.vq_t)
-			self.we_t = np.asarray(self.we_t)
+			self.we_t = self.PV_model.Kp_PLL*self.vd_t + self.xPLL_t + 2*math.pi*60.0 #Inverter frequency from PLL equation
 		except:
 			LogUtil.exception_handler()
 
@@ -537,15 +478,7 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 			else:
 				tAll=self.t
 
-			self.Zload1_t = []
-			for i,t in enumerate(tAll):	   #Loop through load events
-				_Zload1_actual =  self.simulation_events.load_events(t)  
-				_Zload1 = _Zload1_actual/self.PV_model.Zbase
-				self.Zload1_t.append(_Zload1)
-
-			self.Zload1_t = np.asarray(self.Zload1_t)
-			if not self.LOOP_MODE:
-				self.simulation_events.reset_event_counters() #reset event counters
+			self.Zload1_t = self.simulation_events.load_events_time_series(np.asarray(tAll))/self.PV_model.Zbase
 		except:
 			LogUtil.exception_handler()
 
@@ -553,18 +486,9 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 	def time_series_Ppv(self):
 		"""Calculate time series Solar PV power output."""
 		try:
-			self.Ppv_t = []
-			self.Sinsol_t = []
-			for i,t in enumerate(self.t):	   #Loop through solar events and calculate Ppv at each time step
-				self.PV_model.Sinsol,self.PV_model.Tactual =  self.simulation_events.solar_events(t)  #Parse through solar events
-				self.PV_model.Vdc = self.Vdc_t[i]
-				self.PV_model.Iph = self.PV_model.Iph_calc()
-				self.Sinsol_t.append(self.PV_model.Sinsol)
-				self.Ppv_t.append(self.PV_model.Ppv_calc(self.PV_model.Vdc_actual))
-			self.Sinsol_t = np.asarray(self.Sinsol_t)
-			self.Ppv_t = np.asarray(self.Ppv_t)
-			if not self.LOOP_MODE:
-				self.simulation_events.reset_event_counters() #reset event counters
+			self.Sinsol_t,Tactual_t = self.simulation_events.solar_events_time_series(np.asarray(self.t))
+			Vdc_actual_t = np.minimum(self.PV_model.Vdcmpp_max,self.Vdc_t*self.PV_model.Vdcbase)
+			self.Ppv_t = self.PV_model.Ppv_time_series(self.Sinsol_t,Tactual_t,Vdc_actual_t)
 		except:
 			LogUtil.exception_handler()
 
@@ -630,7 +554,7 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 			if self.LOOP_MODE:
 				self.t = t
 				self.collect_full_trajectory(solution)
-				self.collect_last_states()
+				self.collect_last_states(solution)
 			else:
 				self.collect_full_trajectory(solution)
 			LogUtil.logger.debug('{}:Stored solution for {} time points starting at {:.3f} s and ending at {:.3f} s!'.format(self.name,len(self.t),self.t[0],self.t[-1]))
@@ -638,44 +562,18 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 			LogUtil.exception_handler()
 
 
-	def collect_last_states(self):
-		"""Collect states at last time step."""
+	def collect_last_states(self,solution):
+		"""Collect states and inputs after first time step in loop mode. Other trajectories are calculated from these when needed."""
 		try:
-			self._t_t = np.append(self._t_t,self.t[1:])
-			self._Vdc_t = np.append(self._Vdc_t,self.Vdc_t[1:])
-			self._ia_t = np.append(self._ia_t,self.ia_t[1:])
-			self._ma_t = np.append(self._ma_t,self.ma_t[1:])
-			self._vta_t = np.append(self._vta_t,self.vta_t[1:])
-			self._va_t = np.append(self._va_t,self.va_t[1:])
-		
-			self._ma_absolute_t = np.append(self._ma_absolute_t,self.ma_absolute_t[1:])
-			self._Varms_t = np.append(self._Varms_t,self.Varms_t[1:])
-		
+			self._t_t.append(self.t[1:])
+			self._y_t.append(solution[1:])
+			self._va_t.append(self.va_t[1:])
 			if type(self.PV_model).__name__ in templates.three_phase_models:
-				self._mb_absolute_t = np.append(self._mb_absolute_t,self.mb_absolute_t[1:])
-				self._mc_absolute_t = np.append(self._mc_absolute_t,self.mc_absolute_t[1:])
-			
-				self._Vbrms_t = np.append(self._Vbrms_t,self.Vbrms_t[1:])
-				self._Vcrms_t = np.append(self._Vcrms_t,self.Vcrms_t[1:])
-			
-				self._ib_t = np.append(self._ib_t,self.ib_t[1:])
-				self._mb_t = np.append(self._mb_t,self.mb_t[1:])
-				self._vtb_t = np.append(self._vtb_t,self.vtb_t[1:])
-				self._vb_t = np.append(self._vb_t,self.vb_t[1:])
-			
-				self._ic_t = np.append(self._ic_t,self.ic_t[1:])
-				self._mc_t = np.append(self._mc_t,self.mc_t[1:])
-				self._vtc_t = np.append(self._vtc_t,self.vtc_t[1:])
-				self._vc_t = np.append(self._vc_t,self.vc_t[1:])
-		
-			self._Irms_t = np.append(self._Irms_t,self.Irms_t[1:])		
-
-			self._Vtrms_t = np.append(self._Vtrms_t,self.Vtrms_t[1:])
-			self._Vrms_t = np.append(self._Vrms_t,self.Vrms_t[1:])		
-		
-			self._Ppv_t = np.append(self._Ppv_t,self.Ppv_t[1:])
-			self._S_t = np.append(self._S_t,self.S_t[1:])
-			self._S_PCC_t = np.append(self._S_PCC_t,self.S_PCC_t[1:])
+				self._vb_t.append(self.vb_t[1:])
+				self._vc_t.append(self.vc_t[1:])
+			if self.store_loop_mode_Ppv():
+				self._Ppv_t.append(self.Ppv_t[1:]) #Solar events are only available at current time in loop mode
+				self._Sinsol_t.append(self.Sinsol_t[1:])
 		except:
 			LogUtil.exception_handler()
 
@@ -683,221 +581,114 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 	def collect_full_trajectory(self,solution):
 		"""Collect full solution from solver."""
 		try:
-			#Collect states
-			self.t_t  = self.t #Time stamps
-		
-			self.collect_states(solution)
-				
-			#Time series current
-			self.ia_t = self.iaR_t + 1j*self.iaI_t
-			#Time series u
-			self.ua_t = self.uaR_t + 1j*self.uaI_t
-			#Time series x
-			self.xa_t = self.xaR_t+1j*self.xaI_t
-			assert len(self.ua_t) == len(self.xa_t) != None, "States must be available from simulation."
-				
-			if type(self.PV_model).__name__ in templates.three_phase_models:
-				self.ib_t = self.ibR_t + 1j*self.ibI_t
-				self.ic_t = self.icR_t + 1j*self.icI_t
-		
-				self.ub_t = self.ubR_t + 1j*self.ubI_t
-				self.uc_t = self.ucR_t + 1j*self.ucI_t
-			
-				self.xb_t = self.xbR_t+1j*self.xbI_t
-				self.xc_t = self.xcR_t+1j*self.xcI_t
-				assert len(self.ua_t) == len(self.ub_t) == len(self.uc_t) == len(self.xa_t) == len(self.xb_t) == len(self.xc_t) != None, "States must be available from simulation."
+			decimated_trajectories = {}
+			if self.tOutput is not None and not self.LOOP_MODE:
+				solution,decimated_trajectories = self.decimate_solution(solution)
 			
-			#Time series PCC voltage
-			self.time_series_duty_cycle()
-		
-			#Exhibit different behavior in stand alone mode
-			if self.PV_model.standAlone:
-				self.time_series_standalone_grid() #Grid voltage
-				self.time_series_Zload1()		
-		
-			self.time_series_inv_terminal_voltage()
-			self.time_series_PCC_LV_side_voltage()
-		
-			if self.PV_model.standAlone:
-				self.time_series_PCC_HV_side_voltage()
-		
-			self.time_series_S()
-			self.time_series_RMS()
-			self.time_series_Ppv()
-		
-			self.time_series_phase_angle()
-			#self.time_series_power_transfer()
-			#self.time_series_wgrid()
-			if self.PV_model.standAlone:
-				self.time_series_PLL()
+			#Collect states
+			if self.trajectory_directory is not None and not self.LOOP_MODE: #Loop mode states are stored by collect_last_states()
+				self._t_t = self.trajectory_buffer('t_t',self.t,dtype=float)
+				self._y_t = self.trajectory_buffer('y_t',solution,dtype=float)
+				self.t_t = self._t_t.data #Time stamps
+				self.collect_states(self._y_t.data)
+			else:
+				self.t_t  = self.t #Time stamps
+				self.collect_states(solution)
+			self.clear_derived_trajectories() #Other trajectories are calculated from states on first access
+			for name,trajectory in decimated_trajectories.items():
+				setattr(self,name,trajectory)
 		
 			LogUtil.logger.debug("All states collected!")
 		except:
 			LogUtil.exception_handler()
 
 
-	def collect_states(self,solution):
-		"""Collect states from ode solution."""
-		try:
-			 #Phase a states
-			self.iaR_t = solution[:,0]
-			self.iaI_t = solution[:,1]
-			self.xaR_t = solution[:,2]
-			self.xaI_t = solution[:,3]
-			self.uaR_t = solution[:,4]
-			self.uaI_t = solution[:,5]			  
-		
-			if type(self.PV_model).__name__ == 'SolarPVDERSinglePhase':
-				#DC link voltage variables
-				self.Vdc_t = solution[:,6]
-				self.xDC_t = solution[:,7]
-				self.xQ_t = solution[:,8]
-				#PLL variables
-				self.xPLL_t = solution[:,9]
-				#Frequency integration to get angle
-				self.wte_t = solution[:,10]
-
-			elif type(self.PV_model).__name__ == 'SolarPVDERThreePhase':
-			
-				#Phase b states
-				self.ibR_t = solution[:,6]
-				self.ibI_t = solution[:,7]
-				self.xbR_t = solution[:,8]
-				self.xbI_t = solution[:,9]
-				self.ubR_t = solution[:,10]
-				self.ubI_t = solution[:,11]
-
-				#Phase c states
-				self.icR_t = solution[:,12]
-				self.icI_t = solution[:,13]
-				self.xcR_t = solution[:,14]
-				self.xcI_t = solution[:,15]
-				self.ucR_t = solution[:,16]
-				self.ucI_t = solution[:,17]
-
-				#DC link voltage variables
-				self.Vdc_t = solution[:,18]
-				self.xDC_t = solution[:,19]
-				self.xQ_t = solution[:,20]
-
-				#PLL variables
-				self.xPLL_t = solution[:,21]
-				#Frequency integration to get angle
-				self.wte_t = solution[:,22]		
-		
-			elif type(self.PV_model).__name__ == 'SolarPVDER_SinglePhaseConstantVdc':
-				self.Vdc_t = np.array([self.PV_model.Vdc]*len(self.iaR_t))
-						
-				self.xP_t = solution[:,6] #Active power control variable
-				self.xQ_t = solution[:,7] #Reactive power control variable
-			
-				self.xPLL_t = solution[:,8] #PLL variables			
-				self.wte_t = solution[:,9] #Frequency integration to get angle
-		
-			elif type(self.PV_model).__name__ == 'SolarPVDERThreePhaseConstantVdc':
-				#Phase b states
-				self.ibR_t = solution[:,6]
-				self.ibI_t = solution[:,7]
-				self.xbR_t = solution[:,8]
-				self.xbI_t = solution[:,9]
-				self.ubR_t = solution[:,10]
-				self.ubI_t = solution[:,11]
-
-				#Phase c states
-				self.icR_t = solution[:,12]
-				self.icI_t = solution[:,13]
-				self.xcR_t = solution[:,14]
-				self.xcI_t = solution[:,15]
-				self.ucR_t = solution[:,16]
-				self.ucI_t = solution[:,17]
-			
-				self.Vdc_t = np.array([self.PV_model.Vdc]*len(self.iaR_t))
-			
-				self.xP_t = solution[:,18]  #Active power control variable
-				self.xQ_t = solution[:,19]  #Reactive power control variable
-			
-				self.xPLL_t = solution[:,20] #PLL variables			
-				self.wte_t = solution[:,21] #Frequency integration to get angle
-			
-			elif type(self.PV_model).__name__ == 'SolarPVDERThreePhaseBalanced':
-			
-				ia_t = self.iaR_t+self.iaI_t*1j
-				xa_t = self.xaR_t+self.xaI_t*1j
-				ua_t = self.uaR_t+self.uaI_t*1j
-			
-				ib_t = utility_functions.Ub_calc(ia_t)
-				xb_t = utility_functions.Ub_calc(xa_t)
-				ub_t = utility_functions.Ub_calc(ua_t)
-			
-				ic_t = utility_functions.Uc_calc(ia_t)
-				xc_t = utility_functions.Uc_calc(xa_t)
-				uc_t = utility_functions.Uc_calc(ua_t)			
-			
-				self.ibR_t = ib_t.real 
-				self.ibI_t = ib_t.imag 
-				self.xbR_t = xb_t.real 
-				self.xbI_t = xb_t.imag 
-				self.ubR_t = ub_t.real
-				self.ubI_t = ub_t.imag 
+	def decimate_solution(self,solution):
+		"""Reduce solution from simulation time step (tInc) to output time step (tOutput).
+		With 'sample' only states at output time steps are kept and other trajectories are calculated from them.
+		With 'minmax' and 'rms' the trajectories returned by `get_trajectories()` are calculated at simulation time step before they are reduced.
+		Returns:
+			 tuple: Solution at output time steps and dictionary of reduced trajectories.
+		"""
+		try:
+			if self.decimation_method not in self.decimation_list:
+				raise ValueError('{} is not a valid decimation method - available methods:{}'.format(self.decimation_method,self.decimation_list))
+			n_decimation = int(round(self.tOutput/self.tInc))
+			decimated_trajectories = {}
+			if n_decimation <= 1:
+				return solution,decimated_trajectories
+			
+			if self.decimation_method != 'sample':
+				self.t_t = self.t
+				self.collect_states(solution)
+				self.clear_derived_trajectories()
+				for name in self.output_names():
+					decimated_trajectories[name] = utility_functions.decimate_time_series(getattr(self,name),n_decimation,self.decimation_method)
+			
+			indices = np.arange(0,len(solution),n_decimation)
+			self.t = np.asarray(self.t)[indices]
+			LogUtil.logger.debug('{}:Solution reduced from {} to {} time steps using {}.'.format(self.name,len(solution),len(indices),self.decimation_method))
+			
+			return solution[indices],decimated_trajectories
+		except:
+			LogUtil.exception_handler()
 
-				self.icR_t = ic_t.real 
-				self.icI_t = ic_t.imag 
-				self.xcR_t = xc_t.real 
-				self.xcI_t = xc_t.imag 
-				self.ucR_t = uc_t.real 
-				self.ucI_t = uc_t.imag
-			
-				#DC link voltage variables
-				self.Vdc_t = solution[:,6]
-				self.xDC_t = solution[:,7]
-				self.xQ_t = solution[:,8]
-				#PLL variables
-				self.xPLL_t = solution[:,9]
-				#Frequency integration to get angle
-				self.wte_t = solution[:,10]
+
+	def collect_states(self,solution):
+		"""Collect states from ode solution (complex states are views of the adjacent real and imaginary parts in the solution)."""
+		try:
+			solution = np.asanyarray(solution)
+			if solution.dtype != np.float64 or solution.strides[1] != solution.itemsize: #Columns should be adjacent for complex views
+				solution = np.ascontiguousarray(solution,dtype=np.float64)
+			
+			layout = templates.state_layouts[self.DER_model_type]
+			for state,state_slice in zip(layout['complex_states'],layout['complex_slices']):
+				u_t = solution[:,state_slice].view(np.complex128)[:,0]
+				setattr(self,state + '_t',u_t)
+				setattr(self,state + 'R_t',u_t.real)
+				setattr(self,state + 'I_t',u_t.imag)
+			
+			for state,i in zip(layout['real_states'],layout['real_indices']):
+				setattr(self,state + '_t',solution[:,i])
+			
+			if 'Vdc' not in layout['index']:
+				self.Vdc_t = np.full(len(solution),self.PV_model.Vdc) #Voltage is constant
+			
+			for phase in layout['derived_phases']: #Phase b and c states in balanced model
+				phase_calc = {'b':utility_functions.Ub_calc,'c':utility_functions.Uc_calc}[phase]
+				for state in ['i','x','u']:
+					u_t = phase_calc(getattr(self,state + 'a_t'))
+					setattr(self,state + phase + '_t',u_t)
+					setattr(self,state + phase + 'R_t',u_t.real)
+					setattr(self,state + phase + 'I_t',u_t.imag)
 		except:
 			LogUtil.exception_handler()
 
 
 	def invert_arrays(self):
-		"""Inverter arrays before usage by plots."""
+		"""Use states and inputs collected in loop mode for trajectories before usage by plots (views of the stored arrays without copying)."""
 		try:
-			self.t_t = self._t_t
-			self.Vdc_t = self._Vdc_t
-		
-			self.ia_t = self._ia_t
-			self.ma_t = self._ma_t
-			self.vta_t = self._vta_t
-			self.va_t = self._va_t
-		
-			self.ma_absolute_t = self._ma_absolute_t
-			self.Varms_t = self._Varms_t
-		
+			self.clear_derived_trajectories()
+			for name in ['_t_t','_y_t','_va_t','_vb_t','_vc_t','_Ppv_t','_Sinsol_t']:
+				if name in self.__dict__:
+					self.__dict__[name].flush() #Update memory mapped files
+			self.t_t = self._t_t.data
+			self.collect_states(self._y_t.data)
+		
+			self.va_t = self._va_t.data
+			self.vaR_t = self.va_t.real
+			self.vaI_t = self.va_t.imag
 			if type(self.PV_model).__name__ in templates.three_phase_models:
-				self.mb_absolute_t = self._mb_absolute_t
-				self.mc_absolute_t = self._mc_absolute_t
-			
-				self.Vbrms_t = self._Vbrms_t
-				self.Vcrms_t = self._Vcrms_t
-			
-				self.ib_t = self._ib_t
-				self.mb_t = self._mb_t
-				self.vtb_t = self._vtb_t
-				self.vb_t = self._vb_t
-			
-				self.ic_t = self._ic_t
-				self.mc_t = self._mc_t
-				self.vtc_t = self._vtc_t
-				self.vc_t = self._vc_t
-				
-			self.Vtrms_t = self._Vtrms_t
-			self.Vrms_t = self._Vrms_t
-				
-			self.Irms_t = self._Irms_t
+				self.vb_t = self._vb_t.data
+				self.vbR_t = self.vb_t.real
+				self.vbI_t = self.vb_t.imag
+				self.vc_t = self._vc_t.data
+				self.vcR_t = self.vc_t.real
+				self.vcI_t = self.vc_t.imag
 		
-			self.Ppv_t  = self._Ppv_t 
-			self.S_t =  self._S_t 
-			self.S_PCC_t = self._S_PCC_t
+			if self.store_loop_mode_Ppv():
+				self.Ppv_t = self._Ppv_t.data
+				self.Sinsol_t = self._Sinsol_t.data
 		except:
 			LogUtil.exception_handler()
 
@@ -918,7 +709,12 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 					six.print_("{}:Simulation started in loop mode with a step size of {:.4f} s!".format(self.name,self.t[-1]-self.t[0]))
 					if self.jacFlag:
 						LogUtil.logger.debug("{}:Analytical Jacobian will be provided to ODE solver.".format(self.name))
-				solution,_,_  = self.call_ODE_solver(self.ODE_model,self.jac_ODE_model,y0,t)
+					self.reset_persistent_solver()
+				
+				if self.PERSISTENT_SOLVER:
+					solution = self.call_ODE_solver_persistent(y0,t)
+				else:
+					solution,_,_  = self.call_ODE_solver(self.ODE_model,self.jac_ODE_model,y0,t)
 			
 			else:
 				self.t = self.t_calc()
@@ -930,17 +726,16 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 				if self.jacFlag:
 					LogUtil.logger.debug("{}:Analytical Jacobian will be provided to ODE solver.".format(self.name))
 				
-				if self.solver_type != 'odeint':
+				if self.solver_type == 'ode-vode-bdf':
 					self.ode_solver.set_initial_value(self.y0,self.tStart) 
 					LogUtil.logger.debug("{}:Resetting {} internal time step to {} and states to:\n{}.".format(self.name,self.solver_type,self.tStart,self.y0))
 		
-				solution,_,_  = self.call_ODE_solver(self.ODE_model,self.jac_ODE_model,self.y0,self.t)
+				solution = self.integrate(self.y0,self.t)
 			
 				self.solution_time = time.time() - timer_start
 			
 				self.show_simulation_time()
 				
-				self.simulation_events.reset_event_counters() #Reset grid and solar event counters
 				self.PV_model.reset_reference_counters() #Reset counters for reference change events
 		
 			if self.COLLECT_SOLUTION:
@@ -951,6 +746,88 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 			LogUtil.exception_handler()
 
 
+	def integrate(self,y0,t):
+		"""Integrate from initial states over time steps using the selected event handling options (not in loop mode)."""
+		try:
+			if self.LOCATE_RT_EVENTS:
+				t_events = [event['T'] for event in self.simulation_events.simulation_events_list]
+				LogUtil.logger.debug("{}:Ride through events will be located by root finding.".format(self.name))
+				solution = self.call_ODE_solver_RT_events(y0,t,t_events)
+			elif self.HYBRID_MODE:
+				LogUtil.logger.debug("{}:Ride through and connection logic will only be evaluated at time steps.".format(self.name))
+				solution = self.call_ODE_solver_hybrid(y0,t)
+			elif self.SEGMENT_AT_EVENTS and self.solver_type != 'ode-vode-bdf':
+				t_events = [event['T'] for event in self.simulation_events.simulation_events_list]
+				LogUtil.logger.debug("{}:Simulation will be split into segments at {} event time steps.".format(self.name,len(t_events)))
+				solution = self.call_ODE_solver_segmented(self.ODE_model,self.jac_ODE_model,y0,t,t_events)
+			else:
+				solution,_,_  = self.call_ODE_solver(self.ODE_model,self.jac_ODE_model,y0,t)
+			
+			return solution
+		except:
+			LogUtil.exception_handler()
+
+
+	def run_streaming(self,chunk_seconds):
+		"""Run simulation from tStart to tStop in chunks and yield time steps and trajectories after each chunk.
+		Trajectories of a chunk are discarded when the next chunk is simulated. Chunks do not include their end time (except the last chunk).
+		States carry over between chunks. The LSODA integrator (if solver is odeint or solve_ivp-LSODA) and the ode-vode-bdf integrator also carry over and LSODA is only restarted at events or changes in DER connection status.
+		Other solvers and solvers used to locate ride through events or in hybrid mode are restarted from the last states in each chunk.
+		Args:
+			 chunk_seconds (float): Duration of each chunk in seconds.
+		Yields:
+			 tuple: Time steps and dictionary of trajectories from `get_trajectories()`.
+		"""
+		try:
+			if self.LOOP_MODE:
+				raise ValueError('{}:Streaming simulation is not available in loop mode!'.format(self.name))
+			
+			self.solution_time = None
+			n_time_steps = int(np.ceil((self.tStop + self.tInc - self.tStart)/self.tInc)) #Same number of time steps as t_calc()
+			n_chunk = max(int(round(chunk_seconds/self.tInc)),1)
+			if self.tOutput is not None: #Chunks contain whole output time steps
+				n_decimation = max(int(round(self.tOutput/self.tInc)),1)
+				n_chunk = max(int(round(n_chunk/n_decimation)),1)*n_decimation
+			self.initialize_y0_t()
+			y = self.y0
+			t_events = [event['T'] for event in self.simulation_events.simulation_events_list]
+			PERSISTENT_SOLVER = self.solver_type in ['odeint','solve_ivp-LSODA'] and not self.LOCATE_RT_EVENTS and not self.HYBRID_MODE #odeint also uses LSODA
+			self.reset_persistent_solver()
+			
+			timer_start = time.time()
+			six.print_("{}:Streaming simulation started at {} s and will end at {} s in chunks of {} s".format(self.name,self.tStart,self.tStop,n_chunk*self.tInc))
+			if self.solver_type == 'ode-vode-bdf':
+				self.ode_solver.set_initial_value(y,self.tStart)
+			
+			for i in range(0,n_time_steps - 1,n_chunk):
+				t = self.tStart + np.arange(i,min(i + n_chunk,n_time_steps - 1) + 1)*self.tInc
+				if self.solver_type == 'ode-vode-bdf':
+					solution,_ = self.call_ode_solver(t_end=t[-1])
+					t = self.t
+				elif PERSISTENT_SOLVER:
+					solution = self.call_ODE_solver_persistent_events(y,t,t_events)
+				else:
+					solution = self.integrate(y,t)
+				y = list(solution[-1])
+				
+				i_end = len(t) if i + n_chunk >= n_time_steps - 1 else len(t) - 1 #End time is yielded with next chunk
+				self.t = t[:i_end]
+				self.collect_full_trajectory(solution[:i_end])
+				LogUtil.logger.debug('{}:Simulated chunk from {:.3f} s to {:.3f} s.'.format(self.name,t[0],t[-1]))
+				
+				yield self.t_t,self.get_trajectories()
+				self.clear_derived_trajectories()
+			
+			self.solution_time = time.time() - timer_start
+			self.show_simulation_time()
+			self.PV_model.reset_reference_counters()
+		except GeneratorExit: #Consumer stopped before last chunk
+			self.PV_model.reset_reference_counters()
+			raise
+		except:
+			LogUtil.exception_handler()
+
+
 	def update_grid_measurements(self,gridVoltagePhaseA, gridVoltagePhaseB, gridVoltagePhaseC):
 		"""Update grid voltage and frequency in non-standalone model.
 		Args:
@@ -983,15 +860,8 @@ class DynamicSimulation(Grid,SimulationUtilities,Utilities):
 		try:
 			if self.LOOP_MODE:
 				self.invert_arrays()
-			trajectory_dictionary = {'ia_t':self.ia_t,'ma_t':self.ma_t,
-									 'Vdc_t':self.Vdc_t,'vta_t':self.vta_t,'va_t':self.va_t,
-									 'Irms_t':self.Irms_t,'Vtrms_t':self.Vtrms_t,'Vrms_t':self.Vrms_t,
-									 'Ppv_t':self.Ppv_t,'S_t':self.S_t,'S_PCC_t':self.S_PCC_t
-									}
-			if type(self.PV_model).__name__ in templates.three_phase_models:
-				trajectory_dictionary.update({'ib_t':self.ib_t,'ic_t':self.ic_t,'mb_t':self.mb_t,'mc_t':self.mc_t,
-											  'vtb_t':self.vtb_t,'vtc_t':self.vtc_t,
-											  'vb_t':self.vb_t,'vc_t':self.vc_t})	 
+			#Only requested trajectories and trajectories they depend on are calculated
+			trajectory_dictionary = {output:getattr(self,output) for output in self.output_names()}
 
 			for trajectory in trajectory_dictionary.values():
 				assert len(self.t_t) == len(trajectory), 'The length of each trajectory should be equal to the time_steps.'
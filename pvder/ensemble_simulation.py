@@ -0,0 +1,186 @@
+"""Code for running simulations of an ensemble of PV-DER instances of the same type."""
+
+from __future__ import division
+import numpy as np
+import time
+
+import six
+from scipy.integrate import odeint
+
+from pvder.utility_classes import Utilities
+from pvder import defaults,templates
+from pvder.logutil import LogUtil
+
+
+class EnsembleSimulation(Utilities):
+	"""
+	   Utility class for simulating N PV-DER instances of the same type as a single (N,n_ODE) state array.
+	   The stateless `rhs` kernel of the DER model is evaluated for all instances in one call. Inputs (insolation, load, grid voltage)
+	   are updated at each simulation event time step. Ride through logic is not evaluated and connection status is kept constant.
+	"""
+
+	count = 0
+	tStart = 0.0
+	tInc = defaults.DEFAULT_DELTA_T
+
+	rtol = defaults.rtol
+	atol = defaults.atol
+	max_steps = defaults.max_steps
+
+	def __init__(self,PV_models,tStop = 0.5,identifier = None):
+		"""Creates an instance of `EnsembleSimulation`.
+		Args:
+		  PV_models (list): Instances of `SolarPVDER` of the same type.
+		  tStop (float): A scalar specifying the end time for simulation.
+		Raises:
+		  ValueError: If DER instances are not of the same type.
+		"""
+		try:
+			EnsembleSimulation.count = EnsembleSimulation.count + 1 #Increment count to keep track of number of ensemble instances
+			self.name_instance(identifier) #Generate a name for the instance
+
+			if len(PV_models) == 0:
+				raise ValueError('At least one DER instance should be provided for creating `EnsembleSimulation` instance!')
+			if len(set([type(PV_model).__name__ for PV_model in PV_models])) > 1:
+				raise ValueError('All DER instances in `EnsembleSimulation` should be of the same type!')
+
+			self.PV_models = list(PV_models)
+			self.DER_model_type = type(self.PV_models[0]).__name__
+			self.n_models = len(self.PV_models)
+			self.n_ODE = self.PV_models[0].n_ODE
+
+			self.tStop = tStop
+			self.t = self.t_calc()
+			self.solution_time = None
+			self.Y_t = None
+		except:
+			LogUtil.exception_handler()
+
+
+	@property
+	def y0(self):
+		"""Initial states of all DER instances as (N,n_ODE) array."""
+		try:
+			return np.array([PV_model.y0 for PV_model in self.PV_models])
+		except:
+			LogUtil.exception_handler()
+
+
+	def t_calc(self):
+		"""Vector of time steps for simulation"""
+		try:
+			return np.arange(self.tStart, self.tStop + self.tInc, self.tInc)
+		except:
+			LogUtil.exception_handler()
+
+
+	def update_inputs(self,t):
+		"""Update insolation, load, grid voltage, and DC link voltage reference of each DER instance at given time."""
+		try:
+			for PV_model in self.PV_models:
+				if PV_model.standAlone:
+					PV_model.grid_model.steady_state_model(t)
+				PV_model.update_Ppv(t)
+				PV_model.update_Zload1(t)
+				if 'Vdc' in templates.DER_design_template[self.DER_model_type]['initial_states']:
+					PV_model.update_Vdc_ref(t)
+		except:
+			LogUtil.exception_handler()
+
+
+	def get_rhs_parameters(self):
+		"""Parameters of all DER instances as (n_rhs_parameters,N) array."""
+		try:
+			return np.stack([PV_model.get_rhs_parameters() for PV_model in self.PV_models],axis=1)
+		except:
+			LogUtil.exception_handler()
+
+
+	def ODE_model(self,y,t,params):
+		"""Derivatives for the ensemble with states flattened from (N,n_ODE) array."""
+		try:
+			dY = self.PV_models[0].rhs(t,y.reshape(self.n_models,self.n_ODE).T,params)
+
+			return dY.T.ravel()
+		except:
+			LogUtil.exception_handler()
+
+
+	def get_events(self):
+		"""Distinct `SimulationEvents` instances used by DER instances and grid models."""
+		try:
+			events_list = []
+			for PV_model in self.PV_models:
+				events_list.append(PV_model.events)
+				if PV_model.standAlone:
+					events_list.append(PV_model.grid_model.events)
+
+			return list(set(events_list))
+		except:
+			LogUtil.exception_handler()
+
+
+	def get_event_times(self):
+		"""Time steps of simulation events of all DER instances within simulation time."""
+		try:
+			t_events = []
+			for events in self.get_events():
+				t_events.extend([event['T'] for event in events.simulation_events_list])
+
+			return [t_event for t_event in sorted(set(t_events)) if self.t[0] < t_event < self.t[-1]]
+		except:
+			LogUtil.exception_handler()
+
+
+	def run_simulation(self):
+		"""Integrate the ensemble between simulation events and collect states."""
+		try:
+			self.t = self.t_calc()
+			t = self.t
+			t_boundaries = [t[0]] + self.get_event_times() + [t[-1]]
+
+			solution = np.empty((len(t),self.n_models*self.n_ODE))
+			y = self.y0.ravel()
+
+			timer_start = time.time()
+			six.print_("{}:Simulation of {} {} instances started at {} s and will end at {} s".format(self.name,self.n_models,self.DER_model_type,self.tStart,self.tStop))
+
+			for i,(t_segment_start,t_segment_end) in enumerate(zip(t_boundaries[:-1],t_boundaries[1:])):
+				if i == len(t_boundaries)-2:
+					segment_index = np.where((t >= t_segment_start) & (t <= t_segment_end))[0]
+				else:
+					segment_index = np.where((t >= t_segment_start) & (t < t_segment_end))[0]
+				t_segment = np.unique(np.concatenate(([t_segment_start],t[segment_index],[t_segment_end])))
+
+				self.update_inputs(t_segment_start)
+				params = self.get_rhs_parameters()
+
+				#States of each DER instance are contiguous so the Jacobian is banded
+				segment_solution,infodict = odeint(self.ODE_model,y,t_segment,args=(params,),ml=self.n_ODE-1,mu=self.n_ODE-1,
+												   full_output=1,mxstep=self.max_steps,atol=self.atol,rtol=self.rtol)
+				if infodict['message'] != 'Integration successful.':
+					raise ValueError('{}:ODE solver failed between {:.4f} s and {:.4f} s:{}'.format(self.name,t_segment_start,t_segment_end,infodict['message']))
+
+				LogUtil.logger.debug('{}:Segment {:.4f} s to {:.4f} s completed with {} RHS evaluations.'.format(self.name,t_segment_start,t_segment_end,infodict['nfe'][-1]))
+				solution[segment_index] = segment_solution[np.searchsorted(t_segment,t[segment_index])]
+				y = segment_solution[-1]
+
+			self.solution_time = time.time() - timer_start
+			six.print_('{}:Simulation was completed in {}'.format(self.name,time.strftime("%H:%M:%S", time.gmtime(self.solution_time))))
+
+			self.Y_t = solution.reshape(len(t),self.n_models,self.n_ODE)
+		except:
+			LogUtil.exception_handler()
+
+
+	def get_state_trajectory(self,state):
+		"""Trajectory of a state for all DER instances.
+		Args:
+		  state (str): Name of state (e.g. 'Vdc').
+		Returns:
+		  ndarray: State trajectory with shape (n_t,N).
+		"""
+		try:
+			return self.Y_t[:,:,self.PV_models[0].varInd[state]]
+		except:
+			LogUtil.exception_handler()
@@ -0,0 +1,112 @@
+"""Code for verifying the Jacobian of DER models across many operating points."""
+
+from __future__ import division
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pvder.DER_wrapper import DERModel
+from pvder.simulation_events import SimulationEvents
+from pvder import defaults
+from pvder.logutil import LogUtil
+
+
+def get_operating_points(operating_point_values=None):
+	"""All combinations of insolation, grid voltage, reactive power set-point, and connection status.
+	Args:
+		 operating_point_values (dict): Lists of values for 'Sinsol', 'Vgrid', 'Q_ref', and 'DER_CONNECTED' (default: `defaults.jacobian_check_operating_points`).
+	Returns:
+		 list: Dictionaries describing operating points.
+	"""
+	try:
+		if operating_point_values is None:
+			operating_point_values = defaults.jacobian_check_operating_points
+		names = ['Sinsol','Vgrid','Q_ref','DER_CONNECTED']
+
+		return [dict(zip(names,values)) for values in itertools.product(*[operating_point_values[name] for name in names])]
+	except:
+		LogUtil.exception_handler()
+
+
+def check_model_jacobian(model_spec):
+	"""Create DER model and compare its Jacobian with central differences at sampled operating points.
+	Args:
+		 model_spec (dict): 'modelType', 'configFile', and 'kwargs' used to create `DERModel`, and 'operating_points', 'n_samples', 'state_perturbation', 'seed', and 'use_generated'.
+	Returns:
+		 dict: Model type, DER ID, and report from `check_jacobian_operating_points()`.
+	"""
+	try:
+		events = SimulationEvents(verbosity='WARNING')
+		PV_model = DERModel(model_spec['modelType'],events,model_spec['configFile'],**model_spec['kwargs']).DER_model
+
+		random_state = np.random.RandomState(model_spec['seed'])
+		y0 = np.array(PV_model.y0)
+		operating_points = []
+		for operating_point in model_spec['operating_points']:
+			for _ in range(model_spec['n_samples']):
+				y = y0*(1.0 + model_spec['state_perturbation']*random_state.standard_normal(len(y0)))
+				operating_points.append(dict(operating_point,y=y))
+
+		report = PV_model.check_jacobian_operating_points(operating_points,use_generated=model_spec['use_generated'])
+
+		return {'modelType':model_spec['modelType'],'derId':model_spec['kwargs'].get('derId'),'report':report}
+	except:
+		LogUtil.exception_handler()
+
+
+def jacobian_sweep(model_specs,operating_points=None,n_samples=1,state_perturbation=None,use_generated=False,n_workers=None,seed=0):
+	"""Verify Jacobian of several DER models at many operating points using a process pool.
+	Args:
+		 model_specs (list): Dictionaries with 'modelType' (e.g. 'ThreePhaseUnbalanced'), 'configFile', and 'kwargs' used to create a `DERModel` that is not stand alone.
+		 operating_points (list): Operating points from `get_operating_points()` (default: all default operating points).
+		 n_samples (int): Number of randomly perturbed state vectors at each operating point.
+		 state_perturbation (float): Standard deviation of relative perturbation of initial states (default: `defaults.jacobian_check_state_perturbation`).
+		 use_generated (bool): Check Jacobian generated from the `rhs` kernel instead of `jac_ODE_model`.
+		 n_workers (int): Number of worker processes (default: number of processors, 1: run in this process).
+		 seed (int): Seed for the random state perturbations.
+	Returns:
+		 list: Result from `check_model_jacobian()` for each model.
+	"""
+	try:
+		if operating_points is None:
+			operating_points = get_operating_points()
+		if state_perturbation is None:
+			state_perturbation = defaults.jacobian_check_state_perturbation
+
+		specs = [dict(model_spec,operating_points=operating_points,n_samples=n_samples,state_perturbation=state_perturbation,
+					  use_generated=use_generated,seed=seed + i) for i,model_spec in enumerate(model_specs)]
+
+		if n_workers == 1:
+			results = [check_model_jacobian(spec) for spec in specs]
+		else:
+			with ProcessPoolExecutor(max_workers=n_workers) as executor:
+				results = list(executor.map(check_model_jacobian,specs))
+
+		return results
+	except:
+		LogUtil.exception_handler()
+
+
+def show_jacobian_sweep_report(results,max_entries=5):
+	"""Print mismatches between analytical and numerical Jacobian found by `jacobian_sweep()`.
+	Args:
+		 results (list): Results from `jacobian_sweep()`.
+		 max_entries (int): Maximum number of mismatched entries printed for each operating point.
+	Returns:
+		 int: Total number of operating points with mismatches.
+	"""
+	try:
+		n_failed = 0
+		for result in results:
+			failed = [item for item in result['report'] if item['mismatches']]
+			n_failed = n_failed + len(failed)
+			print('{}({}):{} of {} operating points with differences in analytical and numerical Jacobian'.format(result['modelType'],result['derId'],len(failed),len(result['report'])))
+			for item in failed:
+				print('  {}:{} entries,max error:{:.3g}'.format(item['operating_point'],len(item['mismatches']),item['max_error']))
+				for row,column,Jn,Ja in item['mismatches'][:max_entries]:
+					print('    J[{}][{}]--Jn:{:.6g},Ja:{:.6g}'.format(row,column,Jn,Ja))
+
+		return n_failed
+	except:
+		LogUtil.exception_handler()
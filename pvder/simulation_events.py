@@ -2,6 +2,8 @@
 
 from __future__ import division
 import operator
+import bisect
+import csv
 import six
 
 import random
@@ -53,7 +55,6 @@ class SimulationEvents(Utilities):
 			self.grid_events_list = [] #{'T':5.0,'Vgrms':self.Vgrms_default,'fgrid':self.fgrid_default}
 		
 			self.update_event_totals()
-			self.reset_event_counters()
 		except:
 			LogUtil.exception_handler()
 
@@ -74,6 +75,59 @@ class SimulationEvents(Utilities):
 							self._events_spec[key1][key2] = events_spec[key1][key2]
 						else:
 							LogUtil.logger.debug('{}:{} does not exist in event spec dictionary!'.format(self.name,key2))
+				self._compiled_events = None #Default values may have changed
+		except:
+			LogUtil.exception_handler()
+
+
+	def compile_events(self):
+		"""Compile event lists into arrays of event times and values sorted by time (first value is the default before the first event)."""
+		try:
+			compiled_events = {}
+			compiled_events['solar'] = {'T':np.array([event['T'] for event in self.solar_events_list],dtype=float),
+										'Sinsol':np.array([self._events_spec['insolation']['default']] + [event['Sinsol'] for event in self.solar_events_list],dtype=float),
+										'Tactual':np.array([self.Tactual_default] + [event['Tactual'] for event in self.solar_events_list],dtype=float)}
+			
+			Vgrid = [self._events_spec['voltage']['default']]
+			Vgrid_angle = [self._events_spec['voltage_angle']['default']]
+			fgrid = [self._events_spec['frequency']['default']]
+			for event in self.grid_events_list: #Angle (or frequency) is calculated from previous event
+				Vgrid.append(event['Vgrid'])
+				if self.override_angle:
+					fgrid.append(event['fgrid'])
+					Vgrid_angle.append(Vgrid_angle[-1] + 2.0*math.pi*(fgrid[-1]-fgrid[-2])*self.del_t_event)
+				else:
+					Vgrid_angle.append(event['Vgrid_angle'])
+					fgrid.append(60.0 + (Vgrid_angle[-1]-Vgrid_angle[-2])/((2.0*math.pi)*self.del_t_event))
+			compiled_events['grid'] = {'T':np.array([event['T'] for event in self.grid_events_list],dtype=float),
+									   'Vgrid':np.array(Vgrid)*np.exp(1j*np.array(Vgrid_angle)),
+									   'wgrid':2.0*math.pi*np.array(fgrid)}
+			
+			compiled_events['load'] = {'T':np.array([event['T'] for event in self.load_events_list],dtype=float),
+									   'Zload1_actual':np.array([self.Zload1_actual_default] + [event['Zload1_actual'] for event in self.load_events_list],dtype=complex)}
+			
+			self._compiled_events = compiled_events
+			self._compiled_events_key = self.get_compiled_events_key()
+			LogUtil.logger.debug('{}:Compiled {} solar, {} grid, and {} load events.'.format(self.name,self.solar_events_total,self.grid_events_total,self.load_events_total))
+		except:
+			LogUtil.exception_handler()
+
+
+	def get_compiled_events_key(self):
+		"""Attributes other than event lists that are used to compile events."""
+		try:
+			return (self.del_t_event,self.override_angle,self.Tactual_default,self.Zload1_actual_default)
+		except:
+			LogUtil.exception_handler()
+
+
+	@property
+	def compiled_events(self):
+		"""Event times and values compiled from event lists (compiled again after events are added or removed, or after default values, override_angle, or del_t_event are changed)."""
+		try:
+			if self._compiled_events is None or self._compiled_events_key != self.get_compiled_events_key():
+				self.compile_events()
+			return self._compiled_events
 		except:
 			LogUtil.exception_handler()
 
@@ -84,21 +138,10 @@ class SimulationEvents(Utilities):
 		   t (float): A scalar specifying the time (s).
 		"""
 		try:
-			if self.SOLAR_EVENT_ENABLE and self.solar_events_list: #Check whether list is empty
-				if t<self.solar_events_list[0]['T']: 
-					Sinsol = self._events_spec['insolation']['default']
-					Tactual = self.Tactual_default
-				elif t<self.solar_events_list[self.solar_event_counter]['T']  and self.solar_event_counter >=1:
-					Sinsol = self.solar_events_list[self.solar_event_counter-1]['Sinsol']
-					Tactual = self.solar_events_list[self.solar_event_counter-1]['Tactual']
-				elif t>=self.solar_events_list[self.solar_event_counter]['T']:
-					Sinsol = self.solar_events_list[self.solar_event_counter]['Sinsol']
-					Tactual = self.solar_events_list[self.solar_event_counter]['Tactual']
-					self.solar_event_counter = min(self.solar_events_total-1,self.solar_event_counter+1)
-			else:
-				Sinsol = self._events_spec['insolation']['default']
-				Tactual = self.Tactual_default
-			return Sinsol,Tactual
+			events = self.compiled_events['solar']
+			i = bisect.bisect_right(events['T'],t) if self.SOLAR_EVENT_ENABLE else 0
+			
+			return events['Sinsol'][i],events['Tactual'][i]
 		except:
 			LogUtil.exception_handler()
 
@@ -109,52 +152,10 @@ class SimulationEvents(Utilities):
 		   t (float): A scalar specifying the time (s).
 		"""
 		try:
-			if self.GRID_EVENT_ENABLE and self.grid_events_list: #Check whether list is empty
+			events = self.compiled_events['grid']
+			i = bisect.bisect_right(events['T'],t) if self.GRID_EVENT_ENABLE else 0
 			
-				if t<self.grid_events_list[self.grid_event_counter]['T'] and self.grid_event_counter ==0:
-					Vgrid = self._events_spec['voltage']['default']
-					Vgrid_angle = self._events_spec['voltage_angle']['default']
-					fgrid = self._events_spec['frequency']['default']				
-				elif t<self.grid_events_list[self.grid_event_counter]['T']  and self.grid_event_counter >=1:
-					Vgrid = self.grid_events_list[self.grid_event_counter-1]['Vgrid']
-					Vgrid_angle = self.grid_events_list[self.grid_event_counter-1]['Vgrid_angle']
-					fgrid = self.grid_events_list[self.grid_event_counter-1]['fgrid']
-				elif t>=self.grid_events_list[self.grid_event_counter]['T']:
-					Vgrid = self.grid_events_list[self.grid_event_counter]['Vgrid']
-					Vgrid_angle = self.grid_events_list[self.grid_event_counter]['Vgrid_angle']
-					fgrid = self.grid_events_list[self.grid_event_counter]['fgrid']
-				
-					if self.override_angle and t < self.grid_events_list[-1]['T']+0.003: #Prevent logic going back in time due to solver
-					
-						if self.grid_event_counter == 0:
-							fgrid_old =  self._events_spec['frequency']['default']   #store previous freq
-							Vgrid_angle_old = self._events_spec['voltage_angle']['default']
-						else:
-							fgrid_old = self.grid_events_list[self.grid_event_counter-1]['fgrid']  #store previous freq
-							Vgrid_angle_old = self.grid_events_list[self.grid_event_counter-1]['Vgrid_angle']
-						
-						Vgrid_angle = Vgrid_angle_old + 2.0*math.pi*(fgrid-fgrid_old)*self.del_t_event #
-					
-						self.add_grid_event(self.grid_events_list[self.grid_event_counter]['T'],Vgrid,Vgrid_angle,fgrid)
-					elif not self.override_angle and t < self.grid_events_list[-1]['T']+0.003: #Prevent logic going back in time due to solver
-						if self.grid_event_counter == 0:
-							Vgrid_angle_old = self._events_spec['voltage_angle']['default']
-						else:
-							Vgrid_angle_old = self.grid_events_list[self.grid_event_counter-1]['Vgrid_angle']
-					
-						del_f = (Vgrid_angle-Vgrid_angle_old)/((2.0*math.pi)*self.del_t_event)
-						fgrid = 60.0 + del_f		
-						self.add_grid_event(self.grid_events_list[self.grid_event_counter]['T'],Vgrid,Vgrid_angle,fgrid)
-					
-					self.grid_event_counter = min(self.grid_events_total-1,self.grid_event_counter+1)
-				
-			else:
-				Vgrid =self._events_spec['voltage']['default']
-				Vgrid_angle =self._events_spec['voltage_angle']['default']
-				fgrid =self._events_spec['frequency']['default']					
-		
-			return cmath.rect(Vgrid,Vgrid_angle),2.0*math.pi*fgrid
-			#return Vgrid*pow(math.e,(1j*math.radians(Vgrid_angle))),2.0*math.pi*fgrid
+			return events['Vgrid'][i],events['wgrid'][i]
 		except:
 			LogUtil.exception_handler()
 
@@ -165,18 +166,65 @@ class SimulationEvents(Utilities):
 		   t (float): A scalar specifying the time (s).
 		"""
 		try:
-			if self.LOAD_EVENT_ENABLE and self.load_events_list: #Check whether list is empty
-				if t<self.load_events_list[0]['T']: 
-					Zload1_actual = self.Zload1_actual_default
-				elif t<self.load_events_list[self.load_event_counter]['T']  and self.load_event_counter >=1:
-					Zload1_actual = self.load_events_list[self.load_event_counter-1]['Zload1_actual']
-				elif t>=self.load_events_list[self.load_event_counter]['T']:
-					Zload1_actual = self.load_events_list[self.load_event_counter]['Zload1_actual']
-					self.load_event_counter = min(self.load_events_total-1,self.load_event_counter+1)
+			events = self.compiled_events['load']
+			i = bisect.bisect_right(events['T'],t) if self.LOAD_EVENT_ENABLE else 0
+			
+			return events['Zload1_actual'][i]
+		except:
+			LogUtil.exception_handler()
+
+
+	def get_event_indices(self,event_type,t,EVENT_ENABLE=True):
+		"""Index of event values at each time step.
+		Args:
+		   event_type (str): 'solar', 'grid', or 'load'.
+		   t (array): Time steps (s).
+		   EVENT_ENABLE (bool): Use default values if False.
+		"""
+		try:
+			if EVENT_ENABLE:
+				return np.searchsorted(self.compiled_events[event_type]['T'],t,side='right')
 			else:
-				Zload1_actual = self.Zload1_actual_default
+				return np.zeros(np.shape(t),dtype=int)
+		except:
+			LogUtil.exception_handler()
 
-			return Zload1_actual
+
+	def solar_events_time_series(self,t):
+		"""Solar insolation and module temperature at each time step.
+		Args:
+		   t (array): Time steps (s).
+		"""
+		try:
+			events = self.compiled_events['solar']
+			i = self.get_event_indices('solar',t,self.SOLAR_EVENT_ENABLE)
+			
+			return events['Sinsol'][i],events['Tactual'][i]
+		except:
+			LogUtil.exception_handler()
+
+
+	def grid_events_time_series(self,t):
+		"""Grid voltage phasor and angular frequency at each time step.
+		Args:
+		   t (array): Time steps (s).
+		"""
+		try:
+			events = self.compiled_events['grid']
+			i = self.get_event_indices('grid',t,self.GRID_EVENT_ENABLE)
+			
+			return events['Vgrid'][i],events['wgrid'][i]
+		except:
+			LogUtil.exception_handler()
+
+
+	def load_events_time_series(self,t):
+		"""Load impedance at PCC LV side at each time step.
+		Args:
+		   t (array): Time steps (s).
+		"""
+		try:
+			return self.compiled_events['load']['Zload1_actual'][self.get_event_indices('load',t,self.LOAD_EVENT_ENABLE)]
 		except:
 			LogUtil.exception_handler()
 
@@ -189,25 +237,7 @@ class SimulationEvents(Utilities):
 		   Tactual (float): A scalar specifying module temperature in Kelvin.
 		"""
 		try:
-			T = float(T)
-			Sinsol = float(Sinsol)
-			Tactual = float(Tactual)
-		
-			if Sinsol < self._events_spec['insolation']['min'] or Sinsol >  self._events_spec['insolation']['max']:
-				raise ValueError('{} W/m2 is not a valid value for solar insolation! - Min:{},Max:{}'.format(Sinsol,self._events_spec['insolation']['min'],self._events_spec['insolation']['max']))
-		
-			if Tactual >375.0 or Tactual < 250.0:
-				raise ValueError('{} K is not a valid value for temperature!'.format(Tactual))
-		
-			for event in self.solar_events_list:
-				if T==event['T']:
-					LogUtil.logger.debug('{}:Removing existing solar event at {:.2f}'.format(self.name,event['T']))
-					self.solar_events_list.remove(event)   # in {}Remove exi,self.events_IDsting event at same time stamp
-		
-			LogUtil.logger.debug('{}:Adding new solar event at {:.2f} s'.format(self.name,T))
-			self.solar_events_list.append({'T':T,'Sinsol':Sinsol,'Tactual':Tactual})  #Append new event to existing event list
-			self.solar_events_list.sort(key=operator.itemgetter('T'))  #Sort new events list
-			self.update_event_totals()
+			self.add_solar_events([T],[Sinsol],[Tactual])
 		except:
 			LogUtil.exception_handler()
 
@@ -221,27 +251,7 @@ class SimulationEvents(Utilities):
 		   fgrid (float): A scalar specifying grid frequency in Hz.
 		"""
 		try:
-			if Vgrid < self._events_spec['voltage']['min'] or Vgrid >  self._events_spec['voltage']['max']:
-				raise ValueError('{} V p.u. is not a valid value for grid voltage! - Min:{},Max:{}'.format(Vgrid,self._events_spec['voltage']['min'],self._events_spec['voltage']['max']))
-		
-			if fgrid < self._events_spec['frequency']['min'] or fgrid >  self._events_spec['frequency']['max']:
-				raise ValueError('{} Hz is not a valid value for grid frequency! - Min:{},Max:{}'.format(fgrid,self._events_spec['frequency']['min'],self._events_spec['frequency']['max']))
-			
-			#assert Vgrms >=0.0 and Vgrms <=1.2 and fgrid >= 0.0 and fgrid <= 100.0, 'Grid event {} is not within feasible limits'.format(Vgrms,fgrid)
-			T = float(T)
-			Vgrid = float(Vgrid)
-			Vgrid_angle = float(Vgrid_angle)
-			fgrid = float(fgrid)
-		
-			for event in self.grid_events_list:
-				if T==event['T']:
-					LogUtil.logger.debug('{}:Removing existing grid event at {:.2f}'.format(self.name,event['T']))
-					self.grid_events_list.remove(event)   #Remove existing event at same time stamp
-		
-			LogUtil.logger.debug('{}:Adding new grid event at {:.2f} s'.format(self.name,T))
-			self.grid_events_list.append({'T':T,'Vgrid':Vgrid,'Vgrid_angle':Vgrid_angle,'fgrid':fgrid})  #Append new event to existing event list
-			self.grid_events_list.sort(key=operator.itemgetter('T'))  #Sort new events list
-			self.update_event_totals()
+			self.add_grid_events([T],[Vgrid],[Vgrid_angle],[fgrid])
 		except:
 			LogUtil.exception_handler()
 
@@ -253,20 +263,145 @@ class SimulationEvents(Utilities):
 		   Zload1_actual: A complex scalar specifying load in ohm.
 		"""
 		try:
-			T = float(T)
-			if isinstance(Zload1_actual,complex):
-				Zload1_actual = complex(Zload1_actual)
-		
-			if Zload1_actual.real < 0.0:
-				raise ValueError('{} ohm is not a valid value for load resistance!'.format(Zload1_actual.real))
-		
-			for event in self.load_events_list:
-				if T==event['T']:
-					LogUtil.logger.debug('{}:Removing existing load event at {:.2f}'.format(self.name,event['T']))
-					self.load_events_list.remove(event)   #Remove existing event at same time stamp
-			LogUtil.logger.debug('{}:Adding new load event at {:.2f} s'.format(self.name,T))
-			self.load_events_list.append({'T':T,'Zload1_actual':Zload1_actual})  #Append new event to existing event list
-			self.load_events_list.sort(key=operator.itemgetter('T'))  #Sort new events list
+			self.add_load_events([T],[Zload1_actual])
+		except:
+			LogUtil.exception_handler()
+
+
+	def add_solar_events(self,T,Sinsol=100.0,Tactual=298.15):
+		"""Add several solar events at once.
+		Args:
+		   T (array): Start times of solar events in seconds.
+		   Sinsol (array): Solar insolation in percentage (or a scalar for all events).
+		   Tactual (array): Module temperature in Kelvin (or a scalar for all events).
+		"""
+		try:
+			T,Sinsol,Tactual = np.broadcast_arrays(*[np.atleast_1d(np.asarray(values,dtype=float)) for values in [T,Sinsol,Tactual]])
+			if len(T) == 0:
+				LogUtil.logger.debug('{}:No solar events to add!'.format(self.name))
+				return
+			self.check_event_times(T)
+			self.check_event_values(Sinsol,'{} W/m2 is not a valid value for solar insolation!',self._events_spec['insolation']['min'],self._events_spec['insolation']['max'])
+			self.check_event_values(Tactual,'{} K is not a valid value for temperature!',250.0,375.0)
+			
+			self.merge_events(self.solar_events_list,[{'T':T_event,'Sinsol':Sinsol_event,'Tactual':Tactual_event} for T_event,Sinsol_event,Tactual_event in zip(T.tolist(),Sinsol.tolist(),Tactual.tolist())])
+			LogUtil.logger.debug('{}:Added {} solar events between {:.2f} s and {:.2f} s'.format(self.name,len(T),T.min(),T.max()))
+		except:
+			LogUtil.exception_handler()
+
+
+	def add_grid_events(self,T,Vgrid=1.0,Vgrid_angle=0.0,fgrid=60.0):
+		"""Add several grid events at once.
+		Args:
+		   T (array): Start times of grid events in seconds.
+		   Vgrid (array): Grid voltage magnitude in fraction (or a scalar for all events).
+		   Vgrid_angle (array): Grid voltage angle in radians (or a scalar for all events).
+		   fgrid (array): Grid frequency in Hz (or a scalar for all events).
+		"""
+		try:
+			T,Vgrid,Vgrid_angle,fgrid = np.broadcast_arrays(*[np.atleast_1d(np.asarray(values,dtype=float)) for values in [T,Vgrid,Vgrid_angle,fgrid]])
+			if len(T) == 0:
+				LogUtil.logger.debug('{}:No grid events to add!'.format(self.name))
+				return
+			self.check_event_times(T)
+			self.check_event_values(Vgrid,'{} V p.u. is not a valid value for grid voltage!',self._events_spec['voltage']['min'],self._events_spec['voltage']['max'])
+			self.check_event_values(fgrid,'{} Hz is not a valid value for grid frequency!',self._events_spec['frequency']['min'],self._events_spec['frequency']['max'])
+			
+			self.merge_events(self.grid_events_list,[{'T':T_event,'Vgrid':Vgrid_event,'Vgrid_angle':Vgrid_angle_event,'fgrid':fgrid_event} for T_event,Vgrid_event,Vgrid_angle_event,fgrid_event in zip(T.tolist(),Vgrid.tolist(),Vgrid_angle.tolist(),fgrid.tolist())])
+			LogUtil.logger.debug('{}:Added {} grid events between {:.2f} s and {:.2f} s'.format(self.name,len(T),T.min(),T.max()))
+		except:
+			LogUtil.exception_handler()
+
+
+	def add_load_events(self,T,Zload1_actual=10e6+0j):
+		"""Add several load events at once.
+		Args:
+		   T (array): Start times of load events in seconds.
+		   Zload1_actual (array): Load in ohm (or a scalar for all events).
+		"""
+		try:
+			T = np.atleast_1d(np.asarray(T,dtype=float))
+			T,Zload1_actual = np.broadcast_arrays(T,np.atleast_1d(np.asarray(Zload1_actual,dtype=complex)))
+			if len(T) == 0:
+				LogUtil.logger.debug('{}:No load events to add!'.format(self.name))
+				return
+			self.check_event_times(T)
+			self.check_event_values(Zload1_actual.real,'{} ohm is not a valid value for load resistance!',0.0,np.inf)
+			
+			self.merge_events(self.load_events_list,[{'T':T_event,'Zload1_actual':Zload1_actual_event} for T_event,Zload1_actual_event in zip(T.tolist(),Zload1_actual.tolist())])
+			LogUtil.logger.debug('{}:Added {} load events between {:.2f} s and {:.2f} s'.format(self.name,len(T),T.min(),T.max()))
+		except:
+			LogUtil.exception_handler()
+
+
+	def add_events_from_csv(self,file_name,event_type,columns=None,scale=None,tstart=0.0,tstep=None):
+		"""Add events from a CSV file with one event in each row.
+		Args:
+		   file_name (str): CSV file with column names in the first row.
+		   event_type (str): 'solar', 'grid', or 'load'.
+		   columns (dict): CSV column for each event parameter (e.g. {'Vgrid':'VA'}). Columns with the same name as a parameter ('T', 'Sinsol', 'Tactual', 'Vgrid', 'Vgrid_angle', 'fgrid', 'Zload1_actual') are used by default.
+		   scale (dict): Factor by which each parameter is multiplied (e.g. to convert volts to fraction or degrees to radians).
+		   tstart (float): Time of first event if the CSV file does not have a time column.
+		   tstep (float): Time between events if the CSV file does not have a time column.
+		"""
+		try:
+			event_parameters = {'solar':['Sinsol','Tactual'],'grid':['Vgrid','Vgrid_angle','fgrid'],'load':['Zload1_actual']}
+			if event_type not in event_parameters:
+				raise ValueError('{} is not a valid event type - available types:{}'.format(event_type,list(event_parameters.keys())))
+			
+			with open(file_name,'r') as csv_file:
+				rows = list(csv.reader(csv_file))
+			header = [name.strip() for name in rows[0]]
+			data = np.array([row for row in rows[1:] if row])
+			
+			columns = dict({parameter:parameter for parameter in ['T'] + event_parameters[event_type] if parameter in header},**(columns or {}))
+			for parameter,column in columns.items():
+				if column not in header:
+					raise ValueError('{} is not a column in {} - available columns:{}'.format(column,file_name,header))
+			if len(data) == 0:
+				LogUtil.logger.debug('{}:No {} events in {}!'.format(self.name,event_type,file_name))
+				return
+			
+			values = {}
+			for parameter,column in columns.items():
+				values[parameter] = np.asarray(data[:,header.index(column)],dtype=complex if parameter == 'Zload1_actual' else float)*(scale or {}).get(parameter,1.0)
+			
+			if 'T' not in values:
+				if tstep is None:
+					raise ValueError('Time step between events should be specified if {} does not have a time column!'.format(file_name))
+				values['T'] = tstart + np.arange(len(data))*tstep
+			
+			LogUtil.logger.debug('{}:Read {} {} events from {}'.format(self.name,len(data),event_type,file_name))
+			getattr(self,'add_{}_events'.format(event_type))(**values)
+		except:
+			LogUtil.exception_handler()
+
+
+	def check_event_times(self,T):
+		"""Check that event times are finite."""
+		try:
+			if not np.all(np.isfinite(T)):
+				raise ValueError('{} s is not a valid event time!'.format(T[np.argmin(np.isfinite(T))]))
+		except:
+			LogUtil.exception_handler()
+
+
+	def check_event_values(self,values,message,min_value,max_value):
+		"""Check that all event values are within limits."""
+		try:
+			invalid = ~((values >= min_value) & (values <= max_value)) #NaN values are also invalid
+			if np.any(invalid):
+				raise ValueError((message + ' - Min:{},Max:{}').format(values[np.argmax(invalid)],min_value,max_value))
+		except:
+			LogUtil.exception_handler()
+
+
+	def merge_events(self,events_list,new_events):
+		"""Merge new events into events list and sort by time (new events replace existing events at the same time)."""
+		try:
+			new_events = {event['T']:event for event in new_events} #Last event is used if times are repeated
+			events_list[:] = [event for event in events_list if event['T'] not in new_events] + list(new_events.values())
+			events_list.sort(key=operator.itemgetter('T'))  #Sort new events list
 			self.update_event_totals()
 		except:
 			LogUtil.exception_handler()
@@ -342,11 +477,9 @@ class SimulationEvents(Utilities):
 		   tstep: A scalar specifying time step size.
 		"""
 		try:
-			Sinsol,_ = self.solar_events(t=tstart)
+			Sinsol,Tactual = self.solar_events(t=tstart)
 			trange = np.arange(tstart,tstop,tstep)
-			Sinsol_range = np.linspace(Sinsol,Sinsol_target,len(trange))
-			for i,Sinsol in enumerate(Sinsol_range):
-				self.add_solar_event(T=trange[i],Sinsol=Sinsol)
+			self.add_solar_events(trange,np.linspace(Sinsol,Sinsol_target,len(trange)),Tactual)
 		except:
 			LogUtil.exception_handler()
 
@@ -360,11 +493,9 @@ class SimulationEvents(Utilities):
 		   tstep: A scalar specifying time step size (optional).
 		"""
 		try:
-			vg,_ = self.grid_events(t=tstart)
+			vg,wgrid = self.grid_events(t=tstart) #Voltage phasor and angular frequency
 			trange = np.arange(tstart,tstop,tstep)
-			vg_range = np.linspace(vg,vg_target,len(trange))
-			for i,vg in enumerate(vg_range):
-				self.add_grid_event(T=trange[i],Vgrms=vg) 
+			self.add_grid_events(trange,np.linspace(abs(vg),vg_target,len(trange)),cmath.phase(vg),wgrid/(2.0*math.pi))
 		except:
 			LogUtil.exception_handler()
 
@@ -389,8 +520,9 @@ class SimulationEvents(Utilities):
 
 
 	def update_event_totals(self):
-		"""Update event counts. """
+		"""Update event counts and discard compiled events. """
 		try:
+			self._compiled_events = None
 			self.solar_events_total = len(self.solar_events_list)
 			self.grid_events_total = len(self.grid_events_list)
 			self.load_events_total = len(self.load_events_list)
@@ -400,12 +532,9 @@ class SimulationEvents(Utilities):
 
 
 	def reset_event_counters(self):
-		"""Reset event counts. """
+		"""Deprecated - events are looked up from event times and there are no event counters to reset."""
 		try:
-			self.solar_event_counter = 0
-			self.grid_event_counter = 0
-			self.load_event_counter = 0
-			LogUtil.logger.debug('{}:Simulation event counters reset!'.format(self.name))
+			LogUtil.logger.debug('{}:reset_event_counters() is deprecated and does nothing!'.format(self.name))
 		except:
 			LogUtil.exception_handler()
 
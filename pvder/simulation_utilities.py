@@ -8,7 +8,8 @@ import time
 import numpy as np
 import math
 import cmath
-from scipy.integrate import odeint,ode
+from scipy.integrate import odeint,ode,solve_ivp
+from scipy.linalg import expm
 
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
@@ -364,16 +365,33 @@ class SimulationUtilities():
 	""" Utility class for dynamic simulations."""
 
 	max_steps = defaults.max_steps #Max steps to be used by solver before producing error
-	solver_list = ['odeint','ode-vode-bdf']
+	rtol = defaults.rtol #Relative tolerance
+	atol = defaults.atol #Absolute tolerance
+	hmax = defaults.hmax #Max time step
+	RT_event_tolerance = defaults.RT_event_tolerance #Time step past located ride through events
+	fixed_step_RK4 = defaults.fixed_step_RK4 #Max step for fixed step RK4 solver
+	fixed_step_trapezoidal = defaults.fixed_step_trapezoidal #Max step for fixed step trapezoidal solver (None - one step for each time step)
+	fixed_step_exponential = defaults.fixed_step_exponential #Max step for fixed step exponential integrator
+	max_newton_iterations = 10 #Max Newton iterations in each step of implicit fixed step solver
+	solver_list = ['odeint','ode-vode-bdf','solve_ivp-LSODA','solve_ivp-Radau','solve_ivp-BDF','solve_ivp-RK45','fixed-RK4','fixed-trapezoidal','fixed-exponential']
+	solve_ivp_implicit_methods = ['LSODA','Radau','BDF'] #Methods that can use Jacobian
 
-	def call_ODE_solver(self,derivatives,jacobian,y,t):
+	def call_ODE_solver(self,derivatives,jacobian,y,t,hmax=None):
 		"""Call the SciPy ODE solver."""
 		try:
+			if hmax is None:
+				hmax = self.hmax
+			
 			if self.solver_type == 'odeint':
-				solution,infodict = self.call_odeint_solver(derivatives,jacobian,y,t)
+				solution,infodict = self.call_odeint_solver(derivatives,jacobian,y,t,hmax)
 				self.check_simulation(infodict,t) #Check whether solver successful for all time intervals
 			elif self.solver_type == 'ode-vode-bdf':
-				solution,infodict = self.call_ode_solver()			
+				solution,infodict = self.call_ode_solver()
+			elif 'solve_ivp' in self.solver_type:
+				solution,infodict = self.call_solve_ivp_solver(y,t,hmax)
+				self.check_solve_ivp_simulation(infodict,t) #Check whether solver reached the end of the time interval
+			elif 'fixed' in self.solver_type:
+				solution,infodict = self.call_fixed_step_solver(derivatives,jacobian,y,t)
 			else:
 				LogUtil.logger.debug('Solver not found!')			
 			return solution,infodict,self.SOLVER_CONVERGENCE
@@ -381,38 +399,607 @@ class SimulationUtilities():
 			LogUtil.exception_handler()
 
 
-	def call_odeint_solver(self,derivatives,jacobian,y,t):
+	def call_ODE_solver_segmented(self,derivatives,jacobian,y,t,t_events):
+		"""Call the SciPy ODE solver separately for each interval between events and combine the solutions."""
+		try:
+			t = np.asarray(t)
+			t_boundaries = [t[0]] + [t_event for t_event in sorted(set(t_events)) if t[0] < t_event < t[-1]] + [t[-1]]
+			solution = np.empty((len(t),len(y)))
+			
+			for i,(t_segment_start,t_segment_end) in enumerate(zip(t_boundaries[:-1],t_boundaries[1:])):
+				if i == len(t_boundaries) - 2: #Time steps falling inside the segment (last segment includes end point)
+					segment_indices = np.where((t >= t_segment_start) & (t <= t_segment_end))[0]
+				else:
+					segment_indices = np.where((t >= t_segment_start) & (t < t_segment_end))[0]
+				
+				t_segment = np.unique(np.concatenate(([t_segment_start],t[segment_indices],[t_segment_end])))
+				LogUtil.logger.debug('{}:Solving segment {} from {:.4f} s to {:.4f} s.'.format(self.name,i+1,t_segment_start,t_segment_end))
+				solution_segment,_,_ = self.call_ODE_solver(derivatives,jacobian,y,t_segment,hmax=np.inf) #Step size is not limited inside segment
+				
+				solution[segment_indices] = solution_segment[np.searchsorted(t_segment,t[segment_indices])]
+				y = solution_segment[-1] #States at end of segment are initial states for next segment
+			
+			return solution
+		except:
+			LogUtil.exception_handler()
+
+
+	def call_ODE_solver_hybrid(self,y,t):
+		"""Integrate between time steps and evaluate ride through and connection logic only at accepted time steps."""
+		try:
+			t = np.asarray(t)
+			solution = np.empty((len(t),len(y)))
+			solution[0] = y
+			if self.solver_type not in ['odeint','solve_ivp-LSODA']: #odeint also uses LSODA
+				LogUtil.logger.warning('{}:{} solver is not used in hybrid mode - LSODA will be used since solver must be stepped between time steps.'.format(self.name,self.solver_type))
+			hybrid_solver = self.create_lsoda_solver()
+			
+			self.PV_model.HOLD_DISCRETE_STATES = True #Flags are held constant inside ODE model
+			self.check_discrete_states(t[0],solution[0])
+			hybrid_solver.set_initial_value(solution[0],t[0])
+			
+			for i in range(1,len(t)):
+				solution[i] = hybrid_solver.integrate(t[i])
+				if not hybrid_solver.successful():
+					self.SOLVER_CONVERGENCE = False
+					self.convergence_failure_list.append({'Model':self.PV_model.name,
+														  'Simulation':self.name,
+														  'failure_time_point':t[i],
+														  'failure_code':hybrid_solver.get_return_code(),
+														  'S':self.PV_model.S*self.PV_model.Sbase})
+					raise ValueError('{}:ODE solver failed at {:.6f} s for {} with failure code:{}!'.format(self.name,t[i],self.PV_model.name,hybrid_solver.get_return_code()))
+				
+				if self.check_discrete_states(t[i],solution[i]): #Restart solver since derivatives are discontinuous
+					LogUtil.logger.debug('{}:Restarting solver at {:.4f} s after change in DER connection status.'.format(self.name,t[i]))
+					hybrid_solver.set_initial_value(solution[i],t[i])
+			
+			self.SOLVER_CONVERGENCE = True
+			
+			return solution
+		except:
+			LogUtil.exception_handler()
+		finally:
+			self.PV_model.HOLD_DISCRETE_STATES = False #Logic is evaluated inside ODE model in later simulations even if solver failed
+
+
+	def create_lsoda_solver(self):
+		"""Create an ode instance with the LSODA integrator which can be stepped between time steps."""
+		try:
+			if self.jacFlag:
+				lsoda_solver = ode(self.ODE_model_ode,self.jac_ODE_model_ode)
+			else:
+				lsoda_solver = ode(self.ODE_model_ode)
+			lsoda_solver.set_integrator('lsoda',rtol=self.rtol,atol=self.atol,max_step=self.hmax,nsteps=self.max_steps)
+			
+			return lsoda_solver
+		except:
+			LogUtil.exception_handler()
+
+
+	def call_ODE_solver_persistent(self,y,t):
+		"""Integrate using an LSODA integrator which keeps its step size and order history between calls in loop mode.
+		The integrator is restarted if the initial time or states do not match its current time and states, or if the DER connection status changed.
+		"""
+		try:
+			t = np.asarray(t,dtype=float)
+			y = np.asarray(y,dtype=float)
+			solution = np.empty((len(t),len(y)))
+			solution[0] = y
+			
+			if self.persistent_solver is None or self.persistent_solver.t != t[0] or not np.array_equal(self.persistent_solver.y,y) \
+			   or self.persistent_solver_DER_CONNECTED != self.PV_model.DER_CONNECTED:
+				if self.persistent_solver is None:
+					self.persistent_solver = self.create_lsoda_solver()
+				self.persistent_solver.set_initial_value(y,t[0]) #Step size and order history is discarded
+				LogUtil.logger.debug('{}:Persistent solver restarted at {:.4f} s.'.format(self.name,t[0]))
+			
+			self.set_lsoda_critical_time(self.persistent_solver,t[-1]) #Inputs may change after this call so LSODA should not step past end time
+			
+			for i in range(1,len(t)):
+				solution[i] = self.persistent_solver.integrate(t[i])
+				if not self.persistent_solver.successful():
+					failure_code = self.persistent_solver.get_return_code()
+					self.SOLVER_CONVERGENCE = False
+					self.convergence_failure_list.append({'Model':self.PV_model.name,
+														  'Simulation':self.name,
+														  'failure_time_point':t[i],
+														  'failure_code':failure_code,
+														  'S':self.PV_model.S*self.PV_model.Sbase})
+					self.reset_persistent_solver()
+					raise ValueError('{}:ODE solver failed at {:.6f} s for {} with failure code:{}!'.format(self.name,t[i],self.PV_model.name,failure_code))
+			
+			self.persistent_solver_DER_CONNECTED = self.PV_model.DER_CONNECTED
+			self.SOLVER_CONVERGENCE = True
+			
+			return solution
+		except:
+			LogUtil.exception_handler()
+
+
+	def call_ODE_solver_persistent_events(self,y,t,t_events):
+		"""Integrate using an LSODA integrator which keeps its step size and order history between calls (e.g. between chunks of a streaming simulation).
+		The integrator is only restarted at events and after the DER connection status changed, since the derivatives are discontinuous.
+		"""
+		try:
+			t = np.asarray(t,dtype=float)
+			t_restarts = [t_event for t_event in sorted(set(t_events)) if t[0] <= t_event < t[-1]]
+			t_steps = np.unique(np.concatenate((t,t_restarts))) #Integrator should also stop at events between time steps
+			solution = np.empty((len(t_steps),len(y)))
+			solution[0] = y
+			
+			if self.persistent_solver is None or self.persistent_solver.t != t[0] or not np.array_equal(self.persistent_solver.y,y) or t[0] in t_restarts:
+				if self.persistent_solver is None:
+					self.persistent_solver = self.create_lsoda_solver()
+				self.persistent_solver.set_initial_value(y,t[0])
+				LogUtil.logger.debug('{}:Persistent solver restarted at {:.4f} s.'.format(self.name,t[0]))
+			
+			for i in range(1,len(t_steps)):
+				DER_CONNECTED = self.PV_model.DER_CONNECTED
+				self.set_lsoda_critical_time(self.persistent_solver,min([t_restart for t_restart in t_restarts if t_restart >= t_steps[i]] + [t[-1]])) #Integrator should not step past next event
+				solution[i] = self.persistent_solver.integrate(t_steps[i])
+				if not self.persistent_solver.successful():
+					failure_code = self.persistent_solver.get_return_code()
+					self.SOLVER_CONVERGENCE = False
+					self.convergence_failure_list.append({'Model':self.PV_model.name,
+														  'Simulation':self.name,
+														  'failure_time_point':t_steps[i],
+														  'failure_code':failure_code,
+														  'S':self.PV_model.S*self.PV_model.Sbase})
+					self.reset_persistent_solver()
+					raise ValueError('{}:ODE solver failed at {:.6f} s for {} with failure code:{}!'.format(self.name,t_steps[i],self.PV_model.name,failure_code))
+				
+				if t_steps[i] in t_restarts or self.PV_model.DER_CONNECTED != DER_CONNECTED:
+					self.persistent_solver.set_initial_value(solution[i],t_steps[i])
+					LogUtil.logger.debug('{}:Persistent solver restarted at {:.4f} s.'.format(self.name,t_steps[i]))
+			
+			self.SOLVER_CONVERGENCE = True
+			
+			return solution[np.searchsorted(t_steps,t)]
+		except:
+			LogUtil.exception_handler()
+
+
+	def set_lsoda_critical_time(self,lsoda_solver,t_critical):
+		"""Make LSODA stop at a critical time instead of stepping past it (ITASK=4 and TCRIT).
+		scipy.integrate.ode does not expose these options, so the internal arguments of the LSODA integrator are changed (layout checked against SciPy 1.17).
+		Normal stepping is used if the internal arguments do not have the expected layout.
+		Returns:
+			 bool: True if critical time was set.
+		"""
+		try:
+			lsoda_integrator = getattr(lsoda_solver,'_integrator',None)
+			call_args = getattr(lsoda_integrator,'call_args',None)
+			rwork = getattr(lsoda_integrator,'rwork',None)
+			
+			#call_args should be [rtol,atol,itask,istate,rwork,iwork,jt]
+			if type(lsoda_integrator).__name__ == 'lsoda' and isinstance(call_args,list) and len(call_args) == 7 \
+			   and call_args[2] in [1,4] and isinstance(rwork,np.ndarray) and call_args[4] is rwork:
+				call_args[2] = 4 #ITASK=4 stops at the critical time TCRIT
+				rwork[0] = t_critical #TCRIT
+				return True
+			else:
+				LogUtil.logger.debug('{}:Critical time could not be set for integrator - solver may step past {:.4f} s.'.format(self.name,t_critical))
+				return False
+		except:
+			LogUtil.exception_handler()
+
+
+	def reset_persistent_solver(self):
+		"""Discard step size and order history of persistent solver (e.g. after a jump in grid voltage)."""
+		try:
+			self.persistent_solver = None
+			self.persistent_solver_DER_CONNECTED = None
+		except:
+			LogUtil.exception_handler()
+
+
+	def check_discrete_states(self,t,y):
+		"""Evaluate ride through and connection logic for states at an accepted time step.
+		Returns:
+			 bool: True if DER connection status changed.
+		"""
+		try:
+			DER_CONNECTED = self.PV_model.DER_CONNECTED
+			self.ODE_model_ode(t,y) #Update model variables using states at time step
+			self.PV_model.update_discrete_states(t)
+			
+			return self.PV_model.DER_CONNECTED != DER_CONNECTED
+		except:
+			LogUtil.exception_handler()
+
+
+	def call_ODE_solver_RT_events(self,y,t,t_events):
+		"""Integrate with solve_ivp and locate ride through threshold crossings and timer expiries by root finding (LSODA is used if solver type is not solve_ivp).
+		Ride through and connection logic is evaluated only at located events and simulation events.
+		"""
+		try:
+			t = np.asarray(t)
+			t_boundaries = [t_event for t_event in sorted(set(t_events)) if t[0] < t_event < t[-1]] + [t[-1]]
+			solution = np.empty((len(t),len(y)))
+			solution[0] = y
+			self.RT_events_list = []
+			if 'solve_ivp' not in self.solver_type:
+				LogUtil.logger.warning('{}:{} solver cannot locate events - solve_ivp with LSODA will be used.'.format(self.name,self.solver_type))
+			
+			self.PV_model.HOLD_DISCRETE_STATES = True #Flags are held constant inside ODE model
+			self.check_discrete_states(t[0],y)
+			t_start = t[0]
+			
+			while t_start < t[-1]:
+				t_end = [t_boundary for t_boundary in t_boundaries if t_boundary > t_start][0]
+				self._RT_parameters = self.PV_model.get_rhs_parameters() #Inputs are constant until next simulation event
+				self._RT_measurements = None
+				event_names,event_functions = self.get_RT_event_functions(t_start)
+				t_stop,y,event_index = self.integrate_RT_interval(y,t,solution,t_start,t_end,event_functions)
+				
+				if event_index is not None:
+					self.RT_events_list.append({'T':float(t_stop),'event':event_names[event_index]})
+					LogUtil.logger.debug('{}:{} event located at {:.6f} s.'.format(self.name,event_names[event_index],t_stop))
+				if t_stop < t[-1]: #Step past event so that logic sees the new side of the threshold
+					t_next = min(t_stop + self.RT_event_tolerance,[t_boundary for t_boundary in t_boundaries if t_boundary > t_stop][0])
+					t_stop,y,_ = self.integrate_RT_interval(y,t,solution,t_stop,t_next)
+				
+				if self.check_discrete_states(t_stop,y):
+					LogUtil.logger.debug('{}:DER connection status changed at {:.6f} s.'.format(self.name,t_stop))
+				t_start = t_stop
+			
+			return solution
+		except:
+			LogUtil.exception_handler()
+		finally:
+			self.PV_model.HOLD_DISCRETE_STATES = False #Logic is evaluated inside ODE model in later simulations even if solver failed
+
+
+	def integrate_RT_interval(self,y,t,solution,t_start,t_end,event_functions=None):
+		"""Integrate from t_start until t_end or the first located event and store states at time steps in solution.
+		Returns:
+			 tuple: Time and states at which integration stopped and index of located event (None if no event).
+		"""
+		try:
+			t_interval = np.unique(np.concatenate(([t_start],t[(t > t_start) & (t < t_end)],[t_end])))
+			solution_interval,infodict = self.call_solve_ivp_solver(y,t_interval,self.hmax,events=event_functions)
+			self.check_solve_ivp_simulation(infodict,t_interval)
+			
+			t_indices = np.searchsorted(t,infodict['t'])
+			in_t = (t_indices < len(t)) & (t[np.minimum(t_indices,len(t)-1)] == infodict['t']) #Interval end points may not be time steps
+			solution[t_indices[in_t]] = solution_interval[in_t]
+			
+			if infodict['status'] == 1: #Integration terminated at earliest located event
+				t_located = [t_event[0] if len(t_event) > 0 else np.inf for t_event in infodict['t_events']]
+				event_index = int(np.argmin(t_located))
+				
+				return t_located[event_index],infodict['y_events'][event_index][0],event_index
+			else:
+				return t_interval[-1],solution_interval[-1],None
+		except:
+			LogUtil.exception_handler()
+
+
+	def get_RT_event_functions(self,t):
+		"""Event functions for ride through threshold crossings and for ride through timers expiring after time t.
+		Returns:
+			 tuple: List of event names and list of event functions of time and states.
+		"""
+		try:
+			PV_model = self.PV_model
+			event_dict = {}
+			
+			if PV_model.LVRT_ENABLE:
+				for LVRT_key,LVRT_values in PV_model.LVRT_dict.items():
+					event_dict['LV'+str(LVRT_key)] = self.threshold_event_function(0,LVRT_values['V_threshold']*PV_model.Vrms_ref)
+			if PV_model.HVRT_ENABLE:
+				for HVRT_key,HVRT_values in PV_model.HVRT_dict.items():
+					event_dict['HV'+str(HVRT_key)] = self.threshold_event_function(0,HVRT_values['V_threshold']*PV_model.Vrms_ref)
+			if PV_model.LFRT_ENABLE:
+				for LFRT_key,LFRT_values in PV_model.LFRT_dict.items():
+					event_dict['LF'+str(LFRT_key)] = self.threshold_event_function(1,LFRT_values['F_LF'])
+					event_dict['LF'+str(LFRT_key)+'_reset'] = self.threshold_event_function(1,LFRT_values['F_LF'] + PV_model.del_f)
+			
+			t_expiry = {'t_stable':PV_model.t_stable}
+			for RT_type,RT_dict in [('LV',PV_model.LVRT_dict),('HV',PV_model.HVRT_dict)]:
+				for RT_key,RT_values in RT_dict.items():
+					if RT_values['t_start'] > 0.0:
+						t_expiry[RT_type+str(RT_key)+'_timer'] = RT_values['t_start'] + RT_values['t_threshold']
+			for LFRT_key,LFRT_values in PV_model.LFRT_dict.items():
+				if LFRT_values['t_LFstart'] > 0.0:
+					t_expiry['LF'+str(LFRT_key)+'_timer'] = LFRT_values['t_LFstart'] + LFRT_values['t_LF_limit']
+			if PV_model.t_disconnect_start > 0.0:
+				t_expiry['disconnect_timer'] = PV_model.t_disconnect_start + PV_model.t_disconnect_delay
+			if PV_model.t_reconnect_start > 0.0:
+				t_expiry['reconnect_timer'] = PV_model.t_reconnect_start + PV_model.t_reconnect_delay
+			
+			for timer,t_timer in t_expiry.items():
+				if t_timer > t:
+					event_dict[timer] = self.timer_event_function(t_timer)
+			
+			return list(event_dict.keys()),list(event_dict.values())
+		except:
+			LogUtil.exception_handler()
+
+
+	def threshold_event_function(self,measurement_index,threshold):
+		"""Event function which is zero when RMS voltage (index 0) or frequency (index 1) crosses threshold."""
+		try:
+			def event_function(t,y):
+				return self.get_RT_measurements(t,y)[measurement_index] - threshold
+			event_function.terminal = True
+			
+			return event_function
+		except:
+			LogUtil.exception_handler()
+
+
+	def timer_event_function(self,t_timer):
+		"""Event function which is zero when a ride through timer expires."""
+		try:
+			def event_function(t,y):
+				return t - t_timer
+			event_function.terminal = True
+			event_function.direction = 1
+			
+			return event_function
+		except:
+			LogUtil.exception_handler()
+
+
+	def get_RT_measurements(self,t,y):
+		"""Voltage and frequency used by ride through logic for time and states (reused between event functions)."""
+		try:
+			if self._RT_measurements is None or self._RT_measurements[0] != t or not np.array_equal(self._RT_measurements[1],y):
+				self._RT_measurements = (t,np.array(y),self.PV_model.get_RT_measurements(t,y,self._RT_parameters))
+			
+			return self._RT_measurements[2]
+		except:
+			LogUtil.exception_handler()
+
+
+	def call_odeint_solver(self,derivatives,jacobian,y,t,hmax):
 		"""Use the SciPy odeint solver."""
 		try:
+			if hmax == np.inf:
+				hmax = 0.0 #odeint uses 0.0 for no limit on step size
+				tcrit = [t[-1]] #Avoid stepping past the end of the interval
+			else:
+				tcrit = None
+			
 			if self.jacFlag:
 				solution,infodict = odeint(derivatives,y,t,Dfun=jacobian,full_output=1,printmessg=True,\
-										 hmax = 1/120.,mxstep=self.max_steps,atol=1e-4,rtol=1e-4)
+										 hmax = hmax,mxstep=self.max_steps,atol=self.atol,rtol=self.rtol,tcrit=tcrit)
 			else:
 				solution,infodict =odeint(derivatives,y,t,full_output=1,printmessg=True,\
-										 hmax = 1/120.,mxstep=self.max_steps,atol=1e-4,rtol=1e-4)
+										 hmax = hmax,mxstep=self.max_steps,atol=self.atol,rtol=self.rtol,tcrit=tcrit)
 			return solution,infodict
 		except:
 			LogUtil.exception_handler()
 
 
-	def call_ode_solver(self):
-		"""Use the SciPy ode solver."""
+	def call_ode_solver(self,t_end=None,n_buffer=None):
+		"""Use the SciPy ode solver.
+		Args:
+			 t_end (float): Time until which solution is integrated (default: tStop).
+			 n_buffer (int): Number of time steps for which solution buffer is allocated before it is grown (default: expected number of time steps).
+		"""
 		try:
-			solution = self.ode_solver.y
-			self.t =np.array([self.ode_solver.t]) #np.array([0.0])
+			if t_end is None:
+				t_end = self.tStop
+			if n_buffer is None:
+				n_buffer = int(round((t_end - self.ode_solver.t)/self.tInc)) + 1 #Expected number of time steps
+			solution = np.empty((max(n_buffer,1),len(self.ode_solver.y))) #Preallocate buffer for solution
+			t = np.empty(max(n_buffer,1))
+			solution[0] = self.ode_solver.y
+			t[0] = self.ode_solver.t
+			n = 1
 			info = []
-			#print('t:',self.ode_solver.t,'y1:',solution[0])
-			#while self.ode_solver.successful() and self.ode_solver.t < self.tStop:
-			while self.ode_solver.successful() and(self.tStop + 1e-6 - self.ode_solver.t) >= self.tInc:		
+			
+			while self.ode_solver.successful() and(t_end + 1e-6 - self.ode_solver.t) >= self.tInc:		
 				y = self.ode_solver.integrate(self.ode_solver.t+self.tInc)
 				return_code = self.ode_solver.get_return_code()
 				info.append(return_code)
-				#print('t:',self.ode_solver.t,'y1:',y[0])
-				solution = np.vstack((solution, y))
-				self.t = np.hstack((self.t, np.array([self.ode_solver.t])))
-			#print('Solution shape:',solution.shape)
-			#print('Time steps shape:',self.t.shape)
-			return solution,info
+				if n == len(t): #Grow buffer in chunks if more time steps are required
+					n_chunk = max(len(t)//2,1)
+					solution = np.concatenate((solution,np.empty((n_chunk,solution.shape[1]))))
+					t = np.concatenate((t,np.empty(n_chunk)))
+				solution[n] = y
+				t[n] = self.ode_solver.t
+				n = n + 1
+			
+			if not self.ode_solver.successful():
+				failure_code = self.ode_solver.get_return_code()
+				self.SOLVER_CONVERGENCE = False
+				self.convergence_failure_list.append({'Model':self.PV_model.name,
+													'Simulation':self.name,
+													'failure_time_point':self.ode_solver.t,
+													'failure_code':failure_code,
+													'S':self.PV_model.S*self.PV_model.Sbase})
+				raise ValueError('{}:ODE solver failed at {:.6f} s for {} with failure code:{}!'.format(self.name,self.ode_solver.t,self.PV_model.name,failure_code))
+			self.SOLVER_CONVERGENCE = True
+			
+			self.t = t[:n]
+			return solution[:n],info
+		except:
+			LogUtil.exception_handler()
+
+
+	def call_solve_ivp_solver(self,y,t,hmax,events=None):
+		"""Use the SciPy solve_ivp solver (LSODA is used if solver type is not solve_ivp)."""
+		try:
+			method = self.solver_type.split('-')[-1] if 'solve_ivp' in self.solver_type else 'LSODA'
+			solver_options = {'method':method,'t_eval':t,'max_step':hmax,'atol':self.atol,'rtol':self.rtol,'events':events}
+			
+			if method in self.solve_ivp_implicit_methods:
+				if self.jacFlag:
+					solver_options.update({'jac':self.jac_ODE_model_ivp})
+				elif method != 'LSODA': #LSODA does not support a sparsity pattern
+					solver_options.update({'jac_sparsity':self.jac_sparsity})
+			
+			ivp_solution = solve_ivp(self.ODE_model_ode,(t[0],t[-1]),y,**solver_options)
+			infodict = {'status':ivp_solution.status,'message':ivp_solution.message,
+						'nfev':ivp_solution.nfev,'njev':ivp_solution.njev,'nlu':ivp_solution.nlu,
+						't':ivp_solution.t,'t_events':ivp_solution.t_events,'y_events':ivp_solution.y_events}
+			
+			return ivp_solution.y.T,infodict
+		except:
+			LogUtil.exception_handler()
+
+
+	def call_fixed_step_solver(self,derivatives,jacobian,y,t):
+		"""Integrate with fixed step RK4, trapezoidal rule, or exponential integrator and store states at time steps."""
+		try:
+			method = self.solver_type.split('-')[-1]
+			if method == 'RK4':
+				fixed_step = self.fixed_step_RK4
+			elif method == 'exponential':
+				fixed_step = self.fixed_step_exponential
+			else:
+				fixed_step = self.fixed_step_trapezoidal
+			
+			y = np.array(y,dtype=float)
+			solution = np.empty((len(t),len(y)))
+			solution[0] = y
+			infodict = {'n_steps':0,'nfe':0,'nje':0}
+			
+			for i in range(1,len(t)):
+				n_steps = 1 if fixed_step is None else max(1,int(math.ceil((t[i] - t[i-1])/fixed_step - 1e-9))) #Time step is split into equal steps
+				h = (t[i] - t[i-1])/n_steps
+				if method == 'exponential':
+					fast_index,phi1,phi2,A = self.exponential_operators(derivatives,jacobian,y,t[i-1],h,infodict) #Current loop is linearized once in each time step
+				for k in range(n_steps):
+					if method == 'RK4':
+						y = self.RK4_step(derivatives,y,t[i-1] + k*h,h,infodict)
+					elif method == 'exponential':
+						y = self.exponential_step(derivatives,y,t[i-1] + k*h,h,fast_index,phi1,phi2,A,infodict)
+					else:
+						y = self.trapezoidal_step(derivatives,jacobian,y,t[i-1] + k*h,h,infodict)
+				
+				if not np.all(np.isfinite(y)):
+					self.SOLVER_CONVERGENCE = False
+					self.convergence_failure_list.append({'Model':self.PV_model.name,
+														  'Simulation':self.name,
+														  'failure_time_point':t[i],
+														  'failure_code':'non finite states',
+														  'S':self.PV_model.S*self.PV_model.Sbase})
+					raise ValueError('{}:{} solver produced non finite states at {:.6f} s for {} - reduce fixed step!'.format(self.name,self.solver_type,t[i],self.PV_model.name))
+				solution[i] = y
+				infodict['n_steps'] = infodict['n_steps'] + n_steps
+			
+			if self.DEBUG_SOLVER:
+				six.print_('{}:Steps:{},Function evaluations:{},Jacobian evaluations:{}'.format(self.PV_model.name,infodict['n_steps'],infodict['nfe'],infodict['nje']))
+			self.SOLVER_CONVERGENCE = True
+			
+			return solution,infodict
+		except:
+			LogUtil.exception_handler()
+
+
+	def RK4_step(self,derivatives,y,t,h,infodict):
+		"""Classical fourth order Runge-Kutta step."""
+		try:
+			k1 = np.asarray(derivatives(y,t))
+			k2 = np.asarray(derivatives(y + (h/2)*k1,t + h/2))
+			k3 = np.asarray(derivatives(y + (h/2)*k2,t + h/2))
+			k4 = np.asarray(derivatives(y + h*k3,t + h))
+			infodict['nfe'] = infodict['nfe'] + 4
+			
+			return y + (h/6)*(k1 + 2*k2 + 2*k3 + k4)
+		except:
+			LogUtil.exception_handler()
+
+
+	def trapezoidal_step(self,derivatives,jacobian,y,t,h,infodict):
+		"""Trapezoidal rule step solved with simplified Newton iterations using the Jacobian at the start of the step."""
+		try:
+			f = np.asarray(derivatives(y,t))
+			z = y.copy() #Explicit predictor is unstable for the fast inverter current dynamics
+			if self.jacFlag:
+				J = np.asarray(jacobian(y,t))
+			else:
+				J = self.finite_difference_jacobian(derivatives,y,t)
+			infodict['nfe'] = infodict['nfe'] + 1
+			infodict['nje'] = infodict['nje'] + 1
+			
+			M = np.eye(len(y)) - (h/2)*J
+			for n in range(self.max_newton_iterations):
+				residual = z - y - (h/2)*(f + np.asarray(derivatives(z,t + h)))
+				infodict['nfe'] = infodict['nfe'] + 1
+				dz = np.linalg.solve(M,-residual)
+				z = z + dz
+				if np.all(np.abs(dz) <= self.atol + self.rtol*np.abs(z)):
+					return z
+			
+			self.SOLVER_CONVERGENCE = False
+			self.convergence_failure_list.append({'Model':self.PV_model.name,
+												  'Simulation':self.name,
+												  'failure_time_point':t + h,
+												  'failure_code':'Newton iterations did not converge',
+												  'S':self.PV_model.S*self.PV_model.Sbase})
+			raise ValueError('{}:Newton iterations in trapezoidal step did not converge at {:.6f} s!'.format(self.name,t + h))
+		except:
+			LogUtil.exception_handler()
+
+
+	def fast_state_indices(self):
+		"""Indices of inverter current and current controller states."""
+		try:
+			return np.array(sorted([index for state,index in self.PV_model.varInd.items() if state[0] in ['i','x','u'] and state[1:] in ['aR','aI','bR','bI','cR','cI']]))
+		except:
+			LogUtil.exception_handler()
+
+
+	def exponential_operators(self,derivatives,jacobian,y,t,h,infodict):
+		"""Matrix exponential functions of the linearized current loop for given step."""
+		try:
+			fast_index = self.fast_state_indices()
+			if self.jacFlag:
+				J = np.asarray(jacobian(y,t))
+			else:
+				J = self.finite_difference_jacobian(derivatives,y,t)
+			infodict['nje'] = infodict['nje'] + 1
+			
+			A = J[np.ix_(fast_index,fast_index)]
+			n = len(fast_index)
+			M = np.zeros((3*n,3*n)) #phi functions are blocks of exponential of augmented matrix
+			M[:n,:n] = h*A
+			M[:n,n:2*n] = np.eye(n)
+			M[n:2*n,2*n:] = np.eye(n)
+			E = expm(M)
+			
+			return fast_index,E[:n,n:2*n],E[:n,2*n:],A
+		except:
+			LogUtil.exception_handler()
+
+
+	def exponential_step(self,derivatives,y,t,h,fast_index,phi1,phi2,A,infodict):
+		"""Second order exponential time differencing Runge-Kutta step (current loop propagated with matrix exponential, other states with Heun's method)."""
+		try:
+			f = np.asarray(derivatives(y,t))
+			dy = h*f
+			dy[fast_index] = h*np.dot(phi1,f[fast_index])
+			a = y + dy
+			
+			g = np.asarray(derivatives(a,t + h)) - f
+			g[fast_index] = g[fast_index] - np.dot(A,dy[fast_index]) #Change in non linear part of derivatives
+			infodict['nfe'] = infodict['nfe'] + 2
+			
+			dy = (h/2)*g
+			dy[fast_index] = h*np.dot(phi2,g[fast_index])
+			
+			return a + dy
+		except:
+			LogUtil.exception_handler()
+
+
+	def finite_difference_jacobian(self,derivatives,y,t):
+		"""Forward difference approximation of the Jacobian."""
+		try:
+			f = np.asarray(derivatives(y,t))
+			J = np.empty((len(y),len(y)))
+			for j in range(len(y)):
+				delta = math.sqrt(np.finfo(float).eps)*max(1.0,abs(y[j]))
+				y_perturbed = y.copy()
+				y_perturbed[j] = y_perturbed[j] + delta
+				J[:,j] = (np.asarray(derivatives(y_perturbed,t)) - f)/delta
+			
+			return J
 		except:
 			LogUtil.exception_handler()
 
@@ -424,11 +1011,14 @@ class SimulationUtilities():
 			self.solver_type = solver_type
 
 			if self.solver_type == 'ode-vode-bdf':
-				self.ode_solver = ode(self.ODE_model_ode,self.jac_ODE_model_ode).set_integrator('vode',method='bdf',rtol=1e-4,atol=1e-4)
-				self.ode_solver.set_initial_value(self.y0,t0)		
+				self.ode_solver = ode(self.ODE_model_ode).set_integrator('vode',method='bdf',with_jacobian=True,rtol=self.rtol,atol=self.atol,max_step=self.hmax,nsteps=self.max_steps)
+				self.ode_solver.set_initial_value(self.PV_model.y0,t0)		
 			
-			elif self.solver_type == 'odeint':
-				pass #Initialization not required if using odeint
+			elif 'solve_ivp' in self.solver_type:
+				self.jac_sparsity = self.jac_sparsity_calc() #Sparsity pattern used for finite difference Jacobian
+			
+			elif self.solver_type == 'odeint' or 'fixed' in self.solver_type:
+				pass #Initialization not required if using odeint or fixed step solvers
 
 			LogUtil.logger.debug('{}:{} solver initialized.'.format(self.name,self.solver_type))
 		except:
@@ -456,13 +1046,110 @@ class SimulationUtilities():
 			y1 = y[0:self.PV_model.n_ODE]
 			if self.PV_model.standAlone:
 				self.grid_model.steady_state_model(t)
-			y = self.PV_model.jac_ODE_model(y1,t)
+			if self.GENERATED_JACOBIAN:
+				y = self.PV_model.jac_generated(t,y1,self.PV_model.get_rhs_parameters())
+			elif self.DER_model_type in self.jac_list:
+				y = self.PV_model.jac_ODE_model(y1,t)
+			else:
+				y = self.jac_ODE_model_colored(y1,t)
 
 			return y
 		except:
 			LogUtil.exception_handler()
 
 
+	def jac_ODE_model_ivp(self,t,y):
+		"""Return a copy of the Jacobian since solve_ivp may hold on to it between calls."""
+		try:
+			return np.array(self.jac_ODE_model_ode(t,y))
+		except:
+			LogUtil.exception_handler()
+
+
+	def jac_sparsity_calc(self):
+		"""Find sparsity pattern of the Jacobian using the state names in varInd."""
+		try:
+			varInd = self.PV_model.varInd
+			current_states = [state for state in varInd if state[0] == 'i']
+			primary_controller_states = [state for state in varInd if state[0] in ['x','u'] and state[-1] in ['R','I']]
+			secondary_controller_states = [state for state in ['Vdc','xDC','xP','xQ'] if state in varInd]
+			PLL_states = [state for state in ['xPLL','wte'] if state in varInd]
+			
+			dependencies = {} #States on which each derivative depends
+			for state in current_states: #Inverter current depends on terminal voltage, PCC voltage, and inverter frequency
+				phase = state[1]
+				dependencies[state] = current_states + ['x'+phase+'R','x'+phase+'I','u'+phase+'R','u'+phase+'I'] + secondary_controller_states[:1] + PLL_states
+			for state in primary_controller_states: #Current controller depends on current reference and anti-windup logic
+				phase = state[1]
+				if state[0] == 'x':
+					dependencies[state] = ['x'+phase+'R','x'+phase+'I','u'+phase+'R','u'+phase+'I']
+				else:
+					dependencies[state] = current_states + primary_controller_states + secondary_controller_states
+			for state in secondary_controller_states: #DC link and power controllers depend on power output
+				dependencies[state] = current_states + primary_controller_states + secondary_controller_states
+			for state in PLL_states: #PLL depends on PCC voltage
+				dependencies[state] = current_states + PLL_states
+			
+			jac_sparsity = np.zeros((self.PV_model.n_ODE,self.PV_model.n_ODE),dtype=int)
+			for state,dependent_states in dependencies.items():
+				jac_sparsity[varInd[state],[varInd[dependent_state] for dependent_state in dependent_states if dependent_state in varInd]] = 1
+			LogUtil.logger.debug('{}:Jacobian sparsity pattern has {} non-zero entries out of {}.'.format(self.name,jac_sparsity.sum(),jac_sparsity.size))
+			
+			return jac_sparsity
+		except:
+			LogUtil.exception_handler()
+
+
+	def jac_coloring_calc(self):
+		"""Group columns of the Jacobian that do not have non-zero entries in the same row (greedy graph coloring)."""
+		try:
+			jac_sparsity = self.jac_sparsity_calc().astype(bool)
+			colors = [] #Columns in each group
+			color_rows = [] #Rows with non-zero entries in each group
+			for column in range(jac_sparsity.shape[1]):
+				for color,rows in zip(colors,color_rows):
+					if not np.any(rows & jac_sparsity[:,column]):
+						color.append(column)
+						rows |= jac_sparsity[:,column]
+						break
+				else:
+					colors.append([column])
+					color_rows.append(jac_sparsity[:,column].copy())
+			LogUtil.logger.debug('{}:Jacobian columns were grouped into {} colors out of {}.'.format(self.name,len(colors),jac_sparsity.shape[1]))
+			
+			return jac_sparsity,[np.array(color) for color in colors]
+		except:
+			LogUtil.exception_handler()
+
+
+	def jac_ODE_model_colored(self,y,t):
+		"""Finite difference Jacobian with grouped column perturbations evaluated in a single call to the stateless `rhs` kernel."""
+		try:
+			if self.jac_coloring is None:
+				self.jac_coloring = self.jac_coloring_calc() #Sparsity pattern and coloring are found only once
+			jac_sparsity,colors = self.jac_coloring
+			
+			y = np.asarray(y,dtype=float)
+			n_colors = len(colors)
+			delta = math.sqrt(np.finfo(float).eps)*np.maximum(1.0,np.abs(y))
+			Y = np.tile(y[:,np.newaxis],(1,n_colors+1))
+			for k,columns in enumerate(colors):
+				Y[columns,k+1] = Y[columns,k+1] + delta[columns]
+			
+			params = self.PV_model.get_rhs_parameters()
+			F = self.PV_model.rhs(t,Y,np.tile(params[:,np.newaxis],(1,n_colors+1)))
+			
+			J = np.zeros((len(y),len(y)))
+			for k,columns in enumerate(colors):
+				for column in columns:
+					rows = jac_sparsity[:,column]
+					J[rows,column] = (F[rows,k+1] - F[rows,0])/delta[column]
+			
+			return J
+		except:
+			LogUtil.exception_handler()
+
+
 	def check_simulation(self,infodict,t):
 		"""Check whether the ODE solver failed at any time step."""
 		try:
@@ -502,3 +1189,23 @@ class SimulationUtilities():
 			LogUtil.exception_handler()
 
 
+	def check_solve_ivp_simulation(self,infodict,t):
+		"""Check whether the solve_ivp solver reached the end of the time interval."""
+		try:
+			if infodict['status'] == -1:
+				self.SOLVER_CONVERGENCE = False
+				failure_time_point = infodict['t'][-1] if len(infodict['t']) > 0 else t[0]
+				self.convergence_failure_list.append({'Model':self.PV_model.name,
+													'Simulation':self.name,
+													'failure_time_point':failure_time_point,
+													'failure_code':infodict['message'],
+													'S':self.PV_model.S*self.PV_model.Sbase})
+				raise ValueError('{}:ODE solver failed after {:.6f} s for {} with message:{}!'.format(self.name,failure_time_point,self.PV_model.name,infodict['message']))
+			else:
+				if self.DEBUG_SOLVER:
+					six.print_('{}:Function evaluations:{},Jacobian evaluations:{},LU decompositions:{}'.format(self.PV_model.name,infodict['nfev'],infodict['njev'],infodict['nlu']))
+				self.SOLVER_CONVERGENCE = True
+		except:
+			LogUtil.exception_handler()
+
+
@@ -5,6 +5,8 @@ Created on Mon Mar 30 10:19:16 2020
 @author: splathottam
 """
 
+import numpy as np
+
 single_phase_models = ["SolarPVDERSinglePhase","SolarPVDERSinglePhaseConstantVdc"]
 three_phase_models = ["SolarPVDERThreePhase","SolarPVDERThreePhaseConstantVdc","SolarPVDERThreePhaseBalanced"]
 
@@ -158,3 +160,24 @@ RT_config_template_old = {'LVRT':{'0':['V_threshold','t_threshold','mode','t_sta
 					  't_HF1_limit':'','t_HF2_limit':'',
 					  'FRT_INSTANTANEOUS_TRIP':''
 					 }
+
+
+def get_state_layout(DER_model_type):
+	"""Position of states in the ODE solution of a DER model derived from the order of its initial states.
+	Args:
+		 DER_model_type (str): Name of DER model class (e.g. 'SolarPVDERThreePhase').
+	Returns:
+		 dict: State names, index of each state, complex states (e.g. 'ia' for 'iaR' and 'iaI') with slices for their adjacent real and imaginary parts,
+		 remaining real states with an index array, and phases whose states are not in the solution (calculated from phase a in balanced models).
+	"""
+	states = list(DER_design_template[DER_model_type]['initial_states'])
+	index = {state:i for i,state in enumerate(states)}
+	complex_states = [state[:-1] for state in states if state[-1] == 'R' and index.get(state[:-1] + 'I') == index[state] + 1]
+	real_states = [state for state in states if state[:-1] not in complex_states]
+	
+	return {'states':states,'index':index,
+			'complex_states':complex_states,'complex_slices':[slice(index[state + 'R'],index[state + 'R'] + 2) for state in complex_states],
+			'real_states':real_states,'real_indices':np.array([index[state] for state in real_states],dtype=int),
+			'derived_phases':[phase for phase in DER_design_template[DER_model_type]['basic_specs']['phases'] if 'i' + phase not in complex_states]}
+
+state_layouts = {DER_model_type:get_state_layout(DER_model_type) for DER_model_type in DER_design_template}
@@ -8,8 +8,11 @@ import six
 import pprint
 import pdb
 import os
+import struct
 
-from pvder import templates,specifications
+import numpy as np
+
+from pvder import templates,specifications,defaults
 from pvder.defaults import logConfig
 from pvder.logutil import LogUtil
 
@@ -28,6 +31,8 @@ class Utilities(object):
 			self.name = model_name + '_' + str(self.ID) #Object name			
 		elif model_name == 'DynamicSimulation':
 			self.name = 'sim_'+str(self.ID)  #Object name
+		elif model_name == 'EnsembleSimulation':
+			self.name = 'ensemble_'+str(self.ID)  #Object name
 		elif model_name == 'SimulationEvents':
 			self.name = 'events_'+str(self.ID)  #Object name
 		elif model_name == 'SimulationResults':
@@ -54,3 +59,87 @@ class Utilities(object):
 #		return self.__verbosity
 
 
+class GrowableArray(object):
+	"""Array that can be appended to in amortized constant time by doubling its capacity when full."""
+	
+	def __init__(self,values,capacity=None,dtype=None):
+		"""Creates an instance of `GrowableArray`.
+		Args:
+			 values (array_like): Initial values (appended along first axis).
+			 capacity (int): Initial number of rows that can be stored without reallocation (default: `defaults.trajectory_buffer_size`).
+			 dtype (data-type): Data type of stored values (default: data type of initial values).
+		"""
+		values = np.asarray(values,dtype=dtype)
+		if capacity is None:
+			capacity = defaults.trajectory_buffer_size
+		
+		self._n_rows = 0
+		self._buffer = self._allocate(max(capacity,len(values)),values.shape[1:],values.dtype)
+		self.append(values)
+	
+	def __len__(self):
+		return self._n_rows
+	
+	@property
+	def data(self):
+		"""View (without copying) of the stored values."""
+		return self._buffer[:self._n_rows]
+	
+	def append(self,values):
+		"""Append values along first axis."""
+		values = np.asarray(values)
+		n_rows = self._n_rows + len(values)
+		if n_rows > len(self._buffer):
+			self._grow(max(n_rows,2*len(self._buffer)))
+		
+		self._buffer[self._n_rows:n_rows] = values
+		self._n_rows = n_rows
+	
+	def flush(self):
+		"""Nothing needs to be written for arrays in memory."""
+		pass
+	
+	def _allocate(self,capacity,row_shape,dtype):
+		"""Allocate buffer."""
+		return np.empty((capacity,) + row_shape,dtype=dtype)
+	
+	def _grow(self,capacity):
+		"""Move stored values to a larger buffer."""
+		buffer = self._allocate(capacity,self._buffer.shape[1:],self._buffer.dtype)
+		buffer[:self._n_rows] = self.data
+		self._buffer = buffer #Views returned earlier keep referring to the old buffer
+
+
+class MemmapArray(GrowableArray):
+	"""Growable array stored in a memory mapped .npy file that can be read with `np.load(file_name,mmap_mode='r')`."""
+	
+	header_length = 128 #Fixed header length leaves space for shape to grow without moving the data
+	
+	def __init__(self,file_name,values,capacity=None,dtype=None):
+		"""Creates an instance of `MemmapArray`.
+		Args:
+			 file_name (str): Name of .npy file (overwritten if it exists).
+			 values (array_like): Initial values (appended along first axis).
+			 capacity (int): Initial number of rows that can be stored before the file is extended (default: `defaults.trajectory_buffer_size`).
+			 dtype (data-type): Data type of stored values (default: data type of initial values).
+		"""
+		self.file_name = file_name
+		super(MemmapArray,self).__init__(values,capacity=capacity,dtype=dtype)
+		self.flush()
+	
+	def flush(self):
+		"""Write number of stored rows to header and stored values to disk."""
+		self._buffer.flush()
+		header = "{{'descr': {!r}, 'fortran_order': False, 'shape': {!r}, }}".format(np.lib.format.dtype_to_descr(self._buffer.dtype),(self._n_rows,) + self._buffer.shape[1:])
+		prefix = np.lib.format.magic(1,0) + struct.pack('<H',self.header_length - 10)
+		with open(self.file_name,'r+b') as f:
+			f.write(prefix + (header.ljust(self.header_length - 11) + '\n').encode('latin1'))
+	
+	def _allocate(self,capacity,row_shape,dtype):
+		"""Create file and map it to memory."""
+		return np.memmap(self.file_name,dtype=dtype,mode='w+',offset=self.header_length,shape=(capacity,) + row_shape)
+	
+	def _grow(self,capacity):
+		"""Extend file and map it to memory again (stored values are not copied)."""
+		self._buffer.flush()
+		self._buffer = np.memmap(self.file_name,dtype=self._buffer.dtype,mode='r+',offset=self.header_length,shape=(capacity,) + self._buffer.shape[1:])
@@ -210,6 +210,32 @@ def alpha_beta_to_d_q(ualpha,ubeta,wt):
 		LogUtil.exception_handler()
 
 
+def phasor_to_time_time_series(uph_t,w_t,t):
+	"""Convert time series of phasors to time domain."""
+	try:
+		return np.abs(uph_t)*np.cos(w_t*t+np.angle(uph_t)-(math.pi/2))
+	except:
+		LogUtil.exception_handler()
+
+
+def abc_to_dq0_time_series(ua_t,ub_t,uc_t,wt_t):
+	"""Convert time series of a,b,c quantities to d-q."""
+	try:
+		Us_t = (2/3)*(ua_t + ub_t*np.exp(1j*((2/3)*math.pi)) + uc_t*np.exp(1j*(-(2/3)*math.pi)))*np.exp(1j*(-wt_t))
+		return Us_t.real,Us_t.imag,(1/3)*(ua_t+ub_t+uc_t)
+	except:
+		LogUtil.exception_handler()
+
+
+def alpha_beta_to_d_q_time_series(ualpha_t,ubeta_t,wt_t):
+	"""Convert time series of alpha-beta quantities to d-q."""
+	try:
+		Us_t = (ualpha_t + 1j*ubeta_t)*np.exp(-1j*wt_t)
+		return Us_t.real,Us_t.imag
+	except:
+		LogUtil.exception_handler()
+
+
 def phasor_to_symmetrical(upha,uphb,uphc):
 	"""Convert to zero sequence."""
 	try:
@@ -268,6 +294,33 @@ def m_time_series(u_t,x_t,Kp_GCC):
 		LogUtil.exception_handler()
 
 
+def decimate_time_series(u_t,n,method='sample'):
+	"""Function to reduce number of time steps in time series by a factor n.
+	Args:
+		 u_t (array): Time series.
+		 n (int): Number of time steps in each output time step.
+		 method (str): 'sample' (first value), 'minmax' (values with minimum and maximum magnitude as two columns), or 'rms' (RMS of magnitude).
+	Returns:
+		 array: Time series with one value (two values for 'minmax') for each output time step.
+	"""
+	try:
+		u_t = np.asarray(u_t)
+		indices = np.arange(0,len(u_t),n)
+		if method == 'sample':
+			return u_t[indices]
+		elif method == 'rms':
+			return np.sqrt(np.add.reduceat(np.square(np.abs(u_t)),indices)/np.diff(np.append(indices,len(u_t))))
+		elif method == 'minmax':
+			u_padded = np.concatenate((u_t,np.repeat(u_t[-1:],len(indices)*n - len(u_t)))).reshape(len(indices),n) #Last value is repeated to fill last output time step
+			u_magnitude = np.abs(u_padded) if np.iscomplexobj(u_padded) else u_padded
+			rows = np.arange(len(indices))
+			return np.stack((u_padded[rows,np.argmin(u_magnitude,axis=1)],u_padded[rows,np.argmax(u_magnitude,axis=1)]),axis=1)
+		else:
+			raise ValueError('{} is not a valid decimation method!'.format(method))
+	except:
+		LogUtil.exception_handler()
+
+
 def extract_matlab_file(file_name,series_label):
 	"""Program to extract contents of .mat file having structure with time format."""
 	try:
@@ -0,0 +1,145 @@
+"""Benchmarks for solver and model performance (not run as unit tests)."""
+
+from __future__ import division
+import argparse
+import math
+import time
+
+import numpy as np
+
+from pvder.DER_components_single_phase import SolarPVDERSinglePhase
+from pvder.DER_components_three_phase import SolarPVDERThreePhase
+from pvder.grid_components import Grid
+from pvder.simulation_events import SimulationEvents
+from pvder.dynamic_simulation import DynamicSimulation
+
+config_file = r'..\config_der.json'
+
+scaler = 0.835
+Va = (.50+0j)*Grid.Vbase*scaler
+Vb = (-.25-.43301270j)*Grid.Vbase*scaler
+Vc = (-.25+.43301270j)*Grid.Vbase*scaler
+wgrid = 2*math.pi*60.0
+
+
+def create_DER_model(DER_model,standAlone=False,**kwargs):
+	"""Create a DER model connected to a constant grid voltage (or a stand alone DER model)."""
+	
+	events = SimulationEvents(verbosity='WARNING')
+	if standAlone:
+		grid = Grid(events=events)
+		return DER_model(events=events,configFile=config_file,gridModel=grid,standAlone=True,steadyStateInitialization=True,verbosity='WARNING',**kwargs),events,grid
+	else:
+		voltage_arguments = {'gridVoltagePhaseA':Va,'gridFrequency':wgrid}
+		if DER_model == SolarPVDERThreePhase:
+			voltage_arguments.update({'gridVoltagePhaseB':Vb,'gridVoltagePhaseC':Vc})
+		return DER_model(events=events,configFile=config_file,standAlone=False,steadyStateInitialization=True,
+						 VrmsRating=abs(Va)/math.sqrt(2),verbosity='WARNING',**voltage_arguments,**kwargs),events,None
+
+
+def benchmark_rhs(n_calls=1000):
+	"""Compare time per call of the stateless RHS kernel and the ODE model."""
+	
+	for DER_model,power_rating in [(SolarPVDERSinglePhase,10.0e3),(SolarPVDERThreePhase,50.0e3)]:
+		PVDER,_,_ = create_DER_model(DER_model,powerRating=power_rating)
+		y0 = np.array(PVDER.y0)
+		params = PVDER.get_rhs_parameters()
+		
+		t_start = time.perf_counter()
+		for _ in range(n_calls):
+			PVDER.ODE_model(y0,0.1)
+		t_ODE = (time.perf_counter() - t_start)/n_calls
+		
+		t_start = time.perf_counter()
+		for _ in range(n_calls):
+			PVDER.rhs(0.1,y0,params)
+		t_rhs = (time.perf_counter() - t_start)/n_calls
+		
+		print('{}:Time per call - ODE_model:{:.1f} us, rhs:{:.1f} us, speedup:{:.1f}'.format(DER_model.__name__,t_ODE*1e6,t_rhs*1e6,t_ODE/t_rhs))
+
+
+
+def run_solver(solver_type,tStop,**kwargs):
+	"""Simulate a voltage sag with the specified solver.
+	Returns:
+		 tuple: Solution time and DC link voltage trajectory.
+	"""
+	
+	PVDER,events,grid = create_DER_model(SolarPVDERThreePhase,standAlone=True,powerRating=50.0e3)
+	events.add_grid_event(0.3,0.9)
+	sim = DynamicSimulation(PV_model=PVDER,events=events,gridModel=grid,jacFlag=True,verbosity='WARNING',solverType=solver_type)
+	sim.tStop = tStop
+	sim.tInc = 1/120.
+	for name,value in kwargs.items():
+		setattr(sim,name,value)
+	
+	time_start = time.perf_counter()
+	sim.run_simulation()
+	
+	return time.perf_counter() - time_start,np.array(sim.Vdc_t)
+
+
+def benchmark_fixed_step_solvers():
+	"""Compare solution time and accuracy of fixed step solvers (with one step or several equal steps for each time step) with odeint."""
+	
+	for solver_type,tStop,fixed_step in [('fixed-trapezoidal',0.5,None),('fixed-trapezoidal',0.5,1e-4),('fixed-RK4',0.02,2.5e-6)]:
+		solution_time_odeint,Vdc_t_odeint = run_solver('odeint',tStop)
+		solution_time,Vdc_t = run_solver(solver_type,tStop,**{'fixed_step_{}'.format(solver_type.split('-')[-1]):fixed_step})
+		print('{} ({} s,fixed step:{}):Solution time:{:.3f} s (odeint:{:.3f} s),Max difference with odeint in Vdc:{:.2e}'.format(solver_type,tStop,fixed_step,solution_time,solution_time_odeint,max(abs(Vdc_t - Vdc_t_odeint))))
+
+
+def benchmark_exponential_integrator():
+	"""Compare solution time and accuracy of exponential integrator with time step equal to simulation time step and odeint."""
+	
+	solution_time_odeint,Vdc_t_odeint = run_solver('odeint',1.0)
+	solution_time,Vdc_t = run_solver('fixed-exponential',1.0,fixed_step_exponential=1/120.)
+	print('fixed-exponential:Solution time:{:.3f} s (odeint:{:.3f} s),Max difference with odeint in Vdc:{:.2e}'.format(solution_time,solution_time_odeint,max(abs(Vdc_t - Vdc_t_odeint))))
+
+
+def benchmark_colored_jacobian(n_calls=100):
+	"""Compare time per call of finite difference Jacobian with column coloring and analytical Jacobian."""
+	
+	PVDER,events,grid = create_DER_model(SolarPVDERThreePhase,standAlone=True,powerRating=50.0e3)
+	sim = DynamicSimulation(PV_model=PVDER,events=events,gridModel=grid,jacFlag=True,verbosity='WARNING',solverType='odeint')
+	y = np.array(PVDER.y0)
+	sim.jac_ODE_model_colored(y,0.0) #Coloring is calculated in first call
+	jac_sparsity,colors = sim.jac_coloring
+	
+	time_start = time.perf_counter()
+	for _ in range(n_calls):
+		sim.jac_ODE_model_colored(y,0.0)
+	time_colored = (time.perf_counter() - time_start)/n_calls
+	
+	time_start = time.perf_counter()
+	for _ in range(n_calls):
+		sim.jac_ODE_model(y,0.0)
+	time_analytical = (time.perf_counter() - time_start)/n_calls
+	print('Colored Jacobian:{} RHS evaluations in one call instead of {},time:{:.3f} ms (analytical:{:.3f} ms)'.format(len(colors)+1,PVDER.n_ODE+1,time_colored*1e3,time_analytical*1e3))
+
+
+def benchmark_generated_code(n_calls=100):
+	"""Compare time per call of stateless RHS kernel with generated RHS and Jacobian (generated code is cached in defaults.codegen_cache_directory)."""
+	
+	PVDER,_,_ = create_DER_model(SolarPVDERThreePhase,standAlone=True,powerRating=50.0e3)
+	y = np.array(PVDER.y0)
+	params = PVDER.get_rhs_parameters()
+	PVDER.jac_generated(0.0,y,params) #Generate code or load it from cache
+	
+	times = []
+	for function in [PVDER.rhs,PVDER.rhs_generated,PVDER.jac_generated]:
+		time_start = time.perf_counter()
+		for _ in range(n_calls):
+			function(0.0,y,params)
+		times.append((time.perf_counter() - time_start)/n_calls)
+	print('RHS kernel:{:.1f} us,generated RHS:{:.1f} us,generated Jacobian:{:.1f} us'.format(*[time_call*1e6 for time_call in times]))
+
+
+benchmarks = {'rhs':benchmark_rhs,'fixed_step':benchmark_fixed_step_solvers,'exponential':benchmark_exponential_integrator,'colored_jacobian':benchmark_colored_jacobian,'generated_code':benchmark_generated_code}
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Run benchmarks.')
+	parser.add_argument('benchmarks', nargs='*', default=list(benchmarks.keys()), choices=list(benchmarks.keys()), help='Benchmarks to run (default: all).')
+	args = parser.parse_args()
+	
+	for benchmark in args.benchmarks:
+		benchmarks[benchmark]()
@@ -6,14 +6,27 @@ import logging
 import unittest
 
 import math
+import time
+import tempfile
+import shutil
+
+import numpy as np
 
 import matplotlib.pyplot as plt
 
 from pvder.DER_components_three_phase import SolarPVDERThreePhase
+from pvder.DER_components_three_phase_balanced import SolarPVDERThreePhaseBalanced
+from pvder.DER_components_three_phase_constant_Vdc import SolarPVDERThreePhaseConstantVdc
 from pvder.grid_components import Grid
 from pvder.dynamic_simulation import DynamicSimulation
+from pvder.ensemble_simulation import EnsembleSimulation
 from pvder.simulation_events import SimulationEvents
 from pvder.simulation_utilities import SimulationResults
+from pvder.utility_classes import GrowableArray
+from pvder import templates
+from pvder import defaults
+from pvder import DER_codegen
+from pvder.logutil import LogUtil
 
 from unittest_utilities import show_DER_status, plot_DER_trajectories
 config_file = r'..\config_der.json'
@@ -21,7 +34,7 @@ config_file = r'..\config_der.json'
 def suite():
 	"""Define a test suite."""
 	
-	all_tests = ['test_init','test_run_simulation']
+	all_tests = ['test_init','test_run_simulation','test_run_simulation_solve_ivp','test_run_simulation_vode','test_run_simulation_segmented','test_ensemble_simulation','test_run_simulation_hybrid','test_run_simulation_RT_events','test_run_simulation_loop_mode_persistent','test_run_simulation_fixed_step','test_run_simulation_exponential','test_jacobian_colored','test_jacobian_generated','test_derived_trajectories','test_outputs','test_loop_mode_buffers','test_trajectory_directory','test_run_streaming','test_output_decimation','test_complex_state_views','test_state_layouts','test_time_series_events','test_stateless_events','test_bulk_events']
 	
 	avoid_tests = []
    
@@ -90,7 +103,756 @@ class TestPVDER(unittest.TestCase):
 
 		self.assertEqual(sim.t[-1],sim.tStop)
 		self.assertTrue(sim.SOLVER_CONVERGENCE)  
+	
+	def test_run_simulation_solve_ivp(self):
+		"""Test run simulation method with solve_ivp solver.""" 
+		
+		events = SimulationEvents()
+		kwargs={}
+		kwargs.update(self.flag_arguments)
+		kwargs.update(self.ratings_arguments)
+		kwargs.update(self.voltage_arguments)
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,**kwargs)
+		
+		for jacFlag in [True,False]:
+			sim = DynamicSimulation(PV_model=PVDER,events = events,
+									jacFlag = jacFlag,verbosity = 'DEBUG',solverType='solve_ivp-BDF')
+			sim.tStop = 1.0
+			sim.tInc = 1/120.
+			sim.run_simulation()
+
+			self.assertEqual(sim.t[-1],sim.tStop)
+			self.assertEqual(len(sim.t_t),len(sim.Vdc_t))
+			self.assertTrue(sim.SOLVER_CONVERGENCE)
+
+	
+
+	def test_run_simulation_vode(self):
+		"""Test run simulation method with ode-vode-bdf solver against odeint."""
+		
+		Vdc_t = {}
+		for solver_type in ['odeint','ode-vode-bdf']:
+			events = SimulationEvents()
+			events.add_grid_event(0.3,0.9)
+			grid = Grid(events=events)
+			PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+										 steadyStateInitialization = True,powerRating = self.power_rating)
+			sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,
+									jacFlag = True,verbosity = 'DEBUG',solverType=solver_type)
+			sim.tStop = 0.5
+			sim.tInc = 1/120.
+			sim.run_simulation()
+			
+			self.assertTrue(sim.SOLVER_CONVERGENCE)
+			self.assertAlmostEqual(sim.t_t[-1],sim.tStop)
+			Vdc_t[solver_type] = np.array(sim.Vdc_t)
+		
+		self.assertEqual(len(Vdc_t['ode-vode-bdf']),len(Vdc_t['odeint']))
+		self.assertLess(max(abs(Vdc_t['ode-vode-bdf'] - Vdc_t['odeint'])),1e-2)
+		
+		y0 = np.array(PVDER.y0)
+		solutions = []
+		for n_buffer in [None,2]: #Solution buffer is grown during simulation if it is too small
+			sim.ode_solver.set_initial_value(y0,sim.tStart)
+			solution,_ = sim.call_ode_solver(n_buffer=n_buffer)
+			self.assertEqual(len(sim.t),len(Vdc_t['odeint']))
+			solutions.append(solution)
+		self.assertTrue(np.array_equal(solutions[0],solutions[1]))
+		
+		sim.max_steps = 1
+		sim.initialize_solver('ode-vode-bdf')
+		with self.assertRaises(ValueError):
+			sim.run_simulation()
+		self.assertFalse(sim.SOLVER_CONVERGENCE)
+		self.assertEqual(len(sim.convergence_failure_list),1)
+	
+	def test_run_simulation_segmented(self):
+		"""Test run simulation method with solver restarted at events.""" 
+		
+		events = SimulationEvents()
+		events.add_solar_event(0.5,50.0)
+		kwargs={}
+		kwargs.update(self.flag_arguments)
+		kwargs.update(self.ratings_arguments)
+		kwargs.update(self.voltage_arguments)
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,**kwargs)
+
+		sim = DynamicSimulation(PV_model=PVDER,events = events,
+								jacFlag = True,verbosity = 'DEBUG',solverType='odeint')
+		sim.SEGMENT_AT_EVENTS = True
+		sim.tStop = 1.0
+		sim.tInc = 1/120.
+		sim.run_simulation()
+
+		self.assertEqual(sim.t[-1],sim.tStop)
+		self.assertEqual(len(sim.t_t),len(sim.Vdc_t))
+		self.assertTrue(sim.SOLVER_CONVERGENCE)
+		self.assertLess(sim.Ppv_t[-1],0.6*sim.Ppv_t[0]) #Solar event must be applied in second segment
+
+	def test_ensemble_simulation(self):
+		"""Test ensemble simulation of DER instances with different insolation against dynamic simulation.""" 
+		
+		kwargs={}
+		kwargs.update(self.flag_arguments)
+		kwargs.update(self.ratings_arguments)
+		kwargs.update(self.voltage_arguments)
+		
+		PVDER_list = []
+		for Sinsol in [50.0,70.0,90.0]:
+			events = SimulationEvents()
+			events.add_solar_event(0.5,Sinsol)
+			PVDER_list.append(SolarPVDERThreePhaseBalanced(events = events,configFile=config_file,derId='50_balanced',**kwargs))
+		
+		ensemble = EnsembleSimulation(PVDER_list,tStop = 1.0)
+		ensemble.run_simulation()
+		Vdc_t = ensemble.get_state_trajectory('Vdc')
+		
+		self.assertEqual(ensemble.Y_t.shape,(len(ensemble.t),3,PVDER_list[0].n_ODE))
+		self.assertLess(Vdc_t[-1,0],Vdc_t[-1,2]) #Lower insolation should result in lower DC link voltage
+		
+		events = SimulationEvents()
+		events.add_solar_event(0.5,50.0)
+		PVDER = SolarPVDERThreePhaseBalanced(events = events,configFile=config_file,derId='50_balanced',**kwargs)
+		sim = DynamicSimulation(PV_model=PVDER,events = events,
+								jacFlag = True,verbosity = 'DEBUG',solverType='odeint')
+		sim.SEGMENT_AT_EVENTS = True
+		sim.tStop = 1.0
+		sim.run_simulation()
+		
+		self.assertAlmostEqual(Vdc_t[-1,0],sim.Vdc_t[-1],delta=1e-3)
+
+	def test_run_simulation_hybrid(self):
+		"""Test run simulation method with ride through logic evaluated only at time steps.""" 
+		
+		events = SimulationEvents()
+		events.add_grid_event(0.5,0.6)
+		events.add_grid_event(1.0,1.0)
+		grid = Grid(events=events)
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+									 steadyStateInitialization = True,powerRating = self.power_rating)
+		PVDER.LVRT_ENABLE = True
+		
+		sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,
+								jacFlag = False,verbosity = 'DEBUG',solverType='odeint')
+		sim.HYBRID_MODE = True
+		sim.tStop = 1.0
+		sim.tInc = 1/120.
+		sim.run_simulation()
+		
+		self.assertEqual(len(sim.t_t),len(sim.Vdc_t))
+		self.assertTrue(sim.SOLVER_CONVERGENCE)
+		self.assertFalse(PVDER.DER_CONNECTED) #DER should enter momentary cessation during voltage sag
+		self.assertFalse(PVDER.HOLD_DISCRETE_STATES)
+		
+		sim.max_steps = 1 #Solver should fail
+		with self.assertRaises(ValueError):
+			sim.run_simulation()
+		self.assertFalse(sim.SOLVER_CONVERGENCE)
+		self.assertFalse(PVDER.HOLD_DISCRETE_STATES)
+	
+	def test_run_simulation_RT_events(self):
+		"""Test run simulation method with ride through events located by root finding."""
+		
+		events = SimulationEvents()
+		events.add_grid_event(0.5,0.6)
+		events.add_grid_event(1.0,1.0)
+		grid = Grid(events=events)
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+									 steadyStateInitialization = True,powerRating = self.power_rating)
+		PVDER.LVRT_ENABLE = True
+		
+		sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,
+								jacFlag = False,verbosity = 'DEBUG',solverType='odeint')
+		sim.LOCATE_RT_EVENTS = True
+		sim.tStop = 1.0
+		sim.tInc = 1/120.
+		sim.run_simulation()
+		
+		self.assertEqual(len(sim.t_t),len(sim.Vdc_t))
+		self.assertTrue(sim.SOLVER_CONVERGENCE)
+		self.assertFalse(PVDER.DER_CONNECTED)
+		self.assertFalse(PVDER.HOLD_DISCRETE_STATES)
+		
+		t_disconnect = [RT_event['T'] for RT_event in sim.RT_events_list if RT_event['event'] == 'disconnect_timer']
+		self.assertEqual(len(t_disconnect),1)
+		self.assertAlmostEqual(t_disconnect[0],0.5 + PVDER.t_disconnect_delay,places=5) #Disconnect time should not depend on time step
+		
+		sim.atol = -1.0 #Solver should fail
+		with self.assertRaises(ValueError):
+			sim.run_simulation()
+		self.assertFalse(PVDER.HOLD_DISCRETE_STATES)
+	
+	def test_run_simulation_loop_mode_persistent(self):
+		"""Test run simulation method in loop mode with persistent solver."""
+		
+		Vdc_final = []
+		for PERSISTENT_SOLVER in [False,True]:
+			events = SimulationEvents()
+			kwargs={}
+			kwargs.update(self.flag_arguments)
+			kwargs.update(self.ratings_arguments)
+			kwargs.update(self.voltage_arguments)
+			PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,**kwargs)
+			
+			sim = DynamicSimulation(PV_model=PVDER,events = events,LOOP_MODE = True,
+									jacFlag = True,verbosity = 'DEBUG',solverType='odeint')
+			sim.PERSISTENT_SOLVER = PERSISTENT_SOLVER
+			sim.tInc = 1/120.
+			
+			t0 = 0.0
+			for i in range(60):
+				scaler = 0.9 if 20 <= i < 40 else 1.0 #Voltage sag exchanged from external program
+				sim.run_simulation(gridVoltagePhaseA=scaler*self.Va/Grid.Vbase,gridVoltagePhaseB=scaler*self.Vb/Grid.Vbase,gridVoltagePhaseC=scaler*self.Vc/Grid.Vbase,
+								   y0=sim.y0,t=[t0,t0+sim.tInc])
+				t0 = t0 + sim.tInc
+				self.assertTrue(sim.SOLVER_CONVERGENCE)
+			Vdc_final.append(sim.Vdc_t[-1])
+		
+		self.assertIsNotNone(sim.persistent_solver)
+		self.assertAlmostEqual(Vdc_final[0],Vdc_final[1],places=3)
+		self.assertTrue(sim.set_lsoda_critical_time(sim.create_lsoda_solver(),1.0))
+		self.assertFalse(sim.set_lsoda_critical_time(sim.create_lsoda_solver().set_integrator('vode'),1.0)) #Falls back to normal stepping
+
+
+	def test_run_simulation_fixed_step(self):
+		"""Test run simulation method with fixed step solvers and compare accuracy with odeint."""
+		
+		results = {}
+		for solver_type,tStop,fixed_step in [('odeint',0.5,None),('fixed-trapezoidal',0.5,None),('fixed-trapezoidal',0.5,1e-3),('odeint',0.02,None),('fixed-RK4',0.02,2.5e-6)]:
+			events = SimulationEvents()
+			events.add_grid_event(0.3,0.9)
+			grid = Grid(events=events)
+			PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+										 steadyStateInitialization = True,powerRating = self.power_rating)
+			
+			sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,
+									jacFlag = True,verbosity = 'DEBUG',solverType=solver_type)
+			sim.fixed_step_trapezoidal = fixed_step #One step for each time step by default
+			sim.fixed_step_RK4 = fixed_step
+			sim.tStop = tStop
+			sim.tInc = 1/120.
+			sim.run_simulation()
+			results[(solver_type,tStop,fixed_step)] = (np.array(sim.Vdc_t),np.array(sim.S_t))
+			
+			self.assertTrue(sim.SOLVER_CONVERGENCE)
+			self.assertEqual(len(sim.t_t),len(sim.Vdc_t))
+		
+		for solver_type,tStop,fixed_step in [('fixed-trapezoidal',0.5,None),('fixed-trapezoidal',0.5,1e-3),('fixed-RK4',0.02,2.5e-6)]:
+			Vdc_t,S_t = results[(solver_type,tStop,fixed_step)]
+			Vdc_t_odeint,S_t_odeint = results[('odeint',tStop,None)]
+			Vdc_error = max(abs(Vdc_t - Vdc_t_odeint))
+			S_error = max(abs(S_t - S_t_odeint))
+			
+			self.assertLess(Vdc_error,1e-2)
+			self.assertAlmostEqual(S_t[-1],S_t_odeint[-1],places=2) #Instant of grid event may differ by a time step between solvers
+		
+		events = SimulationEvents()
+		grid = Grid(events=events)
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+									 steadyStateInitialization = True,powerRating = self.power_rating)
+		sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,jacFlag = True,verbosity = 'DEBUG',solverType='fixed-trapezoidal')
+		sim.max_newton_iterations = 0 #Newton iterations should fail
+		sim.tStop = 0.02
+		with self.assertRaises(ValueError):
+			sim.run_simulation()
+		self.assertFalse(sim.SOLVER_CONVERGENCE)
+		self.assertEqual(sim.convergence_failure_list[-1]['failure_code'],'Newton iterations did not converge')
+
+	def test_run_simulation_exponential(self):
+		"""Test run simulation method with exponential integrator for a time step much larger than the current loop time constant."""
+		
+		results = {}
+		for solver_type in ['odeint','fixed-exponential']:
+			events = SimulationEvents()
+			events.add_grid_event(0.3,0.9)
+			grid = Grid(events=events)
+			PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+										 steadyStateInitialization = True,powerRating = self.power_rating)
+			
+			sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,
+									jacFlag = True,verbosity = 'DEBUG',solverType=solver_type)
+			sim.tStop = 1.0
+			sim.tInc = 1/120.
+			sim.fixed_step_exponential = sim.tInc
+			sim.run_simulation()
+			results[solver_type] = (np.array(sim.Vdc_t),np.array(sim.S_t))
+			
+			self.assertTrue(sim.SOLVER_CONVERGENCE)
+		
+		Vdc_error = max(abs(results['fixed-exponential'][0] - results['odeint'][0]))
+		
+		self.assertLess(Vdc_error,1e-2)
+		self.assertAlmostEqual(results['fixed-exponential'][1][-1],results['odeint'][1][-1],places=2)
+
+	def test_jacobian_colored(self):
+		"""Test finite difference Jacobian with column coloring against analytical Jacobian and use it with model without analytical Jacobian."""
+		
+		events = SimulationEvents()
+		grid = Grid(events=events)
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+									 steadyStateInitialization = True,powerRating = self.power_rating)
+		sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,
+								jacFlag = True,verbosity = 'DEBUG',solverType='odeint')
+		
+		y = np.array(PVDER.y0)
+		Ja = np.array(sim.jac_ODE_model(y,0.0))
+		Jc = sim.jac_ODE_model_colored(y,0.0)
+		jac_sparsity,colors = sim.jac_coloring
+		
+		self.assertLessEqual(len(colors),PVDER.n_ODE)
+		self.assertTrue(np.allclose(Jc,Ja,rtol=1e-3,atol=1e-3*abs(Ja).max()),'Colored and analytical Jacobian should be same.')
+		
+		S_t = {}
+		for jacFlag in [False,True]:
+			events = SimulationEvents()
+			events.add_grid_event(0.3,0.9)
+			grid = Grid(events=events)
+			PVDER = SolarPVDERThreePhaseConstantVdc(events = events,configFile=config_file,derId='50_constantVdc',gridModel = grid,standAlone = True,
+													steadyStateInitialization = True,powerRating = self.power_rating)
+			sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,
+									jacFlag = jacFlag,verbosity = 'DEBUG',solverType='solve_ivp-BDF')
+			sim.tStop = 0.5
+			sim.tInc = 1/120.
+			sim.run_simulation()
+			
+			self.assertTrue(sim.SOLVER_CONVERGENCE)
+			S_t[jacFlag] = np.array(sim.S_t)
+		
+		self.assertLess(max(abs(S_t[True] - S_t[False])),1e-2)
+
+	def test_jacobian_generated(self):
+		"""Test generated RHS and Jacobian against stateless kernel and finite difference Jacobian and use it with model without analytical Jacobian."""
+		
+		codegen_cache_directory = defaults.codegen_cache_directory
+		cache_directory = tempfile.mkdtemp()
+		defaults.codegen_cache_directory = cache_directory
+		DER_codegen._generated_functions.clear() #Generate code in temporary directory
+		try:
+			events = SimulationEvents()
+			grid = Grid(events=events)
+			PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+										 steadyStateInitialization = True,powerRating = self.power_rating)
+			sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,
+									jacFlag = True,verbosity = 'DEBUG',solverType='odeint')
+			
+			y = np.array(PVDER.y0)
+			params = PVDER.get_rhs_parameters()
+			Jc = sim.jac_ODE_model_colored(y,0.0)
+			PVDER.jac_generated(0.0,y,params) #Generate code or load it from cache
+			self.assertEqual(len([file_name for file_name in os.listdir(cache_directory) if file_name.endswith('.py')]),1)
+			
+			f = PVDER.rhs(0.0,y,params)
+			fg = PVDER.rhs_generated(0.0,y,params)
+			Jg = PVDER.jac_generated(0.0,y,params)
+			
+			self.assertTrue(np.allclose(fg,f,rtol=1e-12,atol=1e-12*abs(f).max()),'Generated RHS and kernel should be same.')
+			self.assertTrue(np.allclose(Jg,Jc,rtol=1e-4,atol=1e-6*abs(Jc).max()),'Generated and finite difference Jacobian should be same.')
+			
+			S_t = {}
+			for GENERATED_JACOBIAN in [False,True]:
+				events = SimulationEvents()
+				events.add_grid_event(0.3,0.9)
+				grid = Grid(events=events)
+				PVDER = SolarPVDERThreePhaseConstantVdc(events = events,configFile=config_file,derId='50_constantVdc',gridModel = grid,standAlone = True,
+														steadyStateInitialization = True,powerRating = self.power_rating)
+				sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,
+										jacFlag = GENERATED_JACOBIAN,verbosity = 'DEBUG',solverType='solve_ivp-BDF')
+				sim.GENERATED_JACOBIAN = GENERATED_JACOBIAN
+				sim.tStop = 0.5
+				sim.tInc = 1/120.
+				sim.run_simulation()
+			
+				self.assertTrue(sim.SOLVER_CONVERGENCE)
+				S_t[GENERATED_JACOBIAN] = np.array(sim.S_t)
+			
+			self.assertLess(max(abs(S_t[True] - S_t[False])),1e-2)
+		finally:
+			defaults.codegen_cache_directory = codegen_cache_directory
+			DER_codegen._generated_functions.clear()
+			shutil.rmtree(cache_directory)
+
+	def test_derived_trajectories(self):
+		"""Test that derived trajectories are calculated on first access and recalculated for new solution."""
+		
+		events = SimulationEvents()
+		grid = Grid(events=events)
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+									 steadyStateInitialization = True,powerRating = self.power_rating)
+		sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,verbosity = 'DEBUG',solverType='odeint')
+		sim.tStop = 0.2
+		sim.run_simulation()
+		
+		self.assertNotIn('Vrms_t',sim.__dict__)
+		self.assertNotIn('S_PCC_t',sim.__dict__)
+		self.assertEqual(len(sim.Vrms_t),len(sim.t_t))
+		self.assertIn('Vrms_t',sim.__dict__)
+		self.assertNotIn('S_PCC_t',sim.__dict__)
+		self.assertTrue(np.allclose(sim.S_PCC_t,(1/2)*(sim.va_t*sim.ia_t.conjugate()+sim.vb_t*sim.ib_t.conjugate()+sim.vc_t*sim.ic_t.conjugate())))
+		self.assertTrue(hasattr(sim,'vd_t'))
+		
+		sim.tStop = 0.1
+		sim.run_simulation()
+		self.assertNotIn('Vrms_t',sim.__dict__)
+		self.assertEqual(len(sim.Vrms_t),len(sim.t_t))
+		
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,**dict(self.flag_arguments,**dict(self.ratings_arguments,**self.voltage_arguments)))
+		sim = DynamicSimulation(PV_model=PVDER,events = events,LOOP_MODE = True,verbosity = 'DEBUG',solverType='odeint')
+		sim.tInc = 1/120.
+		t0 = 0.0
+		for i in range(10):
+			sim.run_simulation(gridVoltagePhaseA=self.Va/Grid.Vbase,gridVoltagePhaseB=self.Vb/Grid.Vbase,gridVoltagePhaseC=self.Vc/Grid.Vbase,
+							   y0=sim.y0,t=[t0,t0+sim.tInc])
+			t0 = t0 + sim.tInc
+		
+		trajectories = sim.get_trajectories()
+		self.assertEqual(len(sim.t_t),11)
+		self.assertEqual(len(trajectories['Vrms_t']),11)
+		self.assertFalse(hasattr(sim,'vag_t'))
+
+	def test_outputs(self):
+		"""Test that only selected output trajectories are calculated and returned."""
+		
+		outputs = ['Vrms_t','S_PCC_t','Vdc_t']
+		events = SimulationEvents()
+		grid = Grid(events=events)
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+									 steadyStateInitialization = True,powerRating = self.power_rating)
+		sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,verbosity = 'DEBUG',solverType='odeint',outputs=outputs)
+		sim.tStop = 0.2
+		sim.run_simulation()
+		
+		trajectories = sim.get_trajectories()
+		self.assertEqual(list(trajectories.keys()),outputs)
+		self.assertNotIn('phi_a_t',sim.__dict__)
+		self.assertNotIn('Ppv_t',sim.__dict__)
+		
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,**dict(self.flag_arguments,**dict(self.ratings_arguments,**self.voltage_arguments)))
+		with self.assertRaises(ValueError):
+			DynamicSimulation(PV_model=PVDER,events = events,LOOP_MODE = True,verbosity = 'DEBUG',outputs=['Zload1_t'])
+		
+		sim = DynamicSimulation(PV_model=PVDER,events = events,LOOP_MODE = True,verbosity = 'DEBUG',solverType='odeint',outputs=outputs)
+		sim.tInc = 1/120.
+		t0 = 0.0
+		for i in range(5):
+			sim.run_simulation(gridVoltagePhaseA=self.Va/Grid.Vbase,gridVoltagePhaseB=self.Vb/Grid.Vbase,gridVoltagePhaseC=self.Vc/Grid.Vbase,
+							   y0=sim.y0,t=[t0,t0+sim.tInc])
+			t0 = t0 + sim.tInc
+		
+		trajectories = sim.get_trajectories()
+		self.assertEqual(list(trajectories.keys()),outputs)
+		self.assertEqual(len(trajectories['Vrms_t']),6)
+		self.assertNotIn('_Ppv_t',sim.__dict__)
+		self.assertFalse(hasattr(sim,'Ppv_t'))
+
+	def test_loop_mode_buffers(self):
+		"""Test that loop mode trajectories are stored in growable buffers and returned without copying."""
+		
+		buffer = GrowableArray([[0.0,1.0]],capacity=2)
+		for i in range(1,10):
+			buffer.append([[i,i+1.0],[i,i+1.0]])
+		self.assertEqual(len(buffer),19)
+		self.assertEqual(buffer.data.shape,(19,2))
+		self.assertEqual(len(buffer._buffer),32)
+		self.assertEqual(buffer.data[-1].tolist(),[9.0,10.0])
+		
+		events = SimulationEvents()
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,**dict(self.flag_arguments,**dict(self.ratings_arguments,**self.voltage_arguments)))
+		sim = DynamicSimulation(PV_model=PVDER,events = events,LOOP_MODE = True,verbosity = 'DEBUG',solverType='odeint')
+		sim.tInc = 1/120.
+		t0 = 0.0
+		for i in range(5):
+			sim.run_simulation(gridVoltagePhaseA=self.Va/Grid.Vbase,gridVoltagePhaseB=self.Vb/Grid.Vbase,gridVoltagePhaseC=self.Vc/Grid.Vbase,
+							   y0=sim.y0,t=[t0,t0+sim.tInc])
+			t0 = t0 + sim.tInc
+		
+		trajectories = sim.get_trajectories()
+		self.assertEqual(len(sim.t_t),6)
+		self.assertTrue(np.shares_memory(sim.t_t,sim._t_t._buffer))
+		self.assertTrue(np.shares_memory(trajectories['va_t'],sim._va_t._buffer))
+		self.assertTrue(np.allclose(sim.Vdc_t,sim._y_t.data[:,sim.PV_model.varInd['Vdc']]))
 
+	def test_trajectory_directory(self):
+		"""Test that states and inputs stored in memory mapped files give the same trajectories as states stored in memory."""
+		
+		trajectory_directory = tempfile.mkdtemp()
+		try:
+			trajectories = []
+			for directory in [None,trajectory_directory]:
+				events = SimulationEvents()
+				PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,**dict(self.flag_arguments,**dict(self.ratings_arguments,**self.voltage_arguments)))
+				sim = DynamicSimulation(PV_model=PVDER,events = events,LOOP_MODE = True,verbosity = 'DEBUG',solverType='odeint',trajectoryDirectory=directory)
+				sim.tInc = 1/120.
+				t0 = 0.0
+				for i in range(5):
+					sim.run_simulation(gridVoltagePhaseA=self.Va/Grid.Vbase,gridVoltagePhaseB=self.Vb/Grid.Vbase,gridVoltagePhaseC=self.Vc/Grid.Vbase,
+									   y0=sim.y0,t=[t0,t0+sim.tInc])
+					t0 = t0 + sim.tInc
+				trajectories.append(sim.get_trajectories())
+			
+			self.assertIsInstance(sim.t_t,np.memmap)
+			for name in trajectories[0]:
+				self.assertTrue(np.allclose(trajectories[0][name],trajectories[1][name]))
+			y_t = np.load(os.path.join(trajectory_directory,sim.name,'y_t.npy'),mmap_mode='r')
+			self.assertEqual(y_t.shape,(6,sim.PV_model.n_ODE))
+			self.assertTrue(np.allclose(y_t[:,sim.PV_model.varInd['Vdc']],sim.Vdc_t))
+			
+			events = SimulationEvents()
+			grid = Grid(events=events)
+			PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+										 steadyStateInitialization = True,powerRating = self.power_rating)
+			sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,verbosity = 'DEBUG',solverType='odeint',trajectoryDirectory=trajectory_directory)
+			sim.tStop = 0.2
+			sim.run_simulation()
+			
+			self.assertIsInstance(sim.Vdc_t,np.memmap)
+			self.assertEqual(np.load(os.path.join(trajectory_directory,sim.name,'t_t.npy')).tolist(),sim.t.tolist())
+			self.assertEqual(len(sim.Vrms_t),len(sim.t))
+		finally:
+			shutil.rmtree(trajectory_directory)
+
+	def test_run_streaming(self):
+		"""Test that trajectories from a streaming simulation are the same as from a simulation without chunks."""
+		
+		outputs = ['Vdc_t','Vrms_t','Ppv_t']
+		for solver_type in ['odeint','ode-vode-bdf']:
+			trajectories = []
+			for chunk_seconds in [None,0.05]:
+				events = SimulationEvents()
+				events.add_grid_event(0.12,0.95)
+				events.add_solar_event(0.21,80.0)
+				grid = Grid(events=events)
+				PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+											 steadyStateInitialization = True,powerRating = self.power_rating)
+				sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,verbosity = 'DEBUG',solverType=solver_type,outputs=outputs)
+				sim.tStop = 0.3
+				if chunk_seconds is None:
+					sim.run_simulation()
+					trajectories.append(dict(sim.get_trajectories(),t_t=sim.t_t))
+				else:
+					with self.assertLogs(LogUtil.logger,level='DEBUG') as logs:
+						chunks = [(t_t,chunk) for t_t,chunk in sim.run_streaming(chunk_seconds=chunk_seconds)]
+					self.assertEqual(len(chunks),6)
+					if solver_type == 'odeint': #LSODA integrator is only restarted at start and at events
+						self.assertEqual(len([message for message in logs.output if 'Persistent solver restarted' in message]),3)
+					trajectories.append({name:np.concatenate([chunk[name] for _,chunk in chunks]) for name in outputs})
+					trajectories[-1]['t_t'] = np.concatenate([t_t for t_t,_ in chunks])
+			
+			self.assertTrue(np.allclose(trajectories[0]['t_t'],trajectories[1]['t_t']))
+			for name in outputs:
+				self.assertTrue(np.allclose(trajectories[0][name],trajectories[1][name],rtol=1e-3),'{} from {} solver should be same.'.format(name,solver_type))
+
+
+	def test_output_decimation(self):
+		"""Test that peaks in trajectories are preserved when trajectories are stored at a larger time step."""
+		
+		trajectories = {}
+		for decimation_method in [None,'sample','minmax','rms']:
+			events = SimulationEvents()
+			events.add_grid_event(0.1,0.7)
+			events.add_grid_event(0.15,1.0)
+			grid = Grid(events=events)
+			PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+										 steadyStateInitialization = True,powerRating = self.power_rating)
+			PVDER.LVRT_ENABLE = False
+			sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,verbosity = 'DEBUG',solverType='odeint',outputs=['Irms_t','S_PCC_t'])
+			sim.tStop = 0.3
+			if decimation_method is not None:
+				sim.tOutput = 0.01
+				sim.decimation_method = decimation_method
+			sim.run_simulation()
+			trajectories[decimation_method] = sim.get_trajectories()
+			self.assertEqual(len(sim.t_t),len(trajectories[decimation_method]['Irms_t']))
+		
+		Irms_t = trajectories[None]['Irms_t']
+		self.assertEqual(len(trajectories['sample']['Irms_t']),31)
+		self.assertTrue(np.allclose(trajectories['sample']['Irms_t'],Irms_t[::10]))
+		self.assertEqual(trajectories['minmax']['Irms_t'].shape,(31,2))
+		self.assertEqual(trajectories['minmax']['Irms_t'].max(),Irms_t.max())
+		self.assertEqual(trajectories['minmax']['Irms_t'].min(),Irms_t.min())
+		self.assertTrue(np.allclose(np.abs(trajectories['minmax']['S_PCC_t']).max(),np.abs(trajectories[None]['S_PCC_t']).max()))
+		self.assertTrue(np.allclose(trajectories['rms']['Irms_t'][10],np.sqrt(np.mean(np.square(Irms_t[100:110])))))
+		
+		sim.decimation_method = 'mean'
+		with self.assertRaises(ValueError):
+			sim.run_simulation()
+
+	def test_complex_state_views(self):
+		"""Test that complex states are collected as views of the solution without copying."""
+		
+		for DER_model in [SolarPVDERThreePhase,SolarPVDERThreePhaseBalanced]:
+			events = SimulationEvents()
+			grid = Grid(events=events)
+			PVDER = DER_model(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+							  steadyStateInitialization = True,derId = '50' if DER_model == SolarPVDERThreePhase else '50_balanced')
+			sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,verbosity = 'DEBUG',solverType='odeint')
+			sim.tStop = 0.05
+			sim.run_simulation()
+			
+			self.assertEqual(sim.ia_t.dtype,np.complex128)
+			self.assertTrue(np.shares_memory(sim.ia_t,sim.iaR_t))
+			self.assertTrue(np.may_share_memory(sim.xa_t,sim.Vdc_t))
+			self.assertTrue(np.array_equal(sim.ua_t,sim.uaR_t + 1j*sim.uaI_t))
+			self.assertEqual(sim.y0[0:2],[sim.iaR_t[-1],sim.iaI_t[-1]])
+			if DER_model == SolarPVDERThreePhaseBalanced:
+				self.assertTrue(np.allclose(sim.ia_t + sim.ib_t + sim.ic_t,0.0))
+	
+	def test_state_layouts(self):
+		"""Test that state layouts derived from templates are consistent with the ODE model."""
+		
+		for DER_model_type,layout in templates.state_layouts.items():
+			self.assertEqual(len(layout['states']),templates.DER_design_template[DER_model_type]['basic_specs']['n_ODE'])
+			self.assertEqual(len(layout['states']),2*len(layout['complex_states']) + len(layout['real_states']))
+			self.assertEqual(layout['index']['iaR'],0)
+			self.assertEqual(layout['index']['wte'],len(layout['states']) - 1)
+		
+		for DER_model in [SolarPVDERThreePhase,SolarPVDERThreePhaseConstantVdc,SolarPVDERThreePhaseBalanced]:
+			events = SimulationEvents()
+			grid = Grid(events=events)
+			PVDER = DER_model(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+							  steadyStateInitialization = True,derId = {SolarPVDERThreePhase:'50',SolarPVDERThreePhaseConstantVdc:'50_constantVdc',SolarPVDERThreePhaseBalanced:'50_balanced'}[DER_model])
+			sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,verbosity = 'DEBUG',solverType='odeint')
+			layout = templates.state_layouts[PVDER.DER_model_type]
+			
+			self.assertEqual(PVDER.varInd,layout['index'])
+			self.assertEqual(len(sim.y0),PVDER.n_ODE)
+			self.assertTrue(np.allclose(sim.y0,PVDER.y0))
+			self.assertTrue(np.allclose(sim.Vdc_t,PVDER.Vdc))
+	
+	def test_time_series_events(self):
+		"""Test that event time series are same as scalar event lookups and do not update the DER model."""
+		
+		events = SimulationEvents()
+		events.add_solar_event(0.1,80.0)
+		events.add_solar_event(0.3,60.0,310.0)
+		events.add_grid_event(0.2,0.95)
+		events.add_load_event(0.25,5e3+0j)
+		
+		t = np.linspace(0.0,0.5,501)
+		Sinsol_t,Tactual_t = events.solar_events_time_series(t)
+		Vgrid_t,wgrid_t = events.grid_events_time_series(t)
+		Zload1_t = events.load_events_time_series(t)
+		for i,ti in enumerate(t):
+			self.assertEqual((Sinsol_t[i],Tactual_t[i]),events.solar_events(ti))
+			self.assertEqual(Zload1_t[i],events.load_events(ti))
+			Vgrid,wgrid = events.grid_events(ti)
+			self.assertAlmostEqual(Vgrid_t[i],Vgrid)
+			self.assertAlmostEqual(wgrid_t[i],wgrid)
+		
+		grid = Grid(events=events)
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+									 steadyStateInitialization = True,derId = '50')
+		sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,verbosity = 'DEBUG',solverType='odeint')
+		sim.tStop = 0.5
+		sim.run_simulation()
+		Sinsol,Vdc,wte = PVDER.Sinsol,PVDER.Vdc,PVDER.wte
+		sim.get_trajectories()
+		
+		self.assertEqual((PVDER.Sinsol,PVDER.Vdc,PVDER.wte),(Sinsol,Vdc,wte))
+		self.assertTrue(np.array_equal(sim.Sinsol_t,events.solar_events_time_series(sim.t_t)[0]))
+		self.assertTrue(np.allclose(sim.we_t,PVDER.Kp_PLL*sim.vd_t + sim.xPLL_t + 2*np.pi*60.0))
+
+	def test_stateless_events(self):
+		"""Test that events can be looked up in any order and shared by simulations."""
+		
+		events = SimulationEvents()
+		for T,Sinsol in [(0.3,60.0),(0.1,80.0),(0.2,90.0)]: #Events are sorted by time
+			events.add_solar_event(T,Sinsol)
+		events.add_grid_event(0.15,0.9,fgrid=60.5)
+		
+		self.assertEqual(events.solar_events(0.25)[0],90.0)
+		self.assertEqual(events.solar_events(0.05)[0],100.0)
+		self.assertEqual(events.solar_events(0.1)[0],80.0)
+		self.assertEqual(events.solar_events(1.0)[0],60.0)
+		self.assertEqual(abs(events.grid_events(0.16)[0]),0.9)
+		self.assertAlmostEqual(np.angle(events.grid_events(0.16)[0]),2.0*np.pi*0.5*events.del_t_event)
+		
+		events.add_solar_event(0.05,50.0) #Events are compiled again
+		self.assertEqual(events.solar_events(0.07)[0],50.0)
+		
+		events.del_t_event = 2.0*events.del_t_event #Events are compiled again (e.g. when used by simulation with different time step)
+		self.assertAlmostEqual(np.angle(events.grid_events(0.16)[0]),2.0*np.pi*0.5*events.del_t_event)
+		events.Tactual_default = 300.0
+		self.assertEqual(events.solar_events(0.0)[1],300.0)
+		events.reset_event_counters() #Deprecated and does nothing
+		self.assertEqual(events.solar_events(0.07)[0],50.0)
+		
+		trajectories = []
+		for i in range(2): #Same events object is used by both simulations
+			grid = Grid(events=events)
+			PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,gridModel = grid,standAlone = True,
+										 steadyStateInitialization = True,derId = '50')
+			sim = DynamicSimulation(PV_model=PVDER,events = events,gridModel = grid,verbosity = 'DEBUG',solverType='odeint')
+			sim.tStop = 0.4
+			sim.run_simulation()
+			trajectories.append(sim.get_trajectories())
+		
+		self.assertTrue(np.array_equal(trajectories[0]['Ppv_t'],trajectories[1]['Ppv_t']))
+		self.assertTrue(np.array_equal(trajectories[0]['Vdc_t'],trajectories[1]['Vdc_t']))
+
+	def test_bulk_events(self):
+		"""Test that events added from arrays or CSV files are same as events added one at a time."""
+		
+		T = np.arange(0.0,3600.0,1.0)
+		Sinsol = 25.0 + 75.0*np.random.rand(len(T))
+		events = SimulationEvents()
+		events.add_solar_events(T[::-1],Sinsol[::-1]) #Events are sorted by time
+		events_single = SimulationEvents()
+		for T_event,Sinsol_event in zip(T[0:10],Sinsol[0:10]):
+			events_single.add_solar_event(T_event,Sinsol_event)
+		
+		self.assertEqual(events.solar_events_total,len(T))
+		self.assertEqual(events.solar_events_list[0:10],events_single.solar_events_list)
+		
+		events.add_solar_events([1.0,1.0],[50.0,60.0]) #Replace existing event
+		self.assertEqual(events.solar_events_total,len(T))
+		self.assertEqual(events.solar_events(1.5)[0],60.0)
+		
+		with self.assertRaises(ValueError):
+			events.add_grid_events([1.0,2.0],[1.0,2.0])
+		with self.assertRaises(ValueError):
+			events.add_solar_events([1.0,np.nan],50.0)
+		self.assertEqual(events.grid_events_total,0)
+		
+		events.voltage_ramp(1.0,2.0,0.9,tstep=0.25)
+		self.assertEqual([event['T'] for event in events.grid_events_list],[1.0,1.25,1.5,1.75])
+		self.assertAlmostEqual(abs(events.grid_events(1.8)[0]),0.9)
+		events.insolation_ramp(10.0,20.0,50.0,tstep=1.0)
+		self.assertAlmostEqual(events.solar_events(19.5)[0],50.0)
+		events_single.add_solar_event(20.0,80.0,310.0)
+		events_single.insolation_ramp(30.0,40.0,50.0,tstep=1.0)
+		self.assertEqual(events_single.solar_events(39.5)[1],310.0) #Module temperature at start of ramp is kept
+		
+		solar_events_total,grid_events_total,load_events_total = events.solar_events_total,events.grid_events_total,events.load_events_total
+		events.add_solar_events([],[]) #No events are added
+		events.add_grid_events(np.array([]),0.9)
+		events.add_load_events([])
+		events.insolation_ramp(1.0,1.0,50.0)
+		events.voltage_ramp(1.0,1.0,0.9)
+		self.assertEqual((events.solar_events_total,events.grid_events_total,events.load_events_total),(solar_events_total,grid_events_total,load_events_total))
+		
+		csv_directory = tempfile.mkdtemp()
+		try:
+			file_name = os.path.join(csv_directory,'load_events.csv')
+			with open(file_name,'w') as csv_file:
+				csv_file.write('time,Zload1_actual\n0.1,10e3+0j\n0.2,5e3+1j\n')
+			events.add_events_from_csv(file_name,'load',columns={'T':'time'})
+			self.assertEqual([(event['T'],event['Zload1_actual']) for event in events.load_events_list],[(0.1,10e3+0j),(0.2,5e3+1j)])
+			
+			file_name = os.path.join(csv_directory,'grid_events.csv')
+			with open(file_name,'w') as csv_file:
+				csv_file.write('VA,Angle A\n240.0,0.0\n228.0,-10.0\n')
+			events.add_events_from_csv(file_name,'grid',columns={'Vgrid':'VA','Vgrid_angle':'Angle A'},scale={'Vgrid':1/240.0,'Vgrid_angle':np.pi/180},tstart=5.0,tstep=0.5)
+			self.assertEqual([(event['T'],event['Vgrid']) for event in events.grid_events_list[-2:]],[(5.0,1.0),(5.5,0.95)])
+			with self.assertRaises(ValueError):
+				events.add_events_from_csv(file_name,'grid')
+			
+			file_name = os.path.join(csv_directory,'solar_events.csv')
+			with open(file_name,'w') as csv_file:
+				csv_file.write('T,Sinsol\n')
+			events.add_events_from_csv(file_name,'solar')
+			self.assertEqual(events.solar_events_total,solar_events_total)
+		finally:
+			shutil.rmtree(csv_directory)
 
 if __name__ == '__main__':
 	#unittest.main()
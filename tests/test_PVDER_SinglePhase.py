@@ -5,6 +5,8 @@ import argparse
 import unittest
 
 import math
+import time
+import numpy as np
 
 import matplotlib.pyplot as plt
 
@@ -19,7 +21,7 @@ config_file = r'..\config_der.json'
 
 def suite():
 	"""Define a test suite."""
-	all_tests = ['test_init','test_parameter_dict','test_jacobian']
+	all_tests = ['test_init','test_parameter_dict','test_jacobian','test_rhs','test_run_simulation_exponential']
 	
 	avoid_tests = ['test_jacobian']
    
@@ -107,6 +109,50 @@ class TestPVDER(unittest.TestCase):
 		self.assertTrue(jac_CHECK,'Analytical and numerical Jacobian should be same.')
 		self.assertEqual(Jn.shape,(PVDER.n_ODE,PVDER.n_ODE))	
 	
+	def test_rhs(self):
+		"""Test stateless RHS kernel against ODE model."""
+		
+		events = SimulationEvents()
+		kwargs={}
+		kwargs.update(self.flag_arguments)
+		kwargs.update(self.ratings_arguments)
+		kwargs.update(self.voltage_arguments)
+		PVDER = SolarPVDERSinglePhase(events = events,configFile=config_file,**kwargs)
+		
+		y0 = np.array(PVDER.y0)
+		for y in [y0,y0*1.05,y0*0.9]:
+			dy_ODE = PVDER.ODE_model(y,0.1)
+			params = PVDER.get_rhs_parameters()
+			dy_rhs = PVDER.rhs(0.1,y,params)
+			self.assertTrue(np.allclose(dy_ODE,dy_rhs,rtol=1e-9,atol=1e-9),'Stateless RHS should be same as ODE model.')
+
+	def test_run_simulation_exponential(self):
+		"""Test loop mode simulation with exponential integrator against odeint."""
+		
+		Vdc_t = {}
+		for solver_type in ['odeint','fixed-exponential']:
+			events = SimulationEvents()
+			kwargs={}
+			kwargs.update(self.flag_arguments)
+			kwargs.update(self.ratings_arguments)
+			kwargs.update(self.voltage_arguments)
+			PVDER = SolarPVDERSinglePhase(events = events,configFile=config_file,**kwargs)
+			
+			sim = DynamicSimulation(PV_model=PVDER,events = events,LOOP_MODE = True,
+									jacFlag = True,verbosity = 'DEBUG',solverType=solver_type)
+			sim.tInc = 1/120.
+			sim.fixed_step_exponential = sim.tInc #Step is not limited by stability of current loop
+			
+			t0 = 0.0
+			for i in range(30):
+				scaler = 0.9 if i >= 10 else 1.0
+				sim.run_simulation(gridVoltagePhaseA=scaler*self.Va/Grid.Vbase,y0=sim.y0,t=[t0,t0+sim.tInc])
+				t0 = t0 + sim.tInc
+				self.assertTrue(sim.SOLVER_CONVERGENCE)
+			Vdc_t[solver_type] = np.array(sim.Vdc_t)
+		
+		self.assertLess(max(abs(Vdc_t['fixed-exponential'] - Vdc_t['odeint'])),1e-2)
+
 if __name__ == '__main__':
 	runner = unittest.TextTestRunner()
 	runner.run(suite())
@@ -6,6 +6,7 @@ import logging
 import unittest
 
 import math
+import numpy as np
 import cmath
 
 import matplotlib.pyplot as plt
@@ -16,6 +17,7 @@ from pvder.dynamic_simulation import DynamicSimulation
 from pvder.simulation_events import SimulationEvents
 from pvder.simulation_utilities import SimulationResults
 from pvder import utility_functions
+from pvder import jacobian_verification
 from unittest_utilities import show_DER_status, plot_DER_trajectories
 
 config_file = r'..\config_der.json'
@@ -23,7 +25,7 @@ config_file = r'..\config_der.json'
 
 def suite():
 	"""Define a test suite."""
-	all_tests = ['test_init','test_parameter_dict','test_jacobian','test_steady_state_calc']
+	all_tests = ['test_init','test_parameter_dict','test_jacobian','test_rhs','test_steady_state_calc','test_jacobian_anti_windup','test_jacobian_sweep','test_jacobian_operating_points_restore']
 	avoid_tests = []
 	tests = list(set(all_tests) - set(avoid_tests))
 	print('Following unittest scenarios will be run:{}'.format(tests))
@@ -130,6 +132,72 @@ class TestPVDER(unittest.TestCase):
 			self.assertAlmostEqual(PVDER.ma+PVDER.mb+PVDER.mc,0.0+1j*0.0,delta=0.001,msg='Duty cycles should sum to zero!')
 			self.assertLess(abs(PVDER.ma),1.0,msg='Magnitude of duty cycle should be less than 1!')
 
+	def test_rhs(self):
+		"""Test stateless RHS kernel against ODE model."""
+		
+		events = SimulationEvents()
+		
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,**self.kwargs)
+		
+		y0 = np.array(PVDER.y0)
+		for y in [y0,y0*1.05,y0*0.9]:
+			dy_ODE = PVDER.ODE_model(y,0.1)
+			params = PVDER.get_rhs_parameters()
+			dy_rhs = PVDER.rhs(0.1,y,params)
+			self.assertTrue(np.allclose(dy_ODE,dy_rhs,rtol=1e-9,atol=1e-9),'Stateless RHS should be same as ODE model.')
+
+	def test_jacobian_anti_windup(self):
+		"""Test that Jacobian entries zeroed by anti-windup are restored in later calls."""
+		
+		events = SimulationEvents()
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,**self.kwargs)
+		y0 = np.array(PVDER.y0)
+		J0 = np.array(PVDER.jac_ODE_model(y0,0.0))
+		
+		y_saturated = y0.copy()
+		y_saturated[PVDER.varInd['xaR']] = 10.0*PVDER.m_limit*1e1 #Duty cycle limit exceeded in phase a
+		y_saturated[PVDER.varInd['uaR']] = 1.0
+		J_saturated = np.array(PVDER.jac_ODE_model(y_saturated,0.0))
+		self.assertEqual(J_saturated[PVDER.varInd['xaR'],PVDER.varInd['uaR']],0.0)
+		
+		self.assertTrue(np.array_equal(np.array(PVDER.jac_ODE_model(y0,0.0)),J0))
+
+	def test_jacobian_sweep(self):
+		"""Test analytical and generated Jacobian at many operating points using a process pool."""
+		
+		model_specs = [{'modelType':'ThreePhaseUnbalanced','configFile':config_file,'kwargs':dict(self.kwargs,derId='50',verbosity='WARNING')},
+					   {'modelType':'ThreePhaseBalanced','configFile':config_file,'kwargs':dict(self.kwargs,derId='50_balanced',verbosity='WARNING')}]
+		operating_points = jacobian_verification.get_operating_points()
+		
+		results = jacobian_verification.jacobian_sweep(model_specs,operating_points=[operating_point for operating_point in operating_points if operating_point['DER_CONNECTED']],
+													   n_samples=5,n_workers=2)
+		self.assertEqual(jacobian_verification.show_jacobian_sweep_report(results),0)
+		
+		model_specs.append({'modelType':'ThreePhaseUnbalancedConstantVdc','configFile':config_file,'kwargs':dict(self.kwargs,derId='50_constantVdc',verbosity='WARNING')})
+		results = jacobian_verification.jacobian_sweep(model_specs,operating_points=operating_points,use_generated=True,n_workers=1)
+		self.assertEqual(len(results[-1]['report']),len(operating_points))
+		self.assertEqual(jacobian_verification.show_jacobian_sweep_report(results),0)
+
+	def test_jacobian_operating_points_restore(self):
+		"""Test that DER model is restored after checking Jacobian at operating points, including when the check fails."""
+		
+		events = SimulationEvents()
+		PVDER = SolarPVDERThreePhase(events = events,configFile=config_file,**self.kwargs)
+		attribute_names = ['Sinsol','Iph','Ppv','Q_ref','Vdc_ref','DER_CONNECTED','gridVoltagePhaseA']
+		saved_attributes = {name:getattr(PVDER,name) for name in attribute_names}
+		
+		operating_point = {'Sinsol':50.0,'Vgrid':0.9,'Q_ref':0.1,'DER_CONNECTED':True}
+		PVDER.check_jacobian_operating_points([operating_point])
+		self.assertIs(PVDER.events,events)
+		for name in attribute_names:
+			self.assertEqual(getattr(PVDER,name),saved_attributes[name],'{} should be restored.'.format(name))
+		
+		with self.assertRaises(KeyError):
+			PVDER.check_jacobian_operating_points([operating_point,{'Sinsol':50.0,'Vgrid':0.9}])
+		self.assertIs(PVDER.events,events)
+		for name in attribute_names:
+			self.assertEqual(getattr(PVDER,name),saved_attributes[name],'{} should be restored when Jacobian check fails.'.format(name))
+
 if __name__ == '__main__':
 	runner = unittest.TextTestRunner()
 	runner.run(suite())